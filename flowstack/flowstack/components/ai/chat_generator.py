@@ -1,39 +1,85 @@
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Iterator, Union, final, override
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Union, final, override
 
 from flowstack.core import Component
-from flowstack.messages import BaseMessage, MessageContent
+from flowstack.messages import BaseMessage, MessageContent, MessageType, merge_message_chunks
+from flowstack.messages.utils import coerce_to_messages, count_message_tokens
+from flowstack.typing import GenerationMetrics
 from flowstack.utils.threading import run_async
+from flowstack.utils.usage import record_usage
+
+logger = logging.getLogger(__name__)
 
 LLMInput = Union[MessageContent, list[BaseMessage]]
 ChatGenerator = Component[LLMInput, BaseMessage]
 
 class ChatPrompt:
+    """
+    LLMInput normalized into messages once. Existing messages are reused as-is, and rendered
+    payloads are cached per message, so a conversation extended turn by turn only renders new messages.
+    """
+
+    __slots__ = ('_messages', '_rendered')
+
     @property
     def messages(self) -> list[BaseMessage]:
-        raise NotImplementedError()
+        return self._messages
 
     @property
-    def system(self) -> BaseMessage:
-        raise NotImplementedError()
+    def system(self) -> Optional[BaseMessage]:
+        if self._messages and self._messages[0].message_type == MessageType.SYSTEM:
+            return self._messages[0]
+        return None
 
     @property
     def current(self) -> BaseMessage:
-        raise NotImplementedError()
-
-    def __init__(self, input: LLMInput):
-        pass
+        return self._messages[-1]
+
+    def __init__(self, input: Union[LLMInput, 'ChatPrompt']):
+        if isinstance(input, ChatPrompt):
+            self._messages = input._messages
+            self._rendered = input._rendered
+        else:
+            self._messages = list(coerce_to_messages(input))
+            self._rendered: dict[str, list[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def extend(self, input: LLMInput) -> 'ChatPrompt':
+        """
+        Returns a new prompt with the input appended, sharing the already normalized messages.
+        """
+        prompt = ChatPrompt.__new__(ChatPrompt)
+        prompt._messages = self._messages + coerce_to_messages(input)
+        prompt._rendered = {}
+        return prompt
+
+    def render[T](self, key: str, render_message: Callable[[BaseMessage], T]) -> list[T]:
+        """
+        Renders every message with render_message, e.g. into a provider payload, caching the results under key.
+        """
+        if key not in self._rendered:
+            self._rendered[key] = [message.cached(key, render_message) for message in self._messages]
+        return self._rendered[key]
 
 class BaseChatGenerator(ChatGenerator, ABC):
     """
     Base chat generator.
+    Integrations stream incremental, Addable message chunks (see AIMessageChunk) from _stream/_astream.
     """
 
     # Sync
 
     @final
     def invoke(self, input: LLMInput, **kwargs) -> BaseMessage:
-        pass
+        started = time.perf_counter()
+        prompt = ChatPrompt(input)
+        message = self._invoke(prompt, **kwargs)
+        self._on_generation(prompt, message, _invoke_metrics(started))
+        return message
 
     @abstractmethod
     def _invoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
@@ -44,7 +90,11 @@ class BaseChatGenerator(ChatGenerator, ABC):
     @final
     @override
     async def ainvoke(self, input: LLMInput, **kwargs) -> BaseMessage:
-        pass
+        started = time.perf_counter()
+        prompt = ChatPrompt(input)
+        message = await self._ainvoke(prompt, **kwargs)
+        self._on_generation(prompt, message, _invoke_metrics(started))
+        return message
 
     async def _ainvoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
         return await run_async(self._invoke, prompt, **kwargs)
@@ -54,7 +104,8 @@ class BaseChatGenerator(ChatGenerator, ABC):
     @final
     @override
     def stream(self, input: LLMInput, **kwargs) -> Iterator[BaseMessage]:
-        pass
+        prompt = ChatPrompt(input)
+        yield from self._track(prompt, self._stream(prompt, **kwargs))
 
     def _stream(self, prompt: ChatPrompt, **kwargs) -> Iterator[BaseMessage]:
         yield self._invoke(prompt, **kwargs)
@@ -64,7 +115,9 @@ class BaseChatGenerator(ChatGenerator, ABC):
     @final
     @override
     async def astream(self, input: LLMInput, **kwargs) -> AsyncIterator[BaseMessage]:
-        pass
+        prompt = ChatPrompt(input)
+        async for chunk in self._atrack(prompt, self._astream(prompt, **kwargs)):
+            yield chunk
 
     async def _astream(self, prompt: ChatPrompt, **kwargs) -> AsyncIterator[BaseMessage]:
         yield await self._ainvoke(prompt, **kwargs)
@@ -74,17 +127,109 @@ class BaseChatGenerator(ChatGenerator, ABC):
     @final
     @override
     def transform(self, input: Iterator[LLMInput], **kwargs) -> Iterator[BaseMessage]:
-        pass
+        yield from self._transform((ChatPrompt(value) for value in input), **kwargs)
 
     def _transform(self, prompts: Iterator[ChatPrompt], **kwargs) -> Iterator[BaseMessage]:
-        pass
+        for prompt in prompts:
+            yield from self._track(prompt, self._stream(prompt, **kwargs))
 
     # Async Transform
 
     @final
     @override
     async def atransform(self, input: AsyncIterator[LLMInput], **kwargs) -> AsyncIterator[BaseMessage]:
-        pass
+        async for chunk in self._atransform(_to_prompts(input), **kwargs):
+            yield chunk
 
     async def _atransform(self, prompts: AsyncIterator[ChatPrompt], **kwargs) -> AsyncIterator[BaseMessage]:
-        pass
\ No newline at end of file
+        async for prompt in prompts:
+            async for chunk in self._atrack(prompt, self._astream(prompt, **kwargs)):
+                yield chunk
+
+    # Metrics
+
+    def _on_generation(self, prompt: ChatPrompt, message: BaseMessage, metrics: GenerationMetrics) -> None:
+        """
+        Called with the complete message and its metrics once a generation finishes.
+        Records usage, estimating token counts when the message carries no usage metadata.
+        """
+        logger.debug(
+            f'> Generated message in {metrics['latency']:.3f}s '
+            f'(time to first token: {metrics['time_to_first_token']:.3f}s, chunks: {metrics['chunks']}).'
+        )
+        usage = getattr(message, 'usage_metadata', None)
+        record_usage(
+            component=self.get_name(),
+            kind='chat',
+            prompt_tokens=(
+                usage['prompt_tokens']
+                if usage
+                else sum(count_message_tokens(value) for value in prompt.messages)
+            ),
+            completion_tokens=usage['completion_tokens'] if usage else count_message_tokens(message),
+            total_tokens=usage['total_tokens'] if usage else None,
+            latency=metrics['latency'],
+            time_to_first_token=metrics['time_to_first_token'],
+            estimated=usage is None
+        )
+
+    @final
+    def _track(self, prompt: ChatPrompt, chunks: Iterator[BaseMessage]) -> Iterator[BaseMessage]:
+        tracker = _StreamTracker()
+        try:
+            for chunk in chunks:
+                tracker.add(chunk)
+                yield chunk
+        finally:
+            self._on_stream_end(prompt, tracker)
+
+    @final
+    async def _atrack(self, prompt: ChatPrompt, chunks: AsyncIterator[BaseMessage]) -> AsyncIterator[BaseMessage]:
+        tracker = _StreamTracker()
+        try:
+            async for chunk in chunks:
+                tracker.add(chunk)
+                yield chunk
+        finally:
+            self._on_stream_end(prompt, tracker)
+
+    def _on_stream_end(self, prompt: ChatPrompt, tracker: '_StreamTracker') -> None:
+        if tracker.chunks:
+            self._on_generation(prompt, tracker.message(), tracker.metrics())
+
+class _StreamTracker:
+    """
+    Collects streamed chunks so they are merged once, when the stream ends.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.chunks: list[BaseMessage] = []
+
+    def add(self, chunk: BaseMessage) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+        self.chunks.append(chunk)
+
+    def message(self) -> BaseMessage:
+        return merge_message_chunks(self.chunks)
+
+    def metrics(self) -> GenerationMetrics:
+        return GenerationMetrics(
+            time_to_first_token=self.first_token - self.started,
+            latency=time.perf_counter() - self.started,
+            chunks=len(self.chunks)
+        )
+
+def _invoke_metrics(started: float) -> GenerationMetrics:
+    latency = time.perf_counter() - started
+    return GenerationMetrics(
+        time_to_first_token=latency,
+        latency=latency,
+        chunks=1
+    )
+
+async def _to_prompts(inputs: AsyncIterator[LLMInput]) -> AsyncIterator[ChatPrompt]:
+    async for value in inputs:
+        yield ChatPrompt(value)
\ No newline at end of file
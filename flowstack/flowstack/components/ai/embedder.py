@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
+import time
 from typing import AsyncIterator, Iterator, Optional, final, override
 
 from flowstack.artifacts import Artifact
 from flowstack.core import Component
 from flowstack.typing import Embedding
+from flowstack.utils.string import count_tokens
 from flowstack.utils.threading import run_async
+from flowstack.utils.usage import record_usage
 
 Embedder = Component[list[Artifact], list[Artifact]]
 
@@ -17,7 +20,9 @@ class BaseEmbedder(Embedder, ABC):
 
     @final
     def invoke(self, artifacts: list[Artifact], **kwargs) -> list[Artifact]:
-        pass
+        started = time.perf_counter()
+        embeddings = self._invoke(artifacts, **kwargs)
+        return self._on_embeddings(artifacts, embeddings, started)
 
     @abstractmethod
     def _invoke(self, artifacts: list[Artifact], **kwargs) -> list[Optional[Embedding]]:
@@ -28,7 +33,9 @@ class BaseEmbedder(Embedder, ABC):
     @final
     @override
     async def ainvoke(self, artifacts: list[Artifact], **kwargs) -> list[Artifact]:
-        pass
+        started = time.perf_counter()
+        embeddings = await self._ainvoke(artifacts, **kwargs)
+        return self._on_embeddings(artifacts, embeddings, started)
 
     async def _ainvoke(self, artifacts: list[Artifact], **kwargs) -> list[Optional[Embedding]]:
         return await run_async(self._invoke, artifacts, **kwargs)
@@ -38,37 +45,61 @@ class BaseEmbedder(Embedder, ABC):
     @final
     @override
     def stream(self, artifacts: list[Artifact], **kwargs) -> Iterator[list[Artifact]]:
-        pass
+        yield self.invoke(artifacts, **kwargs)
 
     def _stream(self, artifacts: list[Artifact], **kwargs) -> Iterator[list[Optional[Embedding]]]:
-        pass
+        yield self._invoke(artifacts, **kwargs)
 
     # Async Stream
 
     @final
     @override
     async def astream(self, artifacts: list[Artifact], **kwargs) -> AsyncIterator[list[Artifact]]:
-        pass
+        yield await self.ainvoke(artifacts, **kwargs)
 
     async def _astream(self, artifacts: list[Artifact], **kwargs) -> AsyncIterator[list[Optional[Embedding]]]:
-        pass
+        yield await self._ainvoke(artifacts, **kwargs)
 
     # Transform
 
     @final
     @override
     def transform(self, artifacts: Iterator[list[Artifact]], **kwargs) -> Iterator[list[Artifact]]:
-        pass
+        for batch in artifacts:
+            yield self.invoke(batch, **kwargs)
 
     def _transform(self, artifacts: Iterator[list[Artifact]], **kwargs) -> Iterator[list[Optional[Embedding]]]:
-        pass
+        for batch in artifacts:
+            yield self._invoke(batch, **kwargs)
 
     # Async Transform
 
     @final
     @override
-    def atransform(self, artifacts: AsyncIterator[list[Artifact]], **kwargs) -> AsyncIterator[list[Artifact]]:
-        pass
+    async def atransform(self, artifacts: AsyncIterator[list[Artifact]], **kwargs) -> AsyncIterator[list[Artifact]]:
+        async for batch in artifacts:
+            yield await self.ainvoke(batch, **kwargs)
 
     async def _atransform(self, artifacts: AsyncIterator[list[Artifact]], **kwargs) -> AsyncIterator[list[Optional[Embedding]]]:
-        pass
\ No newline at end of file
+        async for batch in artifacts:
+            yield await self._ainvoke(batch, **kwargs)
+
+    # Usage
+
+    def _on_embeddings(
+        self,
+        artifacts: list[Artifact],
+        embeddings: list[Optional[Embedding]],
+        started: float
+    ) -> list[Artifact]:
+        for artifact, embedding in zip(artifacts, embeddings):
+            artifact.embedding = embedding
+        record_usage(
+            component=self.get_name(),
+            kind='embedding',
+            prompt_tokens=count_tokens(artifacts),
+            completion_tokens=0,
+            latency=time.perf_counter() - started,
+            estimated=True
+        )
+        return artifacts
\ No newline at end of file
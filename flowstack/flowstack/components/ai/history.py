@@ -0,0 +1,128 @@
+import logging
+from typing import Optional, override
+
+from flowstack.components.ai.chat_generator import ChatGenerator
+from flowstack.core import Component
+from flowstack.messages import BaseMessage, HumanMessage, MessageType, SystemMessage
+from flowstack.messages.utils import count_message_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_TOKENS = 256
+SUMMARY_INSTRUCTIONS = (
+    'Summarize the conversation below for an assistant that will continue it. '
+    'Keep facts, decisions, open questions and user preferences. '
+    'Fold in the previous summary if there is one. Answer in at most {max_words} words.'
+)
+SUMMARY_PREFIX = 'Summary of the earlier conversation:\n'
+
+class HistoryCompactor(Component[list[BaseMessage], list[BaseMessage]]):
+    """
+    Fits a conversation into a token budget. Leading system messages and the most recent turns are kept,
+    and older turns are dropped or, with a summarizer, folded into a running summary.
+    Token counts and summaries are memoized on the messages, so each turn only processes new messages.
+    """
+
+    max_tokens: int
+    summarizer: Optional[ChatGenerator] = None
+    summary_tokens: int = DEFAULT_SUMMARY_TOKENS
+
+    def __init__(
+        self,
+        max_tokens: int,
+        summarizer: Optional[ChatGenerator] = None,
+        summary_tokens: int = DEFAULT_SUMMARY_TOKENS,
+        name: Optional[str] = None
+    ):
+        super().__init__(
+            max_tokens=max_tokens,
+            summarizer=summarizer,
+            summary_tokens=summary_tokens,
+            name=name
+        )
+
+    @override
+    def invoke(self, messages: list[BaseMessage], **kwargs) -> list[BaseMessage]:
+        head, evicted, recent = self._split(messages)
+        if not evicted:
+            return messages
+        if self.summarizer is None:
+            return head + recent
+        previous, pending = self._pending(evicted)
+        summary = previous
+        if pending:
+            summary = self._store(
+                evicted,
+                self.summarizer.invoke(self._summary_prompt(previous, pending))
+            )
+        return head + [summary] + recent
+
+    @override
+    async def ainvoke(self, messages: list[BaseMessage], **kwargs) -> list[BaseMessage]:
+        head, evicted, recent = self._split(messages)
+        if not evicted:
+            return messages
+        if self.summarizer is None:
+            return head + recent
+        previous, pending = self._pending(evicted)
+        summary = previous
+        if pending:
+            summary = self._store(
+                evicted,
+                await self.summarizer.ainvoke(self._summary_prompt(previous, pending))
+            )
+        return head + [summary] + recent
+
+    @property
+    def _summary_key(self) -> str:
+        return f'history_summary:{self.get_name()}'
+
+    def _split(self, messages: list[BaseMessage]) -> tuple[list[BaseMessage], list[BaseMessage], list[BaseMessage]]:
+        start = 0
+        while start < len(messages) and messages[start].message_type == MessageType.SYSTEM:
+            start += 1
+        budget = self.max_tokens - sum(count_message_tokens(message) for message in messages[:start])
+        cut = _recent_start(messages, start, budget)
+        if cut > start and self.summarizer is not None:
+            cut = _recent_start(messages, start, budget - self.summary_tokens)
+        if cut == start:
+            return messages[:start], [], messages[start:]
+        while cut < len(messages) - 1 and messages[cut].message_type == MessageType.TOOL:
+            cut += 1
+        logger.debug(f'> Compacting {cut - start} of {len(messages)} messages.')
+        return messages[:start], messages[start:cut], messages[cut:]
+
+    def _pending(self, evicted: list[BaseMessage]) -> tuple[Optional[BaseMessage], list[BaseMessage]]:
+        """
+        Finds the latest summary memoized on an evicted message and the messages evicted since.
+        """
+        for position in range(len(evicted) - 1, -1, -1):
+            summary = evicted[position].get_cached(self._summary_key)
+            if summary is not None:
+                return summary, evicted[position + 1:]
+        return None, evicted
+
+    def _store(self, evicted: list[BaseMessage], message: BaseMessage) -> BaseMessage:
+        summary = SystemMessage(f'{SUMMARY_PREFIX}{message}')
+        return evicted[-1].cached(self._summary_key, lambda _: summary)
+
+    def _summary_prompt(self, previous: Optional[BaseMessage], messages: list[BaseMessage]) -> list[BaseMessage]:
+        transcript = '\n'.join(f'{message.message_type}: {message}' for message in messages)
+        if previous is not None:
+            transcript = f'{str(previous).removeprefix(SUMMARY_PREFIX)}\n\n{transcript}'
+        return [
+            SystemMessage(SUMMARY_INSTRUCTIONS.format(max_words=int(self.summary_tokens * 3 / 4))),
+            HumanMessage(transcript)
+        ]
+
+def _recent_start(messages: list[BaseMessage], start: int, budget: int) -> int:
+    """
+    Walks back from the newest message and returns where the suffix that fits the budget begins.
+    The current message is always kept.
+    """
+    used = 0
+    for position in range(len(messages) - 1, start - 1, -1):
+        used += count_message_tokens(messages[position])
+        if used > budget:
+            return min(position + 1, len(messages) - 1)
+    return start
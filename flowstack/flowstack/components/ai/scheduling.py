@@ -0,0 +1,346 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, ClassVar, Iterator, Optional, Self, override
+
+from flowstack.components.ai.chat_generator import BaseChatGenerator, ChatPrompt
+from flowstack.messages import BaseMessage
+from flowstack.messages.utils import count_message_tokens
+from flowstack.typing import GenerationMetrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+MIN_RATE_FACTOR = 0.1
+RATE_FACTOR_STEP = 0.05
+
+class _TokenBucket:
+    def __init__(self, per_minute: Optional[int]):
+        self.capacity = float(per_minute) if per_minute else None
+        self.tokens = self.capacity or 0.0
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float, factor: float) -> None:
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60 * factor)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, factor: float) -> float:
+        if self.capacity is None:
+            return 0.0
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / (self.capacity / 60 * factor)
+
+    def consume(self, amount: float) -> None:
+        if self.capacity is not None:
+            self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class _Waiter:
+    def __init__(self, priority: int, sequence: int, tokens: int, wake: Callable[[], None]):
+        self.priority = priority
+        self.sequence = sequence
+        self.tokens = tokens
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: '_Waiter') -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+class RateScheduler:
+    """
+    Token-bucket scheduler for requests/min, tokens/min and concurrency limits.
+    Waiters are served by priority (lower first) and then arrival order.
+    After a rate limit response, the scheduler pauses and halves its rate,
+    then recovers it additively on each success.
+    """
+
+    _providers: ClassVar[dict[str, 'RateScheduler']] = {}
+    _providers_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        backoff: float = DEFAULT_BACKOFF
+    ):
+        self.max_concurrency = max_concurrency
+        self.backoff = backoff
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self._factor = 1.0
+        self._paused_until = 0.0
+        self._rate_limited = 0
+        self._active = 0
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[threading.Timer] = None
+        self._timer_deadline = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_provider(cls, provider: str, **kwargs) -> Self:
+        """
+        Returns the scheduler shared by every generator of the provider, creating it with kwargs on first use.
+        """
+        with cls._providers_lock:
+            if provider not in cls._providers:
+                cls._providers[provider] = cls(**kwargs)
+            return cls._providers[provider]
+
+    def acquire(self, tokens: int, priority: int = 0) -> None:
+        event = threading.Event()
+        self._enqueue(tokens, priority, event.set)
+        event.wait()
+
+    async def aacquire(self, tokens: int, priority: int = 0) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = self._enqueue(
+            tokens,
+            priority,
+            lambda: loop.call_soon_threadsafe(_resolve, future)
+        )
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._active -= 1
+                    self._requests.refund(1)
+                    self._tokens.refund(tokens)
+                    self._dispatch()
+                else:
+                    waiter.cancelled = True
+            raise
+
+    def release(self, tokens: int, used: Optional[int] = None) -> None:
+        """
+        Frees a concurrency slot and corrects the token bucket with the actual usage, when known.
+        """
+        with self._lock:
+            self._active -= 1
+            if used is not None:
+                self._tokens.refund(tokens - used)
+            self._dispatch()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._rate_limited = 0
+            if self._factor < 1.0:
+                self._refill(time.monotonic())
+                self._factor = min(1.0, self._factor + RATE_FACTOR_STEP)
+                self._dispatch()
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._factor = max(MIN_RATE_FACTOR, self._factor / 2)
+            delay = retry_after if retry_after is not None else min(MAX_BACKOFF, self.backoff * 2 ** self._rate_limited)
+            self._rate_limited += 1
+            self._paused_until = max(self._paused_until, now + delay)
+            logger.info(f'> Rate limited, pausing for {delay:.2f}s at {self._factor:.0%} of the configured rate.')
+            self._dispatch()
+
+    def _enqueue(self, tokens: int, priority: int, wake: Callable[[], None]) -> _Waiter:
+        with self._lock:
+            waiter = _Waiter(priority, next(self._sequence), tokens, wake)
+            heapq.heappush(self._waiters, waiter)
+            self._dispatch()
+            return waiter
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            waiter = self._waiters[0]
+            if waiter.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+            if self.max_concurrency is not None and self._active >= self.max_concurrency:
+                return
+            wait = max(
+                self._paused_until - now,
+                self._requests.wait_time(1, self._factor),
+                self._tokens.wait_time(waiter.tokens, self._factor)
+            )
+            if wait > 0:
+                self._schedule(now, wait)
+                return
+            heapq.heappop(self._waiters)
+            self._requests.consume(1)
+            self._tokens.consume(waiter.tokens)
+            self._active += 1
+            waiter.granted = True
+            waiter.wake()
+
+    def _refill(self, now: float) -> None:
+        self._requests.refill(now, self._factor)
+        self._tokens.refill(now, self._factor)
+
+    def _schedule(self, now: float, delay: float) -> None:
+        deadline = now + delay
+        if self._timer is not None:
+            if self._timer_deadline <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer_deadline = deadline
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+class ScheduledChatGenerator(BaseChatGenerator):
+    """
+    Chat generator that runs every call through a RateScheduler and retries rate limited calls.
+    Pass priority=... when invoking to jump the queue (lower runs first).
+    """
+
+    generator: BaseChatGenerator
+    scheduler: RateScheduler
+    max_retries: int = DEFAULT_MAX_RETRIES
+
+    def __init__(
+        self,
+        generator: BaseChatGenerator,
+        scheduler: RateScheduler,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        name: Optional[str] = None
+    ):
+        super().__init__(
+            generator=generator,
+            scheduler=scheduler,
+            max_retries=max_retries,
+            name=name
+        )
+
+    @override
+    def _invoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        priority = kwargs.pop('priority', 0)
+        tokens = _estimate_tokens(prompt, **kwargs)
+        for attempt in itertools.count():
+            self.scheduler.acquire(tokens, priority)
+            used: Optional[int] = None
+            try:
+                message = self.generator.invoke(prompt, **kwargs)
+                used = _used_tokens(message, used)
+                self.scheduler.on_success()
+                return message
+            except Exception as error:
+                self._on_error(error, attempt)
+            finally:
+                self.scheduler.release(tokens, used)
+
+    @override
+    async def _ainvoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        priority = kwargs.pop('priority', 0)
+        tokens = _estimate_tokens(prompt, **kwargs)
+        for attempt in itertools.count():
+            await self.scheduler.aacquire(tokens, priority)
+            used: Optional[int] = None
+            try:
+                message = await self.generator.ainvoke(prompt, **kwargs)
+                used = _used_tokens(message, used)
+                self.scheduler.on_success()
+                return message
+            except Exception as error:
+                self._on_error(error, attempt)
+            finally:
+                self.scheduler.release(tokens, used)
+
+    @override
+    def _stream(self, prompt: ChatPrompt, **kwargs) -> Iterator[BaseMessage]:
+        priority = kwargs.pop('priority', 0)
+        tokens = _estimate_tokens(prompt, **kwargs)
+        for attempt in itertools.count():
+            self.scheduler.acquire(tokens, priority)
+            used: Optional[int] = None
+            started = False
+            try:
+                for chunk in self.generator.stream(prompt, **kwargs):
+                    started = True
+                    used = _used_tokens(chunk, used)
+                    yield chunk
+                self.scheduler.on_success()
+                return
+            except Exception as error:
+                if started:
+                    raise
+                self._on_error(error, attempt)
+            finally:
+                self.scheduler.release(tokens, used)
+
+    @override
+    async def _astream(self, prompt: ChatPrompt, **kwargs) -> AsyncIterator[BaseMessage]:
+        priority = kwargs.pop('priority', 0)
+        tokens = _estimate_tokens(prompt, **kwargs)
+        for attempt in itertools.count():
+            await self.scheduler.aacquire(tokens, priority)
+            used: Optional[int] = None
+            started = False
+            try:
+                async for chunk in self.generator.astream(prompt, **kwargs):
+                    started = True
+                    used = _used_tokens(chunk, used)
+                    yield chunk
+                self.scheduler.on_success()
+                return
+            except Exception as error:
+                if started:
+                    raise
+                self._on_error(error, attempt)
+            finally:
+                self.scheduler.release(tokens, used)
+
+    @override
+    def _on_generation(self, prompt: ChatPrompt, message: BaseMessage, metrics: GenerationMetrics) -> None:
+        """
+        Usage is recorded by the wrapped generator, so only calls that reach it are counted.
+        """
+        pass
+
+    def _on_error(self, error: Exception, attempt: int) -> None:
+        if not _is_rate_limited(error) or attempt >= self.max_retries:
+            raise error
+        self.scheduler.on_rate_limited(_retry_after(error))
+
+def _estimate_tokens(prompt: ChatPrompt, **kwargs) -> int:
+    return sum(count_message_tokens(message) for message in prompt.messages) + (kwargs.get('max_tokens') or 0)
+
+def _used_tokens(message: BaseMessage, used: Optional[int]) -> Optional[int]:
+    usage = getattr(message, 'usage_metadata', None)
+    if not usage:
+        return used
+    return (used or 0) + usage['total_tokens']
+
+def _is_rate_limited(error: Exception) -> bool:
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return status == 429 or type(error).__name__ == 'RateLimitError'
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers: Any = getattr(getattr(error, 'response', None), 'headers', None)
+    try:
+        return float(headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
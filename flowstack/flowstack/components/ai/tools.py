@@ -0,0 +1,220 @@
+import asyncio
+from concurrent.futures import Executor, Future
+import json
+import logging
+from typing import Any, AsyncIterator, Iterator, Optional, Union, override
+
+from pydantic import Field
+
+from flowstack.artifacts import Artifact
+from flowstack.core import Component, ComponentLike, coerce_to_component
+from flowstack.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from flowstack.typing import InvalidToolCall, ToolCall, ToolCallChunk
+from flowstack.utils.threading import gather_with_concurrency, gated_coroutine, get_executor
+
+logger = logging.getLogger(__name__)
+
+class ToolExecutor(Component[AIMessage, list[ToolMessage]]):
+    """
+    Runs the tool calls of an AIMessage concurrently and returns their ToolMessages in call order.
+    When transforming a stream of AIMessageChunks, each call starts as soon as its arguments are complete.
+    """
+
+    tools: dict[str, Component] = Field(default_factory=dict)
+    max_concurrency: Optional[int] = None
+    handle_errors: bool = True
+
+    def __init__(
+        self,
+        tools: dict[str, ComponentLike],
+        max_concurrency: Optional[int] = None,
+        handle_errors: bool = True,
+        name: Optional[str] = None
+    ):
+        super().__init__(
+            tools={name: coerce_to_component(tool) for name, tool in tools.items()},
+            max_concurrency=max_concurrency,
+            handle_errors=handle_errors,
+            name=name
+        )
+
+    @override
+    def invoke(self, message: AIMessage, **kwargs) -> list[ToolMessage]:
+        calls = _tool_calls(message)
+        if len(calls) <= 1:
+            return [self._run(call, **kwargs) for call in calls]
+        with get_executor(max_workers=self.max_concurrency) as executor:
+            futures = [executor.submit(self._run, call, **kwargs) for call in calls]
+            return [future.result() for future in futures]
+
+    @override
+    async def ainvoke(self, message: AIMessage, **kwargs) -> list[ToolMessage]:
+        return await gather_with_concurrency(
+            self.max_concurrency,
+            *(self._arun(call, **kwargs) for call in _tool_calls(message))
+        )
+
+    @override
+    def transform(self, messages: Iterator[AIMessage], **kwargs) -> Iterator[list[ToolMessage]]:
+        assembler = _ToolCallAssembler()
+        pending: list[Future[ToolMessage]] = []
+        with get_executor(max_workers=self.max_concurrency) as executor:
+            for message in messages:
+                pending.extend(self._submit(executor, call, **kwargs) for call in assembler.add(message))
+                while pending and pending[0].done():
+                    yield [pending.pop(0).result()]
+            pending.extend(self._submit(executor, call, **kwargs) for call in assembler.finish())
+            for future in pending:
+                yield [future.result()]
+
+    @override
+    async def atransform(self, messages: AsyncIterator[AIMessage], **kwargs) -> AsyncIterator[list[ToolMessage]]:
+        assembler = _ToolCallAssembler()
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        pending: list[asyncio.Task[ToolMessage]] = []
+        def start(call: Union[ToolCall, InvalidToolCall]) -> asyncio.Task[ToolMessage]:
+            coro = self._arun(call, **kwargs)
+            return asyncio.create_task(gated_coroutine(semaphore, coro) if semaphore else coro)
+        try:
+            async for message in messages:
+                pending.extend(start(call) for call in assembler.add(message))
+                while pending and pending[0].done():
+                    yield [pending.pop(0).result()]
+            pending.extend(start(call) for call in assembler.finish())
+            while pending:
+                yield [await pending.pop(0)]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @override
+    def stream(self, message: AIMessage, **kwargs) -> Iterator[list[ToolMessage]]:
+        yield from self.transform(iter([message]), **kwargs)
+
+    @override
+    async def astream(self, message: AIMessage, **kwargs) -> AsyncIterator[list[ToolMessage]]:
+        async def messages() -> AsyncIterator[AIMessage]:
+            yield message
+        async for chunk in self.atransform(messages(), **kwargs):
+            yield chunk
+
+    def _submit(
+        self,
+        executor: Executor,
+        call: Union[ToolCall, InvalidToolCall],
+        **kwargs
+    ) -> Future[ToolMessage]:
+        return executor.submit(self._run, call, **kwargs)
+
+    def _run(self, call: Union[ToolCall, InvalidToolCall], **kwargs) -> ToolMessage:
+        try:
+            tool = self._get_tool(call)
+            return _to_tool_message(call, tool.invoke(call['args'], **kwargs))
+        except Exception as error:
+            return self._on_error(call, error)
+
+    async def _arun(self, call: Union[ToolCall, InvalidToolCall], **kwargs) -> ToolMessage:
+        try:
+            tool = self._get_tool(call)
+            return _to_tool_message(call, await tool.ainvoke(call['args'], **kwargs))
+        except Exception as error:
+            return self._on_error(call, error)
+
+    def _get_tool(self, call: Union[ToolCall, InvalidToolCall]) -> Component:
+        if 'error' in call:
+            raise ValueError(f'Invalid tool call {call.get('name')}: {call['error']}')
+        if call['name'] not in self.tools:
+            raise ValueError(f'Unknown tool {call['name']}.')
+        return self.tools[call['name']]
+
+    def _on_error(self, call: Union[ToolCall, InvalidToolCall], error: Exception) -> ToolMessage:
+        if not self.handle_errors:
+            raise error
+        logger.info(f'> Tool call {call.get('name')} ({call.get('id')}) failed: {error!r}')
+        return ToolMessage(
+            f'Error: {error}',
+            metadata={'status': 'error'},
+            tool_call_id=call.get('id')
+        )
+
+class _ToolCallAssembler:
+    """
+    Accumulates streamed tool call chunks by index and releases each call once its arguments are complete.
+    """
+
+    def __init__(self):
+        self.chunks: dict[int, ToolCallChunk] = {}
+        self.released: set[int] = set()
+        self.position = 0
+
+    def add(self, message: BaseMessage) -> list[Union[ToolCall, InvalidToolCall]]:
+        if not isinstance(message, AIMessageChunk):
+            calls = _tool_calls(message)
+            self.position += len(calls)
+            return calls
+        for tool_call_chunk in message.tool_call_chunks:
+            index = tool_call_chunk.get('index')
+            if index is None:
+                index = self.position
+                self.position += 1
+            current = self.chunks.setdefault(index, ToolCallChunk())
+            for field in ('name', 'args', 'id'):
+                value = tool_call_chunk.get(field)
+                if value is not None:
+                    current[field] = value if field == 'id' else (current.get(field) or '') + value
+        return self._release(final=False)
+
+    def finish(self) -> list[Union[ToolCall, InvalidToolCall]]:
+        return self._release(final=True)
+
+    def _release(self, final: bool) -> list[Union[ToolCall, InvalidToolCall]]:
+        calls = []
+        for index in sorted(self.chunks):
+            if index in self.released:
+                continue
+            call = _parse_tool_call_chunk(self.chunks[index], final=final)
+            if call is None:
+                continue
+            self.released.add(index)
+            calls.append(call)
+        return calls
+
+def _tool_calls(message: AIMessage) -> list[Union[ToolCall, InvalidToolCall]]:
+    calls: list[Union[ToolCall, InvalidToolCall]] = [*message.tool_calls, *message.invalid_tool_calls]
+    if not calls and isinstance(message, AIMessageChunk):
+        calls = [_parse_tool_call_chunk(chunk, final=True) for chunk in message.tool_call_chunks]
+    return calls
+
+def _parse_tool_call_chunk(chunk: ToolCallChunk, final: bool) -> Optional[Union[ToolCall, InvalidToolCall]]:
+    """
+    Parses a tool call once its arguments form a complete JSON object.
+    Returns None while the arguments are still streaming, or an InvalidToolCall if they never complete.
+    """
+    args = chunk.get('args') or ''
+    if not final and not args.rstrip().endswith('}'):
+        return None
+    try:
+        parsed = json.loads(args) if args.strip() else {}
+        if not isinstance(parsed, dict):
+            raise ValueError(f'Expected a JSON object, got {type(parsed).__name__}.')
+        if not chunk.get('name'):
+            raise ValueError('Missing tool name.')
+        return ToolCall(name=chunk['name'], args=parsed, id=chunk.get('id'))
+    except ValueError as error:
+        if not final:
+            return None
+        return InvalidToolCall(
+            name=chunk.get('name'),
+            args=chunk.get('args'),
+            id=chunk.get('id'),
+            error=str(error)
+        )
+
+def _to_tool_message(call: ToolCall, result: Any) -> ToolMessage:
+    if isinstance(result, ToolMessage):
+        return result
+    if not isinstance(result, (str, Artifact)) and not (
+        isinstance(result, list) and all(isinstance(value, (str, Artifact)) for value in result)
+    ):
+        result = json.dumps(result, default=str, ensure_ascii=False)
+    return ToolMessage(result, tool_call_id=call.get('id'))
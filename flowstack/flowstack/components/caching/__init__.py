@@ -0,0 +1 @@
+from .chat_cache import ChatCacheKey, ChatCache, CachedChatGenerator
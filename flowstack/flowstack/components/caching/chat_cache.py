@@ -0,0 +1,284 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, NamedTuple, Optional, override
+
+import numpy as np
+
+from flowstack.artifacts import Text, Utf8Artifact
+from flowstack.components.ai.chat_generator import BaseChatGenerator, ChatPrompt
+from flowstack.components.ai.embedder import Embedder
+from flowstack.messages import AIMessage, BaseMessage, ToolMessage, merge_message_chunks
+from flowstack.typing import Embedding, GenerationMetrics
+from flowstack.utils.string import type_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+class ChatCacheKey(NamedTuple):
+    """
+    Digest of a prompt's messages and generation kwargs. Prompts that differ only in their
+    current (last) message share a prefix, which scopes semantic matching.
+    """
+    prefix: str
+    digest: str
+
+@dataclass
+class _CacheEntry:
+    prefix: str
+    chunks: list[BaseMessage]
+    expires_at: Optional[float]
+    embedding: Optional[Embedding] = None
+
+class ChatCache:
+    """
+    Thread-safe LRU cache of chat responses with an optional TTL.
+    When an embedder is set, misses fall back to the most similar cached prompt with the same prefix.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = DEFAULT_CACHE_SIZE,
+        ttl: Optional[float] = None,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._prefixes: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, prompt: ChatPrompt, namespace: str = '', **kwargs) -> ChatCacheKey:
+        digest = hashlib.sha256(namespace.encode('utf-8'))
+        digest.update(_normalize_kwargs(kwargs).encode('utf-8'))
+        normalized = prompt.render('chat_cache', _normalize_message)
+        for message in normalized[:-1]:
+            digest.update(message)
+        prefix = digest.hexdigest()
+        digest.update(normalized[-1])
+        return ChatCacheKey(prefix=prefix, digest=digest.hexdigest())
+
+    def get(self, key: ChatCacheKey) -> Optional[list[BaseMessage]]:
+        with self._lock:
+            entry = self._lookup(key.digest)
+            return _copy_chunks(entry.chunks) if entry else None
+
+    def get_similar(self, key: ChatCacheKey, embedding: Embedding) -> Optional[list[BaseMessage]]:
+        """
+        Returns the chunks of the most similar cached prompt with the same prefix, if it clears the threshold.
+        """
+        with self._lock:
+            entry = self._similar(key.prefix, embedding)
+            return _copy_chunks(entry.chunks) if entry else None
+
+    def put(
+        self,
+        key: ChatCacheKey,
+        chunks: list[BaseMessage],
+        embedding: Optional[Embedding] = None
+    ) -> None:
+        """
+        Stores copies of the chunks, and get returns fresh copies, so callers can mutate them freely.
+        """
+        entry = _CacheEntry(
+            prefix=key.prefix,
+            chunks=_copy_chunks(chunks),
+            expires_at=time.monotonic() + self.ttl if self.ttl is not None else None,
+            embedding=_normalize_embedding(embedding) if embedding is not None else None
+        )
+        with self._lock:
+            self._remove(key.digest)
+            self._entries[key.digest] = entry
+            self._prefixes.setdefault(key.prefix, set()).add(key.digest)
+            while self.max_size is not None and len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._prefixes.clear()
+
+    def embed(self, prompt: ChatPrompt) -> Optional[Embedding]:
+        if self.embedder is None:
+            return None
+        return self.embedder.invoke([Text(_normalize_text(str(prompt.current)))])[0].embedding
+
+    async def aembed(self, prompt: ChatPrompt) -> Optional[Embedding]:
+        if self.embedder is None:
+            return None
+        return (await self.embedder.ainvoke([Text(_normalize_text(str(prompt.current)))]))[0].embedding
+
+    def _lookup(self, digest: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(digest)
+            return None
+        self._entries.move_to_end(digest)
+        return entry
+
+    def _similar(self, prefix: str, embedding: Embedding) -> Optional[_CacheEntry]:
+        query = _normalize_embedding(embedding)
+        best: Optional[str] = None
+        best_score = self.similarity_threshold
+        for digest in list(self._prefixes.get(prefix, ())):
+            entry = self._lookup(digest)
+            if entry is None or entry.embedding is None:
+                continue
+            score = float(np.dot(entry.embedding, query))
+            if score >= best_score:
+                best, best_score = digest, score
+        if best is None:
+            return None
+        logger.debug(f'> Semantic cache hit with similarity {best_score:.4f}.')
+        return self._entries[best]
+
+    def _remove(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        digests = self._prefixes.get(entry.prefix)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._prefixes[entry.prefix]
+
+class CachedChatGenerator(BaseChatGenerator):
+    """
+    Chat generator that answers repeated prompts from a ChatCache and replays cached responses when streaming.
+    Entries are scoped by namespace, which defaults to the wrapped generator's type and a digest of its configuration.
+    """
+
+    generator: BaseChatGenerator
+    cache: ChatCache
+    namespace: str
+
+    def __init__(
+        self,
+        generator: BaseChatGenerator,
+        cache: Optional[ChatCache] = None,
+        namespace: Optional[str] = None,
+        name: Optional[str] = None
+    ):
+        super().__init__(
+            generator=generator,
+            cache=cache if cache is not None else ChatCache(),
+            namespace=namespace if namespace is not None else _generator_namespace(generator),
+            name=name
+        )
+
+    @override
+    def _invoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        key, chunks, embedding = self._lookup(prompt, **kwargs)
+        if chunks is not None:
+            return merge_message_chunks(chunks)
+        message = self.generator.invoke(prompt, **kwargs)
+        self.cache.put(key, [message], embedding=embedding)
+        return message
+
+    @override
+    async def _ainvoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        key, chunks, embedding = await self._alookup(prompt, **kwargs)
+        if chunks is not None:
+            return merge_message_chunks(chunks)
+        message = await self.generator.ainvoke(prompt, **kwargs)
+        self.cache.put(key, [message], embedding=embedding)
+        return message
+
+    @override
+    def _stream(self, prompt: ChatPrompt, **kwargs) -> Iterator[BaseMessage]:
+        key, chunks, embedding = self._lookup(prompt, **kwargs)
+        if chunks is not None:
+            yield from chunks
+            return
+        chunks = []
+        for chunk in self.generator.stream(prompt, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            self.cache.put(key, chunks, embedding=embedding)
+
+    @override
+    async def _astream(self, prompt: ChatPrompt, **kwargs) -> AsyncIterator[BaseMessage]:
+        key, chunks, embedding = await self._alookup(prompt, **kwargs)
+        if chunks is not None:
+            for chunk in chunks:
+                yield chunk
+            return
+        chunks = []
+        async for chunk in self.generator.astream(prompt, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            self.cache.put(key, chunks, embedding=embedding)
+
+    @override
+    def _on_generation(self, prompt: ChatPrompt, message: BaseMessage, metrics: GenerationMetrics) -> None:
+        """
+        Usage is recorded by the wrapped generator, so only calls that reach it are counted.
+        """
+        pass
+
+    def _lookup(self, prompt: ChatPrompt, **kwargs) -> tuple[ChatCacheKey, Optional[list[BaseMessage]], Optional[Embedding]]:
+        key = self._key(prompt, **kwargs)
+        chunks = self.cache.get(key)
+        if chunks is not None or self.cache.embedder is None:
+            return key, chunks, None
+        embedding = self.cache.embed(prompt)
+        return key, self.cache.get_similar(key, embedding), embedding
+
+    async def _alookup(self, prompt: ChatPrompt, **kwargs) -> tuple[ChatCacheKey, Optional[list[BaseMessage]], Optional[Embedding]]:
+        key = self._key(prompt, **kwargs)
+        chunks = self.cache.get(key)
+        if chunks is not None or self.cache.embedder is None:
+            return key, chunks, None
+        embedding = await self.cache.aembed(prompt)
+        return key, self.cache.get_similar(key, embedding), embedding
+
+    def _key(self, prompt: ChatPrompt, **kwargs) -> ChatCacheKey:
+        return self.cache.key(prompt, namespace=self.namespace, **kwargs)
+
+def _generator_namespace(generator: BaseChatGenerator) -> str:
+    config = json.dumps(generator.model_dump(exclude={'name'}), sort_keys=True, default=str, ensure_ascii=False)
+    digest = hashlib.sha256(config.encode('utf-8')).hexdigest()
+    return f'{type_name(type(generator))}:{digest}'
+
+def _normalize_message(message: BaseMessage) -> bytes:
+    normalized: list[Any] = [message.message_type, [_normalize_artifact(artifact) for artifact in message.content]]
+    if isinstance(message, AIMessage):
+        normalized.extend([message.tool_calls, message.invalid_tool_calls])
+    elif isinstance(message, ToolMessage):
+        normalized.append(message.tool_call_id)
+    return json.dumps(normalized, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+
+def _normalize_artifact(artifact: Any) -> list[str]:
+    if isinstance(artifact, Utf8Artifact):
+        return [type_name(type(artifact)), _normalize_text(str(artifact))]
+    return [type_name(type(artifact)), str(artifact.id)]
+
+def _copy_chunks(chunks: list[BaseMessage]) -> list[BaseMessage]:
+    return [chunk.model_copy(deep=True) for chunk in chunks]
+
+def _normalize_text(text: str) -> str:
+    return '\n'.join(line.rstrip() for line in text.strip().splitlines())
+
+def _normalize_kwargs(kwargs: dict[str, Any]) -> str:
+    return json.dumps(kwargs, sort_keys=True, default=str, ensure_ascii=False)
+
+def _normalize_embedding(embedding: Embedding) -> Embedding:
+    embedding = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(embedding)
+    return embedding / norm if norm > 0 else embedding
@@ -1,23 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Iterator, Union, final, override
+from typing import AsyncIterator, Iterator, Optional, Union, final, override
 
-from flowstack.artifacts import Artifact
+from flowstack.artifacts import Artifact, Text
 from flowstack.core import Component
-from flowstack.utils.threading import run_async
+from flowstack.utils.threading import gather_with_concurrency, get_executor, run_async, run_async_iter
 
 RetrieverInput = Union[str, Artifact]
 Retriever = Component[RetrieverInput, list[Artifact]]
 
 class BaseRetriever(Retriever, ABC):
     """
-    Base retriever.
+    Base retriever. Queries are coerced to artifacts once in the public methods,
+    so integrations only implement the protected hooks. Retrievers that page or query several sources
+    override _stream to yield the results of each one as soon as they arrive;
+    unless _astream is overridden too, the async stream iterates _stream in a worker thread.
     """
 
     # Sync
 
     @final
     def invoke(self, query: RetrieverInput, **kwargs) -> list[Artifact]:
-        pass
+        return self._invoke(_to_query(query), **kwargs)
 
     @abstractmethod
     def _invoke(self, query: Artifact, **kwargs) -> list[Artifact]:
@@ -28,7 +31,7 @@ class BaseRetriever(Retriever, ABC):
     @final
     @override
     async def ainvoke(self, query: RetrieverInput, **kwargs) -> list[Artifact]:
-        pass
+        return await self._ainvoke(_to_query(query), **kwargs)
 
     async def _ainvoke(self, query: Artifact, **kwargs) -> list[Artifact]:
         return await run_async(self._invoke, query, **kwargs)
@@ -38,37 +41,94 @@ class BaseRetriever(Retriever, ABC):
     @final
     @override
     def stream(self, query: RetrieverInput, **kwargs) -> Iterator[list[Artifact]]:
-        pass
+        yield from self._stream(_to_query(query), **kwargs)
 
     def _stream(self, query: Artifact, **kwargs) -> Iterator[list[Artifact]]:
-        pass
+        yield self._invoke(query, **kwargs)
 
     # Async Stream
 
     @final
     @override
     async def astream(self, query: RetrieverInput, **kwargs) -> AsyncIterator[list[Artifact]]:
-        pass
+        async for artifacts in self._astream(_to_query(query), **kwargs):
+            yield artifacts
 
     async def _astream(self, query: Artifact, **kwargs) -> AsyncIterator[list[Artifact]]:
-        pass
+        if type(self)._stream is BaseRetriever._stream:
+            yield await self._ainvoke(query, **kwargs)
+            return
+        async for artifacts in run_async_iter(self._stream, query, **kwargs):
+            yield artifacts
 
     # Transform
 
     @final
     @override
     def transform(self, queries: Iterator[RetrieverInput], **kwargs) -> Iterator[list[Artifact]]:
-        pass
+        yield from self._transform((_to_query(query) for query in queries), **kwargs)
 
     def _transform(self, queries: Iterator[Artifact], **kwargs) -> Iterator[list[Artifact]]:
-        pass
+        for query in queries:
+            yield from self._stream(query, **kwargs)
 
     # Async Transform
 
     @final
     @override
     async def atransform(self, queries: AsyncIterator[RetrieverInput], **kwargs) -> AsyncIterator[list[Artifact]]:
-        pass
+        async def _queries() -> AsyncIterator[Artifact]:
+            async for query in queries:
+                yield _to_query(query)
+        async for artifacts in self._atransform(_queries(), **kwargs):
+            yield artifacts
 
     async def _atransform(self, queries: AsyncIterator[Artifact], **kwargs) -> AsyncIterator[list[Artifact]]:
-        pass
\ No newline at end of file
+        async for query in queries:
+            async for artifacts in self._astream(query, **kwargs):
+                yield artifacts
+
+    # Batch
+
+    @final
+    def retrieve_many(
+        self,
+        queries: list[RetrieverInput],
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> list[list[Artifact]]:
+        return self._batch([_to_query(query) for query in queries], max_concurrency=max_concurrency, **kwargs)
+
+    def _batch(
+        self,
+        queries: list[Artifact],
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> list[list[Artifact]]:
+        if len(queries) <= 1:
+            return [self._invoke(query, **kwargs) for query in queries]
+        with get_executor(max_workers=max_concurrency) as executor:
+            return list(executor.map(lambda query: self._invoke(query, **kwargs), queries))
+
+    @final
+    async def aretrieve_many(
+        self,
+        queries: list[RetrieverInput],
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> list[list[Artifact]]:
+        return await self._abatch([_to_query(query) for query in queries], max_concurrency=max_concurrency, **kwargs)
+
+    async def _abatch(
+        self,
+        queries: list[Artifact],
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> list[list[Artifact]]:
+        return await gather_with_concurrency(
+            max_concurrency,
+            *(self._ainvoke(query, **kwargs) for query in queries)
+        )
+
+def _to_query(query: RetrieverInput) -> Artifact:
+    return Text(query) if isinstance(query, str) else query
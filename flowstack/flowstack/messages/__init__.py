@@ -1,5 +1,5 @@
 from .base import MessageValue, MessageContent, MessageType, BaseMessage
 from .human import HumanMessage
 from .system import SystemMessage
-from .ai import AIMessage
+from .ai import AIMessage, AIMessageChunk, merge_message_chunks
 from .tool import ToolMessage
\ No newline at end of file
@@ -1,9 +1,16 @@
-from typing import Any, Literal
+from typing import Any, Literal, Optional, Self, Sequence
 
+from pydantic import Field
+
+from flowstack.artifacts import Artifact, Text
 from flowstack.messages import BaseMessage, MessageContent, MessageType
+from flowstack.typing import AddableDict, InvalidToolCall, ToolCall, ToolCallChunk, UsageMetadata
 
 class AIMessage(BaseMessage):
     message_type: Literal[MessageType.AI]
+    tool_calls: list[ToolCall] = Field(default_factory=list)
+    invalid_tool_calls: list[InvalidToolCall] = Field(default_factory=list)
+    usage_metadata: Optional[UsageMetadata] = None
 
     def __init__(
         self,
@@ -16,4 +23,97 @@ class AIMessage(BaseMessage):
             content=content,
             metadata=metadata,
             **kwargs
-        )
\ No newline at end of file
+        )
+
+class AIMessageChunk(AIMessage):
+    """
+    Incremental piece of an AIMessage produced while streaming. Chunks are Addable.
+    """
+
+    tool_call_chunks: list[ToolCallChunk] = Field(default_factory=list)
+
+    def __init__(
+        self,
+        content: MessageContent = [],
+        metadata: dict[str, Any] = {},
+        tool_call_chunks: list[ToolCallChunk] = [],
+        usage_metadata: Optional[UsageMetadata] = None,
+        **kwargs
+    ):
+        super().__init__(
+            content=content,
+            metadata=metadata,
+            tool_call_chunks=tool_call_chunks,
+            usage_metadata=usage_metadata,
+            **kwargs
+        )
+
+    def __add__(self, other: Self) -> Self:
+        return merge_message_chunks([self, other])
+
+def merge_message_chunks(chunks: Sequence[BaseMessage]) -> BaseMessage:
+    """
+    Merges streamed chunks in a single pass, instead of adding them pairwise.
+    """
+    if not chunks:
+        raise ValueError('Cannot merge an empty sequence of message chunks.')
+    if len(chunks) == 1:
+        return chunks[0]
+    update: dict[str, Any] = {
+        'content': _merge_content(chunks),
+        'metadata': dict(sum((AddableDict(chunk.metadata) for chunk in chunks), AddableDict()))
+    }
+    if all(isinstance(chunk, AIMessageChunk) for chunk in chunks):
+        update['tool_call_chunks'] = _merge_tool_call_chunks(chunks)
+        update['usage_metadata'] = _merge_usage_metadata(chunks)
+    return chunks[0].model_copy(update=update)
+
+def _merge_content(chunks: Sequence[BaseMessage]) -> list[Artifact]:
+    content: list[Artifact] = []
+    texts: list[str] = []
+    for chunk in chunks:
+        for position, artifact in enumerate(chunk.content):
+            if position == 0 and texts and type(artifact) is Text:
+                texts.append(artifact.content)
+                continue
+            _flush_texts(content, texts)
+            content.append(artifact)
+        if chunk.content and not texts and type(content[-1]) is Text:
+            texts.append(content[-1].content)
+    _flush_texts(content, texts)
+    return content
+
+def _flush_texts(content: list[Artifact], texts: list[str]) -> None:
+    if len(texts) > 1:
+        content[-1] = content[-1].model_copy(update={'content': ''.join(texts)})
+    texts.clear()
+
+def _merge_tool_call_chunks(chunks: Sequence[AIMessageChunk]) -> list[ToolCallChunk]:
+    merged: dict[Any, ToolCallChunk] = {}
+    for position, tool_call_chunk in enumerate(
+        tool_call_chunk
+        for chunk in chunks
+        for tool_call_chunk in chunk.tool_call_chunks
+    ):
+        index = tool_call_chunk.get('index')
+        key = index if index is not None else ('position', position)
+        if key not in merged:
+            merged[key] = ToolCallChunk(**tool_call_chunk)
+            continue
+        current = merged[key]
+        for field in ('name', 'args', 'id'):
+            value = tool_call_chunk.get(field)
+            if value is None:
+                continue
+            current[field] = value if current.get(field) is None or field == 'id' else current[field] + value
+    return list(merged.values())
+
+def _merge_usage_metadata(chunks: Sequence[AIMessageChunk]) -> Optional[UsageMetadata]:
+    usages = [chunk.usage_metadata for chunk in chunks if chunk.usage_metadata]
+    if not usages:
+        return None
+    return UsageMetadata(
+        prompt_tokens=sum(usage.get('prompt_tokens', 0) for usage in usages),
+        completion_tokens=sum(usage.get('completion_tokens', 0) for usage in usages),
+        total_tokens=sum(usage.get('total_tokens', 0) for usage in usages)
+    )
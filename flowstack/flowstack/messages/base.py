@@ -1,8 +1,8 @@
 from abc import ABC
 from enum import StrEnum
-from typing import Any, Union
+from typing import Any, Callable, Optional, Self, Union, override
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from flowstack.artifacts import Artifact, Text
 from flowstack.typing import Serializable
@@ -20,6 +20,7 @@ class BaseMessage(Serializable, ABC):
     message_type: str
     content: list[Artifact]
     metadata: dict[str, Any] = Field(default_factory=dict)
+    _cache: dict[str, Any] = PrivateAttr(default_factory=dict)
 
     def __init__(
         self,
@@ -38,6 +39,27 @@ class BaseMessage(Serializable, ABC):
     def __str__(self) -> str:
         return '\n\n'.join(str(artifact) for artifact in self.content)
 
+    def cached[T](self, key: str, compute: Callable[[Self], T]) -> T:
+        """
+        Memoizes a value derived from this message, such as a rendered provider payload.
+        Messages are treated as immutable once values are cached.
+        """
+        if key not in self._cache:
+            self._cache[key] = compute(self)
+        return self._cache[key]
+
+    def get_cached(self, key: str, default: Any = None) -> Any:
+        return self._cache.get(key, default)
+
+    @override
+    def model_copy(self, *, update: Optional[dict[str, Any]] = None, deep: bool = False) -> Self:
+        copy = super().model_copy(update=update, deep=deep)
+        copy._cache = {}
+        return copy
+
 def _to_artifacts(content: MessageContent) -> list[Artifact]:
-    content = [content] if not isinstance(content, list) else content
+    if isinstance(content, str):
+        return [Text(content)]
+    if not isinstance(content, list):
+        return [content]
     return [Text(value) if isinstance(value, str) else value for value in content]
\ No newline at end of file
@@ -1,19 +1,22 @@
-from typing import Any, Literal
+from typing import Any, Literal, Optional
 
 from flowstack.messages import BaseMessage, MessageContent, MessageType
 
 class ToolMessage(BaseMessage):
     message_type: Literal[MessageType.TOOL]
+    tool_call_id: Optional[str] = None
 
     def __init__(
         self,
         content: MessageContent,
         metadata: dict[str, Any] = {},
+        tool_call_id: Optional[str] = None,
         **kwargs
     ):
         super().__init__(
             message_type=MessageType.TOOL,
             content=content,
             metadata=metadata,
+            tool_call_id=tool_call_id,
             **kwargs
         )
\ No newline at end of file
@@ -1,8 +1,14 @@
 from typing import Union
 
 from flowstack.messages import BaseMessage, HumanMessage, MessageContent
+from flowstack.utils.string import count_tokens
 
-def coerce_to_messages(content: Union[MessageContent, list[BaseMessage]]) -> list[BaseMessage]:
-    if isinstance(content, list) and isinstance(content[0], BaseMessage):
+def coerce_to_messages(content: Union[MessageContent, BaseMessage, list[BaseMessage]]) -> list[BaseMessage]:
+    if isinstance(content, BaseMessage):
+        return [content]
+    if isinstance(content, list) and content and isinstance(content[0], BaseMessage):
         return content
-    return [HumanMessage(content)]
\ No newline at end of file
+    return [HumanMessage(content)]
+
+def count_message_tokens(message: BaseMessage) -> int:
+    return message.cached('tokens', lambda value: count_tokens([value]))
\ No newline at end of file
@@ -7,6 +7,8 @@ from .types import (
     GraphTriplet,
     Graph
 )
+from .compact import CompactGraph
+from .snapshot import SNAPSHOT_VERSION, MAX_SNAPSHOT_SEGMENTS, is_snapshot, load_snapshot, save_snapshot
 from .filtering import GraphNodeQuery, GraphTripletQuery
 from .base import GraphStore
 from .simple import SimpleGraphStore
\ No newline at end of file
@@ -1,13 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Unpack
+from typing import Any, AsyncIterator, Iterator, Optional, Unpack
 
 import fsspec
 
-from flowstack.artifacts import Artifact, ArtifactRelationship
-from flowstack.stores import ChunkNode, GraphNode, GraphNodeQuery, GraphRelation, GraphTriplet, GraphTripletQuery, VectorStoreQuery
+from flowstack.artifacts import Artifact
+from flowstack.stores.graph.filtering import GraphNodeQuery, GraphTripletQuery
+from flowstack.stores.graph.types import ChunkNode, GraphNode, GraphRelation, GraphTriplet
+from flowstack.stores.vector.typing import VectorStoreQuery
 from flowstack.typing import Embedding
 from flowstack.utils.constants import GRAPH_TRIPLET_SOURCE_KEY
-from flowstack.utils.threading import run_async
+from flowstack.utils.threading import gather_with_concurrency, run_async
 
 class GraphStore(ABC):
     @property
@@ -90,6 +92,17 @@ class GraphStore(ABC):
     async def aget_triplets(self, **query: Unpack[GraphTripletQuery]) -> list[GraphTriplet]:
         pass
 
+    def iter_triplets(self, **query: Unpack[GraphTripletQuery]) -> Iterator[GraphTriplet]:
+        """
+        Streams the triplets matching query. Backends override this to page
+        through results instead of materializing them all.
+        """
+        yield from self.get_triplets(**query)
+
+    async def aiter_triplets(self, **query: Unpack[GraphTripletQuery]) -> AsyncIterator[GraphTriplet]:
+        for triplet in await self.aget_triplets(**query):
+            yield triplet
+
     @abstractmethod
     def get_rel_map(
         self,
@@ -141,12 +154,21 @@ class GraphStore(ABC):
         pass
 
     def upsert_triplet(self, triplet: GraphTriplet, **kwargs) -> None:
-        self.upsert_nodes([triplet.subject, triplet.obj], **kwargs)
-        self.upsert_relations([triplet.relation], **kwargs)
+        self.upsert_triplets([triplet], **kwargs)
 
     async def aupsert_triplet(self, triplet: GraphTriplet, **kwargs) -> None:
-        await self.aupsert_nodes([triplet.subject, triplet.obj], **kwargs)
-        await self.aupsert_relations([triplet.relation], **kwargs)
+        await self.aupsert_triplets([triplet], **kwargs)
+
+    def upsert_triplets(self, triplets: list[GraphTriplet], **kwargs) -> None:
+        """
+        Upserts all nodes before all relations, so backends can batch each.
+        """
+        self.upsert_nodes(_triplet_nodes(triplets), **kwargs)
+        self.upsert_relations([triplet.relation for triplet in triplets], **kwargs)
+
+    async def aupsert_triplets(self, triplets: list[GraphTriplet], **kwargs) -> None:
+        await self.aupsert_nodes(_triplet_nodes(triplets), **kwargs)
+        await self.aupsert_relations([triplet.relation for triplet in triplets], **kwargs)
 
     @abstractmethod
     def delete(self, **query: Unpack[GraphNodeQuery]) -> None:
@@ -159,51 +181,91 @@ class GraphStore(ABC):
     def delete_artifacts(
         self,
         artifact_ids: Optional[list[str]] = None,
-        ref_artifact_ids: Optional[list[str]] = None
+        ref_artifact_ids: Optional[list[str]] = None,
+        **kwargs
     ) -> None:
-        nodes: list[GraphNode] = []
+        """
+        Detach-deletes the nodes of artifact_ids and ref_artifact_ids, the nodes
+        extracted from artifact_ids and the nodes whose ref is in ref_artifact_ids.
+        """
+        if artifact_ids or ref_artifact_ids:
+            self._delete_artifacts(artifact_ids or [], ref_artifact_ids or [], **kwargs)
 
+    async def adelete_artifacts(
+        self,
+        artifact_ids: Optional[list[str]] = None,
+        ref_artifact_ids: Optional[list[str]] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> None:
+        """
+        Like delete_artifacts, but if batch_size is given the ids are split into
+        sub-batches that are deleted concurrently, up to max_concurrency at once.
+        """
         artifact_ids = artifact_ids or []
-        for artifact_id in artifact_ids:
-            nodes.extend(self.get(properties={GRAPH_TRIPLET_SOURCE_KEY: artifact_id}))
+        ref_artifact_ids = ref_artifact_ids or []
+        size = max(len(artifact_ids), len(ref_artifact_ids))
+        if size == 0:
+            return
+        batch_size = batch_size or size
+        await gather_with_concurrency(
+            max_concurrency,
+            *(
+                self._adelete_artifacts(
+                    artifact_ids[i : i + batch_size],
+                    ref_artifact_ids[i : i + batch_size],
+                    **kwargs
+                )
+                for i in range(0, size, batch_size)
+            )
+        )
 
-        if len(artifact_ids) > 0:
-            nodes.extend(self.get(ids=artifact_ids))
+    def _delete_artifacts(
+        self,
+        artifact_ids: list[str],
+        ref_artifact_ids: list[str],
+        **kwargs
+    ) -> None:
+        """
+        Generic implementation on top of get and delete.
+        Backends override this with a single bulk removal.
+        """
+        nodes: list[GraphNode] = []
 
-        ref_artifact_ids = ref_artifact_ids or []
-        for ref_artifact_id in artifact_ids:
-            nodes.extend(self.get(properties={
-                'relationships': {ArtifactRelationship.REF: ref_artifact_id}
-            }))
+        if artifact_ids:
+            nodes.extend(self.get(property_values={GRAPH_TRIPLET_SOURCE_KEY: artifact_ids}))
+            nodes.extend(self.get(ids=artifact_ids))
 
-        if len(ref_artifact_ids) > 0:
+        if ref_artifact_ids:
+            nodes.extend(self.get(ref_ids=ref_artifact_ids))
             nodes.extend(self.get(ids=ref_artifact_ids))
 
         if len(nodes) > 0:
-            self.delete(ids=[node.id for node in nodes])
+            self.delete(ids=list({node.id for node in nodes}))
 
-    async def adelete_artifacts(
+    async def _adelete_artifacts(
         self,
-        artifact_ids: Optional[list[str]] = None,
-        ref_artifact_ids: Optional[list[str]] = None
+        artifact_ids: list[str],
+        ref_artifact_ids: list[str],
+        **kwargs
     ) -> None:
         nodes: list[GraphNode] = []
 
-        artifact_ids = artifact_ids or []
-        for artifact_id in artifact_ids:
-            nodes.extend(await self.aget(properties={GRAPH_TRIPLET_SOURCE_KEY: artifact_id}))
-
-        if len(artifact_ids) > 0:
+        if artifact_ids:
+            nodes.extend(await self.aget(property_values={GRAPH_TRIPLET_SOURCE_KEY: artifact_ids}))
             nodes.extend(await self.aget(ids=artifact_ids))
 
-        ref_artifact_ids = ref_artifact_ids or []
-        for ref_artifact_id in artifact_ids:
-            nodes.extend(await self.aget(properties={
-                'relationships': {ArtifactRelationship.REF: ref_artifact_id}
-            }))
-
-        if len(ref_artifact_ids) > 0:
+        if ref_artifact_ids:
+            nodes.extend(await self.aget(ref_ids=ref_artifact_ids))
             nodes.extend(await self.aget(ids=ref_artifact_ids))
 
         if len(nodes) > 0:
-            await self.adelete(ids=[node.id for node in nodes])
\ No newline at end of file
+            await self.adelete(ids=list({node.id for node in nodes}))
+
+def _triplet_nodes(triplets: list[GraphTriplet]) -> list[GraphNode]:
+    nodes: dict[str, GraphNode] = {}
+    for subject, _, obj in triplets:
+        nodes[subject.id] = subject
+        nodes[obj.id] = obj
+    return list(nodes.values())
@@ -0,0 +1,646 @@
+from array import array
+import json
+from typing import Any, Iterable, Iterator, Mapping, Optional, Type
+
+import numpy as np
+
+from flowstack.stores.graph.types import (
+    EntityNode,
+    Graph,
+    GraphNode,
+    GraphRelation,
+    GraphTriplet,
+    _discard,
+    _is_hashable,
+    _cosine_similarities,
+    _ref_id,
+    _relation_id,
+    _top_k
+)
+from flowstack.utils.constants import GRAPH_TRIPLET_SOURCE_KEY
+
+_NO_STRING = -1
+_MIN_DELTA = 1024
+_NODE_COMMON_FIELDS = {'label', 'properties', 'metadata', 'embedding'}
+
+_Triplet = tuple[str, str, str]
+
+class CompactGraph:
+    """
+    Memory-compact alternative to Graph for large knowledge graphs.
+
+    Ids and labels are interned into a string table, adjacency is kept as CSR
+    arrays over integer node positions, and node and relation fields are stored
+    column by column. GraphNode and GraphRelation objects are only built on read.
+    Writes made after the last CSR build go to small per-node delta lists, which
+    are folded back into the CSR arrays once they grow past a fraction of the graph.
+    """
+
+    def __init__(self, indexed_properties: Optional[list[str]] = None):
+        self.indexed_properties = (
+            indexed_properties
+            if indexed_properties is not None
+            else [GRAPH_TRIPLET_SOURCE_KEY]
+        )
+
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        self._types: list[Type[GraphNode]] = []
+
+        self._node_index: dict[str, int] = {}
+        self._node_ids = array('i')
+        self._node_types = array('b')
+        self._node_labels = array('i')
+        self._node_fields: dict[str, dict[int, Any]] = {}
+        self._node_properties: dict[str, dict[int, Any]] = {}
+        self._node_metadata: dict[int, dict[str, Any]] = {}
+        self._embeddings: Optional[np.ndarray] = None
+        # Row norms of _embeddings, computed on the first similarity search.
+        self._embedding_norms: Optional[np.ndarray] = None
+        self._has_embedding = array('b')
+
+        self._edge_index: dict[int, int] = {}
+        self._edge_subjects = array('i')
+        self._edge_objs = array('i')
+        self._edge_labels = array('i')
+        self._edge_alive = array('b')
+        self._edge_properties: dict[str, dict[int, Any]] = {}
+        self._edge_metadata: dict[int, dict[str, Any]] = {}
+
+        self._csr_nodes = 0
+        self._out_offsets = np.zeros(1, dtype=np.int64)
+        self._out_edges = np.empty(0, dtype=np.int32)
+        self._in_offsets = np.zeros(1, dtype=np.int64)
+        self._in_edges = np.empty(0, dtype=np.int32)
+        self._delta_out: dict[int, list[int]] = {}
+        self._delta_in: dict[int, list[int]] = {}
+        self._delta_size = 0
+
+        self._property_index: dict[str, dict[Any, set[int]]] = {}
+        self._ref_index: dict[str, set[int]] = {}
+
+        # Rows loaded from a snapshot keep their fields encoded until first read.
+        self._node_payloads: Optional[_Payloads] = None
+        self._edge_payloads: Optional[_Payloads] = None
+        # Rows written since the last snapshot, tracked once the graph has one.
+        self._dirty_nodes: Optional[set[int]] = None
+        self._dirty_edges: Optional[set[int]] = None
+        # Set by save_snapshot and load_snapshot.
+        self._snapshot: Optional[Any] = None
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> 'CompactGraph':
+        compact = cls(indexed_properties=list(graph.indexed_properties))
+        for node_id, node in graph.nodes.items():
+            compact._put_node(node_id, node)
+        for subject_id, relation_id, obj_id in graph.triplets:
+            compact._put_edge(subject_id, graph.relations[relation_id], obj_id)
+        compact.rebuild()
+        return compact
+
+    def to_graph(self) -> Graph:
+        graph = Graph(indexed_properties=list(self.indexed_properties))
+        for node_id in self._node_index:
+            graph.add_node(self.nodes[node_id])
+        for triplet in self.get_triplets():
+            graph.add_triplet(triplet)
+        return graph
+
+    @property
+    def nodes(self) -> Mapping[str, GraphNode]:
+        return _NodeView(self)
+
+    @property
+    def triplets(self) -> Iterator[_Triplet]:
+        for edge in range(len(self._edge_alive)):
+            if self._edge_alive[edge]:
+                yield self._triplet_key(edge)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._node_index)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._edge_index)
+
+    def ger_nodes(self) -> list[GraphNode]:
+        return [self._node(position) for position in self._node_index.values()]
+
+    def get_relations(self) -> list[GraphRelation]:
+        return [self._relation(edge) for edge in self._edge_index.values()]
+
+    def get_triplets(self) -> list[GraphTriplet]:
+        return self.to_triplets(self.triplets)
+
+    def to_triplets(self, triplets: Iterable[_Triplet]) -> list[GraphTriplet]:
+        nodes: dict[int, GraphNode] = {}
+
+        def node(position: int) -> GraphNode:
+            if position not in nodes:
+                nodes[position] = self._node(position)
+            return nodes[position]
+
+        results = []
+        for triplet in triplets:
+            edge = self._edge(triplet)
+            results.append(GraphTriplet(
+                node(self._edge_subjects[edge]),
+                self._relation(edge),
+                node(self._edge_objs[edge])
+            ))
+        return results
+
+    def iter_triplets(self, triplets: Iterable[_Triplet]) -> Iterator[GraphTriplet]:
+        """
+        Like to_triplets, but builds each triplet on demand and shares no nodes
+        between them, so memory stays flat however many are consumed.
+        """
+        for triplet in triplets:
+            edge = self._edge(triplet)
+            yield GraphTriplet(
+                self._node(self._edge_subjects[edge]),
+                self._relation(edge),
+                self._node(self._edge_objs[edge])
+            )
+
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self._node_index
+
+    def relation_name(self, triplet: _Triplet) -> str:
+        edge = self._edge(triplet)
+        label = self._edge_labels[edge]
+        return self._strings[label] if label != _NO_STRING else triplet[1]
+
+    def node_embedding(self, node_id: str) -> Optional[np.ndarray]:
+        position = self._node_index[node_id]
+        if not self._has_embedding[position]:
+            return None
+        return self._embeddings[position]
+
+    def similar_nodes(
+        self,
+        query_embedding: Any,
+        top_k: Optional[int] = None,
+        node_ids: Optional[Iterable[str]] = None
+    ) -> list[tuple[str, float]]:
+        """
+        Node ids and cosine similarities to query_embedding, most similar first.
+        """
+        if self._embeddings is None:
+            return []
+        size = min(len(self._has_embedding), self._embeddings.shape[0])
+        if self._embedding_norms is None:
+            self._embedding_norms = np.linalg.norm(self._embeddings, axis=1).astype(np.float32)
+
+        if node_ids is None:
+            positions = None
+            scores = _cosine_similarities(self._embeddings[:size], self._embedding_norms[:size], query_embedding)
+            scores[np.frombuffer(self._has_embedding, dtype=np.int8)[:size] == 0] = -np.inf
+        else:
+            positions = np.fromiter(
+                (
+                    position
+                    for node_id in node_ids
+                    if (position := self._node_index.get(node_id)) is not None
+                    and self._has_embedding[position]
+                ),
+                dtype=np.int64
+            )
+            scores = _cosine_similarities(self._embeddings[positions], self._embedding_norms[positions], query_embedding)
+
+        return [
+            (
+                self._strings[self._node_ids[position if positions is None else positions[position]]],
+                float(scores[position])
+            )
+            for position in _top_k(scores, top_k).tolist()
+        ]
+
+    def triplets_from(self, node_id: str) -> set[_Triplet]:
+        position = self._node_index.get(node_id)
+        if position is None:
+            return set()
+        self._maybe_rebuild()
+        return {self._triplet_key(edge) for edge in self._out(position)}
+
+    def triplets_to(self, node_id: str) -> set[_Triplet]:
+        position = self._node_index.get(node_id)
+        if position is None:
+            return set()
+        self._maybe_rebuild()
+        return {self._triplet_key(edge) for edge in self._in(position)}
+
+    def triplets_of(self, node_id: str) -> set[_Triplet]:
+        return self.triplets_from(node_id) | self.triplets_to(node_id)
+
+    def triplets_labelled(self, relation_name: str) -> set[_Triplet]:
+        label = self._string_ids.get(relation_name)
+        triplets: set[_Triplet] = set()
+        if label is not None:
+            labels = np.array(self._edge_labels, dtype=np.int32)
+            alive = np.array(self._edge_alive, dtype=np.int8)
+            for edge in np.nonzero((labels == label) & (alive == 1))[0].tolist():
+                triplets.add(self._triplet_key(edge))
+        # Unlabelled relations are named by their id, i.e. '{source}->{target}'.
+        start = relation_name.find('->')
+        while start != -1:
+            edge = self._find_edge(relation_name[:start], relation_name[start + 2:])
+            if edge is not None and self._edge_labels[edge] == _NO_STRING:
+                triplets.add(self._triplet_key(edge))
+            start = relation_name.find('->', start + 1)
+        return triplets
+
+    def nodes_with(self, key: str, values: Iterable[Any]) -> set[str]:
+        if key in self.indexed_properties:
+            index = self._property_index.get(key, {})
+            return {
+                self._strings[self._node_ids[position]]
+                for value in values
+                for position in index.get(value, ())
+            }
+        values = list(values)
+        self._load_nodes()
+        column = self._node_properties.get(key, {})
+        return {
+            self._strings[self._node_ids[position]]
+            for position, value in column.items()
+            if value in values
+        }
+
+    def nodes_with_ref(self, ref_ids: Iterable[str]) -> set[str]:
+        return {
+            self._strings[self._node_ids[position]]
+            for ref_id in ref_ids
+            for position in self._ref_index.get(ref_id, ())
+        }
+
+    def add_node(self, node: GraphNode) -> None:
+        self._put_node(node.id, node)
+
+    def add_relation(self, relation: GraphRelation) -> None:
+        if relation.source not in self._node_index:
+            self._put_node(relation.source, EntityNode(name=relation.source))
+        if relation.target not in self._node_index:
+            self._put_node(relation.target, EntityNode(name=relation.target))
+        self._put_edge(relation.source, relation, relation.target)
+
+    def add_triplet(self, triplet: GraphTriplet) -> None:
+        subject, relation, obj = triplet
+        if self._find_edge(subject.id, obj.id) is not None:
+            self._put_edge(subject.id, relation, obj.id)
+            return
+        self.add_node(subject)
+        self.add_node(obj)
+        self._put_edge(subject.id, relation, obj.id)
+
+    def delete_triplet(self, triplet: _Triplet) -> None:
+        edge = self._find_edge(triplet[0], triplet[2])
+        if edge is not None:
+            self._delete_edge(edge)
+
+    def delete_node(self, node_id: str) -> None:
+        self.detach_delete_node(node_id)
+
+    def detach_delete_node(self, node_id: str) -> None:
+        position = self._node_index.get(node_id)
+        if position is None:
+            return
+        for edge in list(self._out(position)) + list(self._in(position)):
+            self._delete_edge(edge)
+        self._unindex_node(position)
+        self._clear_node(position)
+        del self._node_index[node_id]
+        self._touch_node(position)
+
+    def rebuild(self) -> None:
+        """
+        Folds pending edge writes and deletions into the CSR arrays.
+        """
+        num_nodes = len(self._node_ids)
+        alive = np.array(self._edge_alive, dtype=np.int8)
+        edges = np.nonzero(alive == 1)[0].astype(np.int32)
+        subjects = np.array(self._edge_subjects, dtype=np.int32)[edges]
+        objs = np.array(self._edge_objs, dtype=np.int32)[edges]
+        self._out_offsets, self._out_edges = _to_csr(subjects, edges, num_nodes)
+        self._in_offsets, self._in_edges = _to_csr(objs, edges, num_nodes)
+        self._csr_nodes = num_nodes
+        self._delta_out.clear()
+        self._delta_in.clear()
+        self._delta_size = 0
+
+    # Strings
+
+    def _intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NO_STRING
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def _intern_value(self, value: Any) -> Any:
+        return self._strings[self._intern(value)] if isinstance(value, str) else value
+
+    def _string(self, string_id: int) -> Optional[str]:
+        return self._strings[string_id] if string_id != _NO_STRING else None
+
+    # Nodes
+
+    def _put_node(self, node_id: str, node: GraphNode) -> None:
+        position = self._node_index.get(node_id)
+        if position is None:
+            position = len(self._node_ids)
+            self._node_index[self._strings[self._intern(node_id)]] = position
+            self._node_ids.append(self._intern(node_id))
+            self._node_types.append(0)
+            self._node_labels.append(_NO_STRING)
+            self._has_embedding.append(0)
+        else:
+            self._unindex_node(position)
+            self._clear_node(position)
+
+        self._node_types[position] = self._type_id(type(node))
+        self._node_labels[position] = self._intern(node.label)
+        self._set_node_payload(
+            position,
+            node.model_dump(exclude=_NODE_COMMON_FIELDS),
+            node.properties,
+            node.metadata
+        )
+        if node.embedding is not None:
+            self._set_embedding(position, node.embedding)
+        self._index_node(position)
+        self._touch_node(position)
+
+    def _set_node_payload(
+        self,
+        position: int,
+        fields: dict[str, Any],
+        properties: dict[str, Any],
+        metadata: dict[str, Any]
+    ) -> None:
+        for field, value in fields.items():
+            self._node_fields.setdefault(field, {})[position] = self._intern_value(value)
+        for key, value in properties.items():
+            self._node_properties.setdefault(key, {})[position] = self._intern_value(value)
+        if metadata:
+            self._node_metadata[position] = metadata
+
+    def _node_payload(self, position: int) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+        self._load_node(position)
+        return (
+            {field: column[position] for field, column in self._node_fields.items() if position in column},
+            {key: column[position] for key, column in self._node_properties.items() if position in column},
+            self._node_metadata.get(position, {})
+        )
+
+    def _load_node(self, position: int) -> None:
+        if self._node_payloads is not None:
+            payload = self._node_payloads.take(position)
+            if payload is not None:
+                self._set_node_payload(position, *payload)
+
+    def _load_nodes(self) -> None:
+        if self._node_payloads is not None:
+            for position in self._node_index.values():
+                self._load_node(position)
+
+    def _touch_node(self, position: int) -> None:
+        if self._dirty_nodes is not None:
+            self._dirty_nodes.add(position)
+
+    def _clear_node(self, position: int) -> None:
+        if self._node_payloads is not None:
+            self._node_payloads.discard(position)
+        for column in self._node_fields.values():
+            column.pop(position, None)
+        for column in self._node_properties.values():
+            column.pop(position, None)
+        self._node_metadata.pop(position, None)
+        self._has_embedding[position] = 0
+
+    def _node(self, position: int) -> GraphNode:
+        node_type = self._types[self._node_types[position]]
+        fields, properties, metadata = self._node_payload(position)
+        return node_type(
+            **fields,
+            label=self._string(self._node_labels[position]),
+            properties=properties,
+            metadata=metadata,
+            embedding=self._embeddings[position] if self._has_embedding[position] else None
+        )
+
+    def _type_id(self, node_type: Type[GraphNode]) -> int:
+        if node_type not in self._types:
+            self._types.append(node_type)
+        return self._types.index(node_type)
+
+    def _set_embedding(self, position: int, embedding: Any) -> None:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if self._embeddings is None:
+            self._embeddings = np.zeros((max(position + 1, 1024), embedding.shape[0]), dtype=np.float32)
+        elif embedding.shape[0] != self._embeddings.shape[1]:
+            raise ValueError(
+                f'Expected an embedding of dimension {self._embeddings.shape[1]}, '
+                f'got {embedding.shape[0]}.'
+            )
+        if position >= self._embeddings.shape[0]:
+            capacity = max(position + 1, self._embeddings.shape[0] * 2)
+            embeddings = np.zeros((capacity, self._embeddings.shape[1]), dtype=np.float32)
+            embeddings[:self._embeddings.shape[0]] = self._embeddings
+            self._embeddings = embeddings
+            if self._embedding_norms is not None:
+                norms = np.zeros(capacity, dtype=np.float32)
+                norms[:self._embedding_norms.shape[0]] = self._embedding_norms
+                self._embedding_norms = norms
+        self._embeddings[position] = embedding
+        self._has_embedding[position] = 1
+        if self._embedding_norms is not None:
+            self._embedding_norms[position] = np.linalg.norm(embedding)
+
+    def _index_node(self, position: int) -> None:
+        for key in self.indexed_properties:
+            value = self._node_properties.get(key, {}).get(position)
+            if value is not None and _is_hashable(value):
+                self._property_index.setdefault(key, {}).setdefault(value, set()).add(position)
+        if ref_id := _ref_id(self._node_metadata.get(position, {})):
+            self._ref_index.setdefault(ref_id, set()).add(position)
+
+    def _unindex_node(self, position: int) -> None:
+        self._load_node(position)
+        for key in self.indexed_properties:
+            value = self._node_properties.get(key, {}).get(position)
+            if value is not None and _is_hashable(value):
+                _discard(self._property_index.get(key, {}), value, position)
+        if ref_id := _ref_id(self._node_metadata.get(position, {})):
+            _discard(self._ref_index, ref_id, position)
+
+    # Edges
+
+    def _put_edge(self, subject_id: str, relation: GraphRelation, obj_id: str) -> None:
+        subject = self._node_index[subject_id]
+        obj = self._node_index[obj_id]
+        edge = self._edge_index.get(_edge_key(subject, obj))
+        if edge is None:
+            edge = len(self._edge_subjects)
+            self._edge_index[_edge_key(subject, obj)] = edge
+            self._edge_subjects.append(subject)
+            self._edge_objs.append(obj)
+            self._edge_labels.append(_NO_STRING)
+            self._edge_alive.append(1)
+            self._delta_out.setdefault(subject, []).append(edge)
+            self._delta_in.setdefault(obj, []).append(edge)
+            self._delta_size += 1
+        else:
+            self._clear_edge(edge)
+
+        self._edge_labels[edge] = self._intern(relation.label)
+        self._set_edge_payload(edge, relation.properties, relation.metadata)
+        self._touch_edge(edge)
+
+    def _set_edge_payload(self, edge: int, properties: dict[str, Any], metadata: dict[str, Any]) -> None:
+        for key, value in properties.items():
+            self._edge_properties.setdefault(key, {})[edge] = self._intern_value(value)
+        if metadata:
+            self._edge_metadata[edge] = metadata
+
+    def _edge_payload(self, edge: int) -> tuple[dict[str, Any], dict[str, Any]]:
+        self._load_edge(edge)
+        return (
+            {key: column[edge] for key, column in self._edge_properties.items() if edge in column},
+            self._edge_metadata.get(edge, {})
+        )
+
+    def _load_edge(self, edge: int) -> None:
+        if self._edge_payloads is not None:
+            payload = self._edge_payloads.take(edge)
+            if payload is not None:
+                self._set_edge_payload(edge, *payload)
+
+    def _touch_edge(self, edge: int) -> None:
+        if self._dirty_edges is not None:
+            self._dirty_edges.add(edge)
+
+    def _clear_edge(self, edge: int) -> None:
+        if self._edge_payloads is not None:
+            self._edge_payloads.discard(edge)
+        for column in self._edge_properties.values():
+            column.pop(edge, None)
+        self._edge_metadata.pop(edge, None)
+
+    def _delete_edge(self, edge: int) -> None:
+        if not self._edge_alive[edge]:
+            return
+        self._edge_alive[edge] = 0
+        del self._edge_index[_edge_key(self._edge_subjects[edge], self._edge_objs[edge])]
+        self._clear_edge(edge)
+        self._delta_size += 1
+        self._touch_edge(edge)
+
+    def _find_edge(self, subject_id: str, obj_id: str) -> Optional[int]:
+        subject = self._node_index.get(subject_id)
+        obj = self._node_index.get(obj_id)
+        if subject is None or obj is None:
+            return None
+        return self._edge_index.get(_edge_key(subject, obj))
+
+    def _edge(self, triplet: _Triplet) -> int:
+        edge = self._find_edge(triplet[0], triplet[2])
+        if edge is None:
+            raise KeyError(triplet)
+        return edge
+
+    def _relation(self, edge: int) -> GraphRelation:
+        properties, metadata = self._edge_payload(edge)
+        return GraphRelation(
+            source=self._strings[self._node_ids[self._edge_subjects[edge]]],
+            target=self._strings[self._node_ids[self._edge_objs[edge]]],
+            label=self._string(self._edge_labels[edge]),
+            properties=properties,
+            metadata=metadata
+        )
+
+    def _triplet_key(self, edge: int) -> _Triplet:
+        subject_id = self._strings[self._node_ids[self._edge_subjects[edge]]]
+        obj_id = self._strings[self._node_ids[self._edge_objs[edge]]]
+        return subject_id, _relation_id(subject_id, obj_id), obj_id
+
+    def _out(self, position: int) -> Iterator[int]:
+        return self._adjacent(position, self._out_offsets, self._out_edges, self._delta_out)
+
+    def _in(self, position: int) -> Iterator[int]:
+        return self._adjacent(position, self._in_offsets, self._in_edges, self._delta_in)
+
+    def _adjacent(
+        self,
+        position: int,
+        offsets: np.ndarray,
+        edges: np.ndarray,
+        delta: dict[int, list[int]]
+    ) -> Iterator[int]:
+        if position < self._csr_nodes:
+            for edge in edges[offsets[position]:offsets[position + 1]].tolist():
+                if self._edge_alive[edge]:
+                    yield edge
+        for edge in delta.get(position, ()):
+            if self._edge_alive[edge]:
+                yield edge
+
+    def _maybe_rebuild(self) -> None:
+        if self._delta_size > max(_MIN_DELTA, len(self._edge_index) // 8):
+            self.rebuild()
+
+class _Payloads:
+    """
+    JSON-encoded row payloads in one byte block, addressed by an offsets array.
+    Both may be memory-mapped; a row is decoded at most once.
+    """
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+        self.pending = bytearray(b'\x01') * (len(offsets) - 1)
+
+    def is_pending(self, row: int) -> bool:
+        return row < len(self.pending) and self.pending[row] == 1
+
+    def raw(self, row: int) -> bytes:
+        return self.data[self.offsets[row]:self.offsets[row + 1]].tobytes()
+
+    def take(self, row: int) -> Optional[Any]:
+        if not self.is_pending(row) or self.offsets[row] == self.offsets[row + 1]:
+            return None
+        self.pending[row] = 0
+        return json.loads(self.raw(row))
+
+    def discard(self, row: int) -> None:
+        if row < len(self.pending):
+            self.pending[row] = 0
+
+class _NodeView(Mapping[str, GraphNode]):
+    def __init__(self, graph: CompactGraph):
+        self._graph = graph
+
+    def __getitem__(self, node_id: str) -> GraphNode:
+        return self._graph._node(self._graph._node_index[node_id])
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._graph._node_index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph._node_index)
+
+    def __len__(self) -> int:
+        return len(self._graph._node_index)
+
+def _edge_key(subject: int, obj: int) -> int:
+    return (subject << 32) | obj
+
+def _to_csr(keys: np.ndarray, values: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+    return offsets, values[order]
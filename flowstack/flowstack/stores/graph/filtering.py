@@ -3,6 +3,8 @@ from typing import Any, Optional, TypedDict
 class GraphNodeQuery(TypedDict, total=False):
     ids: Optional[list[str]]
     properties: Optional[dict[str, Any]]
+    property_values: Optional[dict[str, list[Any]]]
+    ref_ids: Optional[list[str]]
 
 class GraphTripletQuery(TypedDict, total=False):
     ids: Optional[list[str]]
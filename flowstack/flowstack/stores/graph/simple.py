@@ -1,27 +1,64 @@
+import math
+import operator
 import os.path
-from typing import Any, Optional, Unpack
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional, Self, Union, Unpack, override
 
 import fsspec
+import numpy as np
 
-from flowstack.stores import Graph, GraphNode, GraphNodeQuery, GraphRelation, GraphStore, GraphTriplet, GraphTripletQuery, VectorStoreQuery
-from flowstack.typing import Embedding
+from flowstack.stores.graph.base import GraphStore
+from flowstack.stores.graph.compact import CompactGraph
+from flowstack.stores.graph.filtering import GraphNodeQuery, GraphTripletQuery
+from flowstack.stores.graph.snapshot import is_snapshot, load_snapshot, save_snapshot
+from flowstack.stores.graph.types import Graph, GraphNode, GraphRelation, GraphTriplet
+from flowstack.stores.vector.typing import VectorStoreQuery
+from flowstack.typing import Embedding, FilterCondition, FilterOperator, MetadataFilter, MetadataFilters
+from flowstack.utils.constants import GRAPH_TRIPLET_SOURCE_KEY
+from flowstack.utils.func import chain_iterables
 
 class SimpleGraphStore(GraphStore):
+    @property
+    @override
+    def supports_vector_query(self) -> bool:
+        return True
+
     def __init__(
         self,
-        graph: Optional[Graph] = None,
+        graph: Optional[Union[Graph, CompactGraph]] = None,
         fs: Optional[fsspec.AbstractFileSystem] = None
     ):
-        self._graph: Graph = graph or Graph()
+        self._graph: Union[Graph, CompactGraph] = graph if graph is not None else Graph()
         self._fs: fsspec.AbstractFileSystem = fs or fsspec.filesystem('file')
 
+    @classmethod
+    def from_persist_path(
+        cls,
+        path: str,
+        fs: Optional[fsspec.AbstractFileSystem] = None,
+        mmap: bool = True
+    ) -> Self:
+        fs = fs or fsspec.filesystem('file')
+        if is_snapshot(path, fs):
+            return cls(load_snapshot(path, fs=fs, mmap=mmap), fs=fs)
+        with fs.open(path, 'r') as f:
+            return cls(Graph.model_validate_json(f.read()), fs=fs)
+
     def persist(
         self,
         path: str,
         fs: Optional[fsspec.AbstractFileSystem] = None,
+        incremental: bool = True,
         **kwargs
     ) -> None:
+        """
+        A CompactGraph is written as a binary snapshot directory, appending
+        only what changed since the last persist to the same path if incremental.
+        A Graph is written as a single JSON file.
+        """
         fs = fs or self._fs
+        if isinstance(self._graph, CompactGraph):
+            save_snapshot(self._graph, path, fs=fs, incremental=incremental)
+            return
         dirname = os.path.dirname(path)
         if not fs.exists(dirname):
             fs.makedirs(dirname)
@@ -48,22 +85,114 @@ class SimpleGraphStore(GraphStore):
         raise NotImplementedError()
 
     def vector_query(self, **query: Unpack[VectorStoreQuery]) -> tuple[list[GraphNode], Embedding]:
-        raise NotImplementedError()
+        """
+        Top similarity_top_k nodes by cosine similarity to query_embedding,
+        with their similarities. Filters are matched against node properties.
+        """
+        if query.get('query_embedding') is None:
+            raise ValueError('SimpleGraphStore.vector_query requires a query_embedding.')
+        graph = self._graph
+        top_k = query.get('similarity_top_k') or 1
+        filters = query.get('filters')
+        candidates: Optional[set[str]] = None
+
+        if query.get('artifact_ids') is not None:
+            candidates = _narrow(candidates, query['artifact_ids'])
+        if query.get('ref_artifact_ids') is not None:
+            candidates = _narrow(candidates, graph.nodes_with_ref(query['ref_artifact_ids']))
+
+        nodes: list[GraphNode] = []
+        similarities: list[float] = []
+        # With filters, walk the full ranking until enough nodes pass them.
+        for node_id, similarity in graph.similar_nodes(
+            query['query_embedding'],
+            top_k=None if filters else top_k,
+            node_ids=candidates
+        ):
+            node = graph.nodes[node_id]
+            if filters and not _matches_filters(node.properties, filters):
+                continue
+            nodes.append(node)
+            similarities.append(similarity)
+            if len(nodes) >= top_k:
+                break
+        return nodes, np.array(similarities, dtype=np.float32)
 
     async def avector_query(self, **query: Unpack[VectorStoreQuery]) -> tuple[list[GraphNode], Embedding]:
-        raise NotImplementedError()
+        return self.vector_query(**query)
 
     def get(self, **query: Unpack[GraphNodeQuery]) -> list[GraphNode]:
-        pass
+        graph = self._graph
+        candidates: Optional[set[str]] = None
+
+        if query.get('ids') is not None:
+            candidates = _narrow(candidates, (
+                node_id
+                for node_id in query['ids']
+                if graph.has_node(node_id)
+            ))
+        for key, value in (query.get('properties') or {}).items():
+            candidates = _narrow(candidates, graph.nodes_with(key, [value]))
+        for key, values in (query.get('property_values') or {}).items():
+            candidates = _narrow(candidates, graph.nodes_with(key, values))
+        if query.get('ref_ids') is not None:
+            candidates = _narrow(candidates, graph.nodes_with_ref(query['ref_ids']))
+
+        if candidates is None:
+            return graph.ger_nodes()
+        return [graph.nodes[node_id] for node_id in candidates]
 
     async def aget(self, **query: Unpack[GraphNodeQuery]) -> list[GraphNode]:
-        pass
+        return self.get(**query)
 
     def get_triplets(self, **query: Unpack[GraphTripletQuery]) -> list[GraphTriplet]:
-        pass
+        triplets = self._graph.to_triplets(self._triplet_keys(query))
+        if query.get('properties'):
+            triplets = [
+                triplet
+                for triplet in triplets
+                if _matches_properties(triplet, query['properties'])
+            ]
+        return triplets
 
     async def aget_triplets(self, **query: Unpack[GraphTripletQuery]) -> list[GraphTriplet]:
-        pass
+        return self.get_triplets(**query)
+
+    @override
+    def iter_triplets(self, **query: Unpack[GraphTripletQuery]) -> Iterator[GraphTriplet]:
+        for triplet in self._graph.iter_triplets(self._triplet_keys(query)):
+            if not query.get('properties') or _matches_properties(triplet, query['properties']):
+                yield triplet
+
+    @override
+    async def aiter_triplets(self, **query: Unpack[GraphTripletQuery]) -> AsyncIterator[GraphTriplet]:
+        for triplet in self.iter_triplets(**query):
+            yield triplet
+
+    def _triplet_keys(self, query: GraphTripletQuery) -> Iterable[tuple[str, str, str]]:
+        graph = self._graph
+        candidates: Optional[set[tuple[str, str, str]]] = None
+
+        node_ids = (query.get('ids') or []) + (query.get('entity_names') or [])
+        if node_ids:
+            candidates = _narrow(candidates, chain_iterables(
+                graph.triplets_of(node_id) for node_id in node_ids
+            ))
+        if query.get('sources'):
+            candidates = _narrow(candidates, chain_iterables(
+                graph.triplets_from(node_id) for node_id in query['sources']
+            ))
+        if query.get('targets'):
+            candidates = _narrow(candidates, chain_iterables(
+                graph.triplets_to(node_id) for node_id in query['targets']
+            ))
+        if query.get('relation_names'):
+            candidates = _narrow(candidates, chain_iterables(
+                graph.triplets_labelled(name) for name in query['relation_names']
+            ))
+
+        # Copy the live triplet set, so the store can be modified while the results are iterated.
+        return list(graph.triplets) if candidates is None else candidates
 
     def get_rel_map(
         self,
@@ -71,9 +200,59 @@ class SimpleGraphStore(GraphStore):
         ignore_rels: Optional[list[str]] = None,
         depth: int = 2,
         limit: int = 30,
+        query_embedding: Optional[Embedding] = None,
+        similarity_top_k: Optional[int] = None,
         **kwargs
     ) -> list[GraphTriplet]:
-        pass
+        """
+        Breadth-first expansion from nodes, up to depth hops and limit triplets.
+        If query_embedding is given, each level is expanded in order of the
+        similarity between the query and the newly reached node, and if nodes
+        is empty the expansion starts from the similarity_top_k closest nodes.
+        """
+        if limit <= 0:
+            return []
+        graph = self._graph
+        if not nodes and query_embedding is not None:
+            nodes, _ = self.vector_query(query_embedding=query_embedding, similarity_top_k=similarity_top_k or 1)
+        ignore_rels = set(ignore_rels or [])
+        visited = {node.id for node in nodes}
+        seen: set[tuple[str, str, str]] = set()
+        results: list[tuple[str, str, str]] = []
+        frontier = list(visited)
+
+        for _ in range(depth):
+            level: list[tuple[str, str, str]] = []
+            for node_id in frontier:
+                for triplets in (graph.triplets_from(node_id), graph.triplets_to(node_id)):
+                    for triplet in triplets:
+                        if triplet in seen or graph.relation_name(triplet) in ignore_rels:
+                            continue
+                        seen.add(triplet)
+                        if query_embedding is not None:
+                            level.append(triplet)
+                            continue
+                        results.append(triplet)
+                        if len(results) >= limit:
+                            return graph.to_triplets(results)
+                        level.append(triplet)
+
+            if query_embedding is not None:
+                level = self._rank_triplets(level, visited, query_embedding)
+                results.extend(level[:limit - len(results)])
+                if len(results) >= limit:
+                    return graph.to_triplets(results)
+
+            frontier = []
+            for subject_id, _, obj_id in level:
+                for node_id in (subject_id, obj_id):
+                    if node_id not in visited:
+                        visited.add(node_id)
+                        frontier.append(node_id)
+            if not frontier:
+                break
+
+        return graph.to_triplets(results)
 
     async def aget_rel_map(
         self,
@@ -81,24 +260,135 @@ class SimpleGraphStore(GraphStore):
         ignore_rels: Optional[list[str]] = None,
         depth: int = 2,
         limit: int = 30,
+        query_embedding: Optional[Embedding] = None,
+        similarity_top_k: Optional[int] = None,
         **kwargs
     ) -> list[GraphTriplet]:
-        pass
+        return self.get_rel_map(
+            nodes,
+            ignore_rels=ignore_rels,
+            depth=depth,
+            limit=limit,
+            query_embedding=query_embedding,
+            similarity_top_k=similarity_top_k,
+            **kwargs
+        )
 
-    async def aupsert_nodes(self, nodes: list[GraphNode], **kwargs) -> None:
-        pass
+    def _rank_triplets(
+        self,
+        triplets: list[tuple[str, str, str]],
+        visited: set[str],
+        query_embedding: Embedding
+    ) -> list[tuple[str, str, str]]:
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query) or 1.0
+        scores: dict[str, float] = {}
+
+        def score(triplet: tuple[str, str, str]) -> float:
+            # Rank by the end of the triplet that is new to the traversal.
+            node_id = triplet[2] if triplet[0] in visited else triplet[0]
+            if node_id not in scores:
+                embedding = self._graph.node_embedding(node_id)
+                if embedding is None:
+                    scores[node_id] = -math.inf
+                else:
+                    embedding = np.asarray(embedding, dtype=np.float32)
+                    scores[node_id] = float(
+                        np.dot(query, embedding) / (query_norm * (np.linalg.norm(embedding) or 1.0))
+                    )
+            return scores[node_id]
+
+        return sorted(triplets, key=score, reverse=True)
 
     def upsert_nodes(self, nodes: list[GraphNode], **kwargs) -> None:
-        pass
+        for node in nodes:
+            self._graph.add_node(node)
+
+    async def aupsert_nodes(self, nodes: list[GraphNode], **kwargs) -> None:
+        self.upsert_nodes(nodes, **kwargs)
 
     def upsert_relations(self, relations: list[GraphRelation], **kwargs) -> None:
-        pass
+        for relation in relations:
+            self._graph.add_relation(relation)
 
     async def aupsert_relations(self, relations: list[GraphRelation], **kwargs) -> None:
-        pass
+        self.upsert_relations(relations, **kwargs)
 
     def delete(self, **query: Unpack[GraphNodeQuery]) -> None:
-        pass
+        if not any(value is not None for value in query.values()):
+            return
+        for node in self.get(**query):
+            self._graph.detach_delete_node(node.id)
 
     async def adelete(self, **query: Unpack[GraphNodeQuery]) -> None:
-        pass
\ No newline at end of file
+        self.delete(**query)
+
+    @override
+    def _delete_artifacts(
+        self,
+        artifact_ids: list[str],
+        ref_artifact_ids: list[str],
+        **kwargs
+    ) -> None:
+        graph = self._graph
+        node_ids = graph.nodes_with(GRAPH_TRIPLET_SOURCE_KEY, artifact_ids) | graph.nodes_with_ref(ref_artifact_ids)
+        node_ids.update(
+            node_id
+            for node_id in chain_iterables([artifact_ids, ref_artifact_ids])
+            if graph.has_node(node_id)
+        )
+        for node_id in node_ids:
+            graph.detach_delete_node(node_id)
+
+    @override
+    async def _adelete_artifacts(
+        self,
+        artifact_ids: list[str],
+        ref_artifact_ids: list[str],
+        **kwargs
+    ) -> None:
+        self._delete_artifacts(artifact_ids, ref_artifact_ids, **kwargs)
+
+def _narrow[T](candidates: Optional[set[T]], found: Iterable[T]) -> set[T]:
+    return set(found) if candidates is None else candidates.intersection(found)
+
+def _matches_properties(triplet: GraphTriplet, properties: dict[str, Any]) -> bool:
+    return any(
+        all(element.properties.get(key) == value for key, value in properties.items())
+        for element in triplet
+    )
+
+_FILTER_OPERATORS: dict[FilterOperator, Callable[[Any, Any], bool]] = {
+    FilterOperator.EQ: operator.eq,
+    FilterOperator.NE: operator.ne,
+    FilterOperator.GT: operator.gt,
+    FilterOperator.GTE: operator.ge,
+    FilterOperator.LT: operator.lt,
+    FilterOperator.LTE: operator.le,
+    FilterOperator.IN: lambda value, expected: value in expected,
+    FilterOperator.NIN: lambda value, expected: value not in expected,
+    FilterOperator.ANY: lambda value, expected: any(item in value for item in expected),
+    FilterOperator.ALL: lambda value, expected: all(item in value for item in expected),
+    FilterOperator.CONTAINS: lambda value, expected: expected in value,
+    FilterOperator.TEXT_MATCH: lambda value, expected: str(expected) in str(value)
+}
+
+def _matches_filters(properties: dict[str, Any], filters: MetadataFilters) -> bool:
+    matches = (
+        _matches_filters(properties, metadata_filter)
+        if isinstance(metadata_filter, MetadataFilters)
+        else _matches_filter(properties, metadata_filter)
+        for metadata_filter in filters.filters
+    )
+    return all(matches) if filters.condition == FilterCondition.AND else any(matches)
+
+def _matches_filter(properties: dict[str, Any], metadata_filter: MetadataFilter) -> bool:
+    if metadata_filter.key not in properties:
+        return False
+    try:
+        return bool(_FILTER_OPERATORS[metadata_filter.operator](
+            properties[metadata_filter.key],
+            metadata_filter.value
+        ))
+    except TypeError:
+        return False
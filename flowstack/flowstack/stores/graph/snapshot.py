@@ -0,0 +1,392 @@
+from array import array
+import json
+import os
+import os.path
+from typing import Any, Iterator, NamedTuple, Optional, Type
+import uuid
+
+import fsspec
+from fsspec.implementations.local import LocalFileSystem
+import numpy as np
+
+from flowstack.stores.graph.compact import CompactGraph, _Payloads, _edge_key
+from flowstack.stores.graph.types import GraphNode
+
+SNAPSHOT_VERSION = 2
+MAX_SNAPSHOT_SEGMENTS = 16
+
+_MANIFEST = 'manifest.json'
+_STRINGS = 'strings.json'
+_INDEXES = 'indexes.json'
+
+class _Snapshot(NamedTuple):
+    path: str
+    manifest: dict[str, Any]
+
+def is_snapshot(path: str, fs: Optional[fsspec.AbstractFileSystem] = None) -> bool:
+    fs = fs or fsspec.filesystem('file')
+    return fs.exists(os.path.join(path, _MANIFEST))
+
+def save_snapshot(
+    graph: CompactGraph,
+    path: str,
+    fs: Optional[fsspec.AbstractFileSystem] = None,
+    incremental: bool = True,
+    max_segments: int = MAX_SNAPSHOT_SEGMENTS
+) -> None:
+    """
+    Writes graph to the snapshot directory at path.
+
+    A snapshot is a base of flat NumPy arrays (node and edge columns, CSR
+    adjacency, embeddings), a string table and JSON row payloads. If graph
+    was last saved to or loaded from path, only the rows written since then are
+    appended as a new segment, until max_segments is reached and the base is rewritten.
+    The manifest is replaced last, so a reader sees either the old or the new snapshot.
+    """
+    fs = fs or fsspec.filesystem('file')
+    snapshot: Optional[_Snapshot] = graph._snapshot
+    if (
+        incremental and
+        snapshot is not None and
+        snapshot.path == path and
+        len(snapshot.manifest['segments']) < max_segments and
+        is_snapshot(path, fs)
+    ):
+        _append_segment(graph, snapshot, fs)
+    else:
+        _write_base(graph, path, fs)
+    graph._dirty_nodes = set()
+    graph._dirty_edges = set()
+
+def load_snapshot(
+    path: str,
+    fs: Optional[fsspec.AbstractFileSystem] = None,
+    mmap: bool = True
+) -> CompactGraph:
+    """
+    Loads a snapshot written by save_snapshot.
+
+    On a local filesystem with mmap set, the adjacency arrays, embeddings and
+    row payloads are memory-mapped rather than read, and payloads are only
+    decoded when their node or relation is first read.
+
+    Snapshots hold no pickles, and node types must name GraphNode subclasses that are already imported,
+    but only load snapshots from trusted sources.
+    """
+    fs = fs or fsspec.filesystem('file')
+    with fs.open(os.path.join(path, _MANIFEST), 'r') as f:
+        manifest = json.load(f)
+    if manifest['version'] != SNAPSHOT_VERSION:
+        raise ValueError(f'Unsupported graph snapshot version {manifest["version"]}.')
+
+    mmap = mmap and isinstance(fs, LocalFileSystem)
+    graph = CompactGraph(indexed_properties=manifest['indexed_properties'])
+    graph._types = [_resolve_type(name) for name in manifest['types']]
+    base = os.path.join(path, manifest['base'])
+    _load_base(graph, base, fs, mmap)
+    for segment in manifest['segments']:
+        _apply_segment(graph, os.path.join(base, segment), fs)
+
+    graph._snapshot = _Snapshot(path, manifest)
+    graph._dirty_nodes = set()
+    graph._dirty_edges = set()
+    return graph
+
+def _write_base(graph: CompactGraph, path: str, fs: fsspec.AbstractFileSystem) -> None:
+    graph.rebuild()
+    # Write a new base next to the old one, since graph may still be mapped onto it,
+    # and switch to it by replacing the manifest.
+    base = f'base-{uuid.uuid4().hex}'
+    staging = os.path.join(path, base)
+    fs.makedirs(staging, exist_ok=True)
+
+    _write_rows(
+        graph,
+        staging,
+        fs,
+        np.arange(len(graph._node_ids), dtype=np.int64),
+        np.arange(len(graph._edge_subjects), dtype=np.int64)
+    )
+    _write_json(fs, os.path.join(staging, _STRINGS), graph._strings)
+    _write_array(fs, os.path.join(staging, 'out_offsets.npy'), graph._out_offsets)
+    _write_array(fs, os.path.join(staging, 'out_edges.npy'), graph._out_edges)
+    _write_array(fs, os.path.join(staging, 'in_offsets.npy'), graph._in_offsets)
+    _write_array(fs, os.path.join(staging, 'in_edges.npy'), graph._in_edges)
+    _write_json(fs, os.path.join(staging, _INDEXES), {
+        'properties': {
+            key: [[value, sorted(positions)] for value, positions in index.items()]
+            for key, index in graph._property_index.items()
+        },
+        'refs': {ref_id: sorted(positions) for ref_id, positions in graph._ref_index.items()}
+    })
+
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'base': base,
+        'indexed_properties': list(graph.indexed_properties),
+        'types': [_type_name(node_type) for node_type in graph._types],
+        'num_strings': len(graph._strings),
+        'segments': []
+    }
+    _write_manifest(fs, path, manifest)
+    graph._snapshot = _Snapshot(path, manifest)
+
+    # Older bases, their segments and files from earlier snapshot versions are no longer referenced.
+    for entry in fs.ls(path, detail=False):
+        if os.path.basename(entry.rstrip('/')) not in (base, _MANIFEST):
+            fs.rm(entry, recursive=True)
+
+def _append_segment(graph: CompactGraph, snapshot: _Snapshot, fs: fsspec.AbstractFileSystem) -> None:
+    manifest = snapshot.manifest
+    segment = f'segment-{len(manifest["segments"]) + 1:05d}'
+    dirname = os.path.join(snapshot.path, manifest['base'], segment)
+    if fs.exists(dirname):
+        fs.rm(dirname, recursive=True)
+    fs.makedirs(dirname, exist_ok=True)
+
+    _write_rows(
+        graph,
+        dirname,
+        fs,
+        np.array(sorted(graph._dirty_nodes or ()), dtype=np.int64),
+        np.array(sorted(graph._dirty_edges or ()), dtype=np.int64)
+    )
+    _write_json(fs, os.path.join(dirname, _STRINGS), graph._strings[manifest['num_strings']:])
+
+    # The manifest is replaced last, so a partially written segment is never read.
+    manifest = {
+        **manifest,
+        'types': [_type_name(node_type) for node_type in graph._types],
+        'num_strings': len(graph._strings),
+        'segments': [*manifest['segments'], segment]
+    }
+    _write_manifest(fs, snapshot.path, manifest)
+    graph._snapshot = _Snapshot(snapshot.path, manifest)
+
+def _write_rows(
+    graph: CompactGraph,
+    dirname: str,
+    fs: fsspec.AbstractFileSystem,
+    nodes: np.ndarray,
+    edges: np.ndarray
+) -> None:
+    node_alive = np.zeros(len(graph._node_ids), dtype=np.int8)
+    node_alive[np.fromiter(graph._node_index.values(), dtype=np.int64, count=len(graph._node_index))] = 1
+    edge_alive = np.frombuffer(graph._edge_alive, dtype=np.int8)
+
+    _write_array(fs, os.path.join(dirname, 'node_positions.npy'), nodes)
+    _write_array(fs, os.path.join(dirname, 'node_ids.npy'), np.frombuffer(graph._node_ids, dtype=np.int32)[nodes])
+    _write_array(fs, os.path.join(dirname, 'node_types.npy'), np.frombuffer(graph._node_types, dtype=np.int8)[nodes])
+    _write_array(fs, os.path.join(dirname, 'node_labels.npy'), np.frombuffer(graph._node_labels, dtype=np.int32)[nodes])
+    _write_array(fs, os.path.join(dirname, 'node_alive.npy'), node_alive[nodes])
+    _write_array(fs, os.path.join(dirname, 'has_embedding.npy'), np.frombuffer(graph._has_embedding, dtype=np.int8)[nodes])
+    if graph._embeddings is not None:
+        embeddings = (
+            graph._embeddings[:len(nodes)]
+            if len(nodes) == len(graph._node_ids)
+            else graph._embeddings[np.minimum(nodes, len(graph._embeddings) - 1)]
+        )
+        _write_array(fs, os.path.join(dirname, 'embeddings.npy'), embeddings)
+    _write_payloads(fs, dirname, 'node', [
+        _raw_payload(graph._node_payloads, position, lambda: graph._node_payload(position))
+        if node_alive[position] else b''
+        for position in nodes.tolist()
+    ])
+
+    _write_array(fs, os.path.join(dirname, 'edge_positions.npy'), edges)
+    _write_array(fs, os.path.join(dirname, 'edge_subjects.npy'), np.frombuffer(graph._edge_subjects, dtype=np.int32)[edges])
+    _write_array(fs, os.path.join(dirname, 'edge_objs.npy'), np.frombuffer(graph._edge_objs, dtype=np.int32)[edges])
+    _write_array(fs, os.path.join(dirname, 'edge_labels.npy'), np.frombuffer(graph._edge_labels, dtype=np.int32)[edges])
+    _write_array(fs, os.path.join(dirname, 'edge_alive.npy'), edge_alive[edges])
+    _write_payloads(fs, dirname, 'edge', [
+        _raw_payload(graph._edge_payloads, edge, lambda: graph._edge_payload(edge))
+        if edge_alive[edge] else b''
+        for edge in edges.tolist()
+    ])
+
+def _raw_payload(payloads: Optional[_Payloads], row: int, payload: Any) -> bytes:
+    # Rows that were never read are copied over without decoding them.
+    if payloads is not None and payloads.is_pending(row):
+        return payloads.raw(row)
+    return json.dumps(payload(), default=str, ensure_ascii=False).encode()
+
+def _load_base(graph: CompactGraph, path: str, fs: fsspec.AbstractFileSystem, mmap: bool) -> None:
+    with fs.open(os.path.join(path, _STRINGS), 'r') as f:
+        graph._strings = json.load(f)
+    graph._string_ids = {value: string_id for string_id, value in enumerate(graph._strings)}
+
+    node_ids = _read_array(fs, os.path.join(path, 'node_ids.npy'))
+    node_alive = _read_array(fs, os.path.join(path, 'node_alive.npy'))
+    graph._node_ids = array('i', node_ids.tobytes())
+    graph._node_types = array('b', _read_array(fs, os.path.join(path, 'node_types.npy')).tobytes())
+    graph._node_labels = array('i', _read_array(fs, os.path.join(path, 'node_labels.npy')).tobytes())
+    graph._has_embedding = array('b', _read_array(fs, os.path.join(path, 'has_embedding.npy')).tobytes())
+    alive_nodes = np.nonzero(node_alive)[0]
+    graph._node_index = dict(zip(
+        [graph._strings[string_id] for string_id in node_ids[alive_nodes].tolist()],
+        alive_nodes.tolist()
+    ))
+    if fs.exists(os.path.join(path, 'embeddings.npy')):
+        # Copy-on-write, so upserts never write through to the snapshot.
+        graph._embeddings = _read_array(fs, os.path.join(path, 'embeddings.npy'), 'c' if mmap else None)
+    graph._node_payloads = _read_payloads(fs, path, 'node', mmap)
+
+    edge_subjects = _read_array(fs, os.path.join(path, 'edge_subjects.npy'))
+    edge_objs = _read_array(fs, os.path.join(path, 'edge_objs.npy'))
+    edge_alive = _read_array(fs, os.path.join(path, 'edge_alive.npy'))
+    graph._edge_subjects = array('i', edge_subjects.tobytes())
+    graph._edge_objs = array('i', edge_objs.tobytes())
+    graph._edge_labels = array('i', _read_array(fs, os.path.join(path, 'edge_labels.npy')).tobytes())
+    graph._edge_alive = array('b', edge_alive.tobytes())
+    alive_edges = np.nonzero(edge_alive)[0]
+    keys = (edge_subjects[alive_edges].astype(np.int64) << 32) | edge_objs[alive_edges].astype(np.int64)
+    graph._edge_index = dict(zip(keys.tolist(), alive_edges.tolist()))
+    graph._edge_payloads = _read_payloads(fs, path, 'edge', mmap)
+
+    mmap_mode = 'r' if mmap else None
+    graph._out_offsets = _read_array(fs, os.path.join(path, 'out_offsets.npy'), mmap_mode)
+    graph._out_edges = _read_array(fs, os.path.join(path, 'out_edges.npy'), mmap_mode)
+    graph._in_offsets = _read_array(fs, os.path.join(path, 'in_offsets.npy'), mmap_mode)
+    graph._in_edges = _read_array(fs, os.path.join(path, 'in_edges.npy'), mmap_mode)
+    graph._csr_nodes = len(graph._out_offsets) - 1
+
+    with fs.open(os.path.join(path, _INDEXES), 'r') as f:
+        indexes = json.load(f)
+    graph._property_index = {
+        key: {_to_hashable(value): set(positions) for value, positions in index}
+        for key, index in indexes['properties'].items()
+    }
+    graph._ref_index = {ref_id: set(positions) for ref_id, positions in indexes['refs'].items()}
+
+def _apply_segment(graph: CompactGraph, dirname: str, fs: fsspec.AbstractFileSystem) -> None:
+    with fs.open(os.path.join(dirname, _STRINGS), 'r') as f:
+        for value in json.load(f):
+            graph._string_ids[value] = len(graph._strings)
+            graph._strings.append(value)
+
+    nodes = _read_array(fs, os.path.join(dirname, 'node_positions.npy')).tolist()
+    node_ids = _read_array(fs, os.path.join(dirname, 'node_ids.npy')).tolist()
+    node_types = _read_array(fs, os.path.join(dirname, 'node_types.npy')).tolist()
+    node_labels = _read_array(fs, os.path.join(dirname, 'node_labels.npy')).tolist()
+    node_alive = _read_array(fs, os.path.join(dirname, 'node_alive.npy')).tolist()
+    has_embedding = _read_array(fs, os.path.join(dirname, 'has_embedding.npy')).tolist()
+    embeddings = (
+        _read_array(fs, os.path.join(dirname, 'embeddings.npy'))
+        if fs.exists(os.path.join(dirname, 'embeddings.npy'))
+        else None
+    )
+    node_payloads = _read_payloads(fs, dirname, 'node', False)
+
+    for row, position in enumerate(nodes):
+        if position < len(graph._node_ids):
+            node_id = graph._strings[graph._node_ids[position]]
+            if graph._node_index.get(node_id) == position:
+                graph._unindex_node(position)
+                graph._clear_node(position)
+                del graph._node_index[node_id]
+        else:
+            graph._node_ids.append(0)
+            graph._node_types.append(0)
+            graph._node_labels.append(0)
+            graph._has_embedding.append(0)
+        graph._node_ids[position] = node_ids[row]
+        graph._node_types[position] = node_types[row]
+        graph._node_labels[position] = node_labels[row]
+        graph._has_embedding[position] = 0
+        if has_embedding[row]:
+            graph._set_embedding(position, embeddings[row])
+        if node_alive[row]:
+            graph._set_node_payload(position, *node_payloads.take(row))
+            graph._node_index[graph._strings[node_ids[row]]] = position
+            graph._index_node(position)
+
+    edges = _read_array(fs, os.path.join(dirname, 'edge_positions.npy')).tolist()
+    edge_subjects = _read_array(fs, os.path.join(dirname, 'edge_subjects.npy')).tolist()
+    edge_objs = _read_array(fs, os.path.join(dirname, 'edge_objs.npy')).tolist()
+    edge_labels = _read_array(fs, os.path.join(dirname, 'edge_labels.npy')).tolist()
+    edge_alive = _read_array(fs, os.path.join(dirname, 'edge_alive.npy')).tolist()
+    edge_payloads = _read_payloads(fs, dirname, 'edge', False)
+
+    for row, edge in enumerate(edges):
+        if edge < len(graph._edge_subjects):
+            if not edge_alive[row]:
+                graph._delete_edge(edge)
+                continue
+            graph._clear_edge(edge)
+        else:
+            subject, obj = edge_subjects[row], edge_objs[row]
+            graph._edge_subjects.append(subject)
+            graph._edge_objs.append(obj)
+            graph._edge_labels.append(0)
+            graph._edge_alive.append(edge_alive[row])
+            if not edge_alive[row]:
+                continue
+            graph._edge_index[_edge_key(subject, obj)] = edge
+            graph._delta_out.setdefault(subject, []).append(edge)
+            graph._delta_in.setdefault(obj, []).append(edge)
+            graph._delta_size += 1
+        graph._edge_labels[edge] = edge_labels[row]
+        graph._set_edge_payload(edge, *edge_payloads.take(row))
+
+def _write_payloads(fs: fsspec.AbstractFileSystem, dirname: str, prefix: str, payloads: list[bytes]) -> None:
+    offsets = np.zeros(len(payloads) + 1, dtype=np.int64)
+    np.cumsum([len(payload) for payload in payloads], out=offsets[1:])
+    _write_array(fs, os.path.join(dirname, f'{prefix}_payload_offsets.npy'), offsets)
+    with fs.open(os.path.join(dirname, f'{prefix}_payloads.bin'), 'wb') as f:
+        f.write(b''.join(payloads))
+
+def _read_payloads(fs: fsspec.AbstractFileSystem, dirname: str, prefix: str, mmap: bool) -> _Payloads:
+    offsets = _read_array(fs, os.path.join(dirname, f'{prefix}_payload_offsets.npy'), 'r' if mmap else None)
+    path = os.path.join(dirname, f'{prefix}_payloads.bin')
+    if mmap and offsets[-1] > 0:
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        data = np.frombuffer(fs.cat_file(path), dtype=np.uint8)
+    return _Payloads(offsets, data)
+
+def _write_array(fs: fsspec.AbstractFileSystem, path: str, values: np.ndarray) -> None:
+    with fs.open(path, 'wb') as f:
+        np.save(f, values, allow_pickle=False)
+
+def _read_array(fs: fsspec.AbstractFileSystem, path: str, mmap_mode: Optional[str] = None) -> np.ndarray:
+    if mmap_mode is not None:
+        return np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+    with fs.open(path, 'rb') as f:
+        return np.load(f, allow_pickle=False)
+
+def _write_json(fs: fsspec.AbstractFileSystem, path: str, value: Any) -> None:
+    # Index keys are encoded like the payloads, so a reloaded index matches the reloaded properties.
+    with fs.open(path, 'w') as f:
+        json.dump(value, f, default=str)
+
+def _write_manifest(fs: fsspec.AbstractFileSystem, path: str, manifest: dict[str, Any]) -> None:
+    staging = os.path.join(path, f'{_MANIFEST}.tmp')
+    _write_json(fs, staging, manifest)
+    if isinstance(fs, LocalFileSystem):
+        os.replace(staging, os.path.join(path, _MANIFEST))
+    else:
+        fs.mv(staging, os.path.join(path, _MANIFEST))
+
+def _type_name(node_type: Type[GraphNode]) -> str:
+    return f'{node_type.__module__}:{node_type.__qualname__}'
+
+def _resolve_type(name: str) -> Type[GraphNode]:
+    """
+    Looks name up among the GraphNode subclasses that are already defined, so loading never imports modules.
+    """
+    for node_type in _node_types(GraphNode):
+        if _type_name(node_type) == name:
+            return node_type
+    raise ValueError(
+        f'Unknown graph node type {name} in snapshot. '
+        f'Import the module that defines it before loading the snapshot.'
+    )
+
+def _node_types(node_type: Type[GraphNode]) -> Iterator[Type[GraphNode]]:
+    for subclass in node_type.__subclasses__():
+        yield subclass
+        yield from _node_types(subclass)
+
+def _to_hashable(value: Any) -> Any:
+    # JSON turns tuples into lists.
+    return tuple(_to_hashable(item) for item in value) if isinstance(value, list) else value
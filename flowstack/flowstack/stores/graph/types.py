@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Any, NamedTuple, Optional, Self, Union, override
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Self, Union, override
 
-from pydantic import Field
+import numpy as np
+from pydantic import Field, PrivateAttr
 
-from flowstack.artifacts import Artifact, ArtifactMetadata, Text
+from flowstack.artifacts import Artifact, ArtifactInfo, ArtifactMetadata, ArtifactRelationship, Text
 from flowstack.typing import Embedding, Serializable
+from flowstack.utils.constants import GRAPH_TRIPLET_SOURCE_KEY
+from flowstack.utils.func import chain_iterables
 
 class GraphElement(Serializable, ABC):
     label: Optional[str] = Field(default=None, kw_only=True)
@@ -125,6 +128,22 @@ class Graph(Serializable):
     nodes: dict[str, GraphNode] = Field(default_factory=dict)
     relations: dict[str, GraphRelation] = Field(default_factory=dict)
     triplets: set[tuple[str, str, str]] = Field(default_factory=set)
+    indexed_properties: list[str] = Field(default_factory=lambda: [GRAPH_TRIPLET_SOURCE_KEY])
+
+    _property_index: dict[str, dict[Any, set[str]]] = PrivateAttr(default_factory=dict)
+    _ref_index: dict[str, set[str]] = PrivateAttr(default_factory=dict)
+    _subject_index: dict[str, set[tuple[str, str, str]]] = PrivateAttr(default_factory=dict)
+    _obj_index: dict[str, set[tuple[str, str, str]]] = PrivateAttr(default_factory=dict)
+    _relation_index: dict[str, set[tuple[str, str, str]]] = PrivateAttr(default_factory=dict)
+    _embedding_index: '_EmbeddingIndex' = PrivateAttr(default_factory=lambda: _EmbeddingIndex())
+
+    @override
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        for node in self.nodes.values():
+            self._index_node(node)
+        for triplet in self.triplets:
+            self._index_triplet(triplet)
 
     def ger_nodes(self) -> list[GraphNode]:
         return list(self.nodes.values())
@@ -133,13 +152,66 @@ class Graph(Serializable):
         return list(self.relations.values())
 
     def get_triplets(self) -> list[GraphTriplet]:
-        return [
-            GraphTriplet(self.nodes[subject], self.relations[relation], self.nodes[obj])
-            for subject, relation, obj in self.triplets
-        ]
+        return self.to_triplets(self.triplets)
+
+    def to_triplets(self, triplets: Iterable[tuple[str, str, str]]) -> list[GraphTriplet]:
+        return list(self.iter_triplets(triplets))
+
+    def iter_triplets(self, triplets: Iterable[tuple[str, str, str]]) -> Iterator[GraphTriplet]:
+        for subject, relation, obj in triplets:
+            yield GraphTriplet(self.nodes[subject], self.relations[relation], self.nodes[obj])
+
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self.nodes
+
+    def relation_name(self, triplet: tuple[str, str, str]) -> str:
+        return self.relations[triplet[1]].name
+
+    def node_embedding(self, node_id: str) -> Optional[Embedding]:
+        return self.nodes[node_id].embedding
+
+    def similar_nodes(
+        self,
+        query_embedding: Embedding,
+        top_k: Optional[int] = None,
+        node_ids: Optional[Iterable[str]] = None
+    ) -> list[tuple[str, float]]:
+        """
+        Node ids and cosine similarities to query_embedding, most similar first.
+        """
+        return self._embedding_index.search(query_embedding, top_k=top_k, node_ids=node_ids)
+
+    def triplets_from(self, node_id: str) -> frozenset[tuple[str, str, str]]:
+        return frozenset(self._subject_index.get(node_id, ()))
+
+    def triplets_to(self, node_id: str) -> frozenset[tuple[str, str, str]]:
+        return frozenset(self._obj_index.get(node_id, ()))
+
+    def triplets_of(self, node_id: str) -> frozenset[tuple[str, str, str]]:
+        return self.triplets_from(node_id) | self.triplets_to(node_id)
+
+    def triplets_labelled(self, relation_name: str) -> frozenset[tuple[str, str, str]]:
+        return frozenset(self._relation_index.get(relation_name, ()))
+
+    def nodes_with(self, key: str, values: Iterable[Any]) -> set[str]:
+        if key in self.indexed_properties:
+            index = self._property_index.get(key, {})
+            return set(chain_iterables(index.get(value, ()) for value in values))
+        values = list(values)
+        return {
+            node.id
+            for node in self.nodes.values()
+            if key in node.properties and node.properties[key] in values
+        }
+
+    def nodes_with_ref(self, ref_ids: Iterable[str]) -> set[str]:
+        return set(chain_iterables(self._ref_index.get(ref_id, ()) for ref_id in ref_ids))
 
     def add_node(self, node: GraphNode) -> None:
+        if node.id in self.nodes:
+            self._unindex_node(self.nodes[node.id])
         self.nodes[node.id] = node
+        self._index_node(node)
 
     def add_relation(self, relation: GraphRelation) -> None:
         if relation.source not in self.nodes:
@@ -154,17 +226,31 @@ class Graph(Serializable):
 
     def add_triplet(self, triplet: GraphTriplet) -> None:
         subject, relation, obj = triplet
-        if (subject.id, relation.id, obj.id) in self.triplets:
+        key = (subject.id, relation.id, obj.id)
+        if key in self.triplets:
+            # Upsert the relation, moving its relation-name index entry if the label changed.
+            self._unindex_triplet(key)
+            self.relations[relation.id] = relation
+            self._index_triplet(key)
             return
         self.add_node(subject)
         self.add_node(obj)
         self.relations[relation.id] = relation
-        self.triplets.add((subject.id, relation.id, obj.id))
+        self.triplets.add(key)
+        self._index_triplet(key)
 
     def delete_node(self, node_id: str) -> None:
         if node_id in self.nodes:
+            self._unindex_node(self.nodes[node_id])
             del self.nodes[node_id]
 
+    def detach_delete_node(self, node_id: str) -> None:
+        for triplet in self.triplets_of(node_id):
+            self._unindex_triplet(triplet)
+            self.triplets.remove(triplet)
+            self.delete_relation(triplet[1])
+        self.delete_node(node_id)
+
     def delete_relation(self, relation_id: Union[str, tuple[str, str]]) -> None:
         relation_id = (
             relation_id
@@ -177,11 +263,170 @@ class Graph(Serializable):
     def delete_triplet(self, triplet: tuple[str, str, str]) -> None:
         if triplet not in self.triplets:
             return
+        self._unindex_triplet(triplet)
         subject_id, relation_id, obj_id = triplet
         self.delete_node(subject_id)
         self.delete_node(relation_id)
         self.delete_relation(relation_id)
         self.triplets.remove(triplet)
 
+    def _index_node(self, node: GraphNode) -> None:
+        for key in self.indexed_properties:
+            if key in node.properties and _is_hashable(node.properties[key]):
+                index = self._property_index.setdefault(key, {})
+                index.setdefault(node.properties[key], set()).add(node.id)
+        if ref_id := _ref_id(node.metadata):
+            self._ref_index.setdefault(ref_id, set()).add(node.id)
+        if node.embedding is not None:
+            self._embedding_index.put(node.id, node.embedding)
+
+    def _unindex_node(self, node: GraphNode) -> None:
+        for key in self.indexed_properties:
+            if key in node.properties and _is_hashable(node.properties[key]):
+                _discard(self._property_index.get(key, {}), node.properties[key], node.id)
+        if ref_id := _ref_id(node.metadata):
+            _discard(self._ref_index, ref_id, node.id)
+        self._embedding_index.remove(node.id)
+
+    def _index_triplet(self, triplet: tuple[str, str, str]) -> None:
+        subject_id, relation_id, obj_id = triplet
+        self._subject_index.setdefault(subject_id, set()).add(triplet)
+        self._obj_index.setdefault(obj_id, set()).add(triplet)
+        relation = self.relations.get(relation_id)
+        if relation is not None:
+            self._relation_index.setdefault(relation.name, set()).add(triplet)
+
+    def _unindex_triplet(self, triplet: tuple[str, str, str]) -> None:
+        subject_id, relation_id, obj_id = triplet
+        _discard(self._subject_index, subject_id, triplet)
+        _discard(self._obj_index, obj_id, triplet)
+        relation = self.relations.get(relation_id)
+        if relation is not None:
+            _discard(self._relation_index, relation.name, triplet)
+
+class _EmbeddingIndex:
+    """
+    Node embeddings packed into one contiguous float32 matrix. Deleting a node
+    moves the last row into its place, so the live rows stay dense.
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.matrix: Optional[np.ndarray] = None
+        self.norms: Optional[np.ndarray] = None
+
+    def put(self, node_id: str, embedding: Embedding) -> None:
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        row = self.rows.get(node_id)
+        if row is None:
+            row = len(self.ids)
+            self._reserve(row + 1, embedding.shape[0])
+            self.ids.append(node_id)
+            self.rows[node_id] = row
+        elif embedding.shape[0] != self.matrix.shape[1]:
+            raise ValueError(
+                f'Expected an embedding of dimension {self.matrix.shape[1]}, '
+                f'got {embedding.shape[0]}.'
+            )
+        self.matrix[row] = embedding
+        self.norms[row] = np.linalg.norm(embedding)
+
+    def remove(self, node_id: str) -> None:
+        row = self.rows.pop(node_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.norms[row] = self.norms[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+        self.ids.pop()
+
+    def search(
+        self,
+        query_embedding: Embedding,
+        top_k: Optional[int] = None,
+        node_ids: Optional[Iterable[str]] = None
+    ) -> list[tuple[str, float]]:
+        if not self.ids:
+            return []
+        if node_ids is None:
+            rows = None
+            scores = _cosine_similarities(self.matrix[:len(self.ids)], self.norms[:len(self.ids)], query_embedding)
+        else:
+            rows = np.fromiter(
+                (self.rows[node_id] for node_id in node_ids if node_id in self.rows),
+                dtype=np.int64
+            )
+            scores = _cosine_similarities(self.matrix[rows], self.norms[rows], query_embedding)
+        top = _top_k(scores, top_k)
+        return [
+            (self.ids[row if rows is None else rows[row]], float(scores[row]))
+            for row in top.tolist()
+        ]
+
+    def _reserve(self, size: int, dimension: int) -> None:
+        if self.matrix is None:
+            self.matrix = np.zeros((max(size, 1024), dimension), dtype=np.float32)
+            self.norms = np.zeros(self.matrix.shape[0], dtype=np.float32)
+        elif dimension != self.matrix.shape[1]:
+            raise ValueError(
+                f'Expected an embedding of dimension {self.matrix.shape[1]}, '
+                f'got {dimension}.'
+            )
+        elif size > self.matrix.shape[0]:
+            capacity = max(size, self.matrix.shape[0] * 2)
+            matrix = np.zeros((capacity, dimension), dtype=np.float32)
+            matrix[:self.matrix.shape[0]] = self.matrix
+            norms = np.zeros(capacity, dtype=np.float32)
+            norms[:self.norms.shape[0]] = self.norms
+            self.matrix, self.norms = matrix, norms
+
+def _cosine_similarities(matrix: np.ndarray, norms: np.ndarray, query_embedding: Embedding) -> np.ndarray:
+    query = np.asarray(query_embedding, dtype=np.float32).ravel()
+    denominators = norms * (np.linalg.norm(query) or 1.0)
+    denominators[denominators == 0] = 1.0
+    return (matrix @ query) / denominators
+
+def _top_k(scores: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Positions of the top_k highest finite scores, highest first.
+    """
+    if top_k is None or top_k >= len(scores):
+        top = np.argsort(-scores, kind='stable')
+    elif top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    else:
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+    return top[np.isfinite(scores[top])]
+
+def _discard[K, V](index: dict[K, set[V]], key: K, value: V) -> None:
+    values = index.get(key)
+    if values is None:
+        return
+    values.discard(value)
+    if not values:
+        del index[key]
+
+def _is_hashable(value: Any) -> bool:
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+def _ref_id(metadata: dict[str, Any]) -> Optional[str]:
+    hierarchy = metadata.get('hierarchy') or {}
+    ref = hierarchy.get(ArtifactRelationship.REF)
+    if isinstance(ref, ArtifactInfo):
+        return ref.id
+    elif isinstance(ref, dict):
+        return ref.get('id')
+    return None
+
 def _relation_id(source: str, target: str) -> str:
     return f'{source}->{target}'
\ No newline at end of file
@@ -4,7 +4,7 @@ from typing import Optional, Unpack
 import fsspec
 
 from flowstack.artifacts import Artifact
-from flowstack.stores import VectorStoreQuery, VectorStoreQueryResult
+from flowstack.stores.vector.typing import VectorStoreQuery, VectorStoreQueryResult
 from flowstack.typing import MetadataFilters
 
 class VectorStore(ABC):
@@ -7,7 +7,8 @@ from dataclasses_json import DataClassJsonMixin
 import fsspec
 
 from flowstack.artifacts import Artifact
-from flowstack.stores import VectorStore, VectorStoreQuery, VectorStoreQueryResult
+from flowstack.stores.vector.base import VectorStore
+from flowstack.stores.vector.typing import VectorStoreQuery, VectorStoreQueryResult
 from flowstack.typing import Embedding, MetadataFilters
 
 @dataclass
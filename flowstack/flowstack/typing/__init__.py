@@ -16,4 +16,4 @@ from .models import Serializable
 from .registry import PydanticRegistry
 
 from .filtering import FilterOperator, FilterCondition, MetadataFilter, MetadataFilters, MetadataFilterInfo
-from .ai import ToolCall, ToolCallChunk, InvalidToolCall, UsageMetadata
\ No newline at end of file
+from .ai import ToolCall, ToolCallChunk, InvalidToolCall, UsageMetadata, GenerationMetrics, UsageRecord, UsageSummary
\ No newline at end of file
@@ -20,4 +20,35 @@ class InvalidToolCall(TypedDict):
 class UsageMetadata(TypedDict):
     prompt_tokens: int
     completion_tokens: int
-    total_tokens: int
\ No newline at end of file
+    total_tokens: int
+
+class GenerationMetrics(TypedDict):
+    time_to_first_token: Optional[float]
+    latency: float
+    chunks: int
+
+class UsageRecord(TypedDict):
+    component: str
+    kind: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    estimated: bool
+    latency: float
+    time_to_first_token: Optional[float]
+    cost: float
+    workflow: Optional[str]
+    run_id: Optional[str]
+
+class UsageSummary(TypedDict):
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost: float
+    latency: float
+    tokens_per_second: float
+    latency_p50: float
+    latency_p90: float
+    latency_p99: float
+    time_to_first_token_p50: Optional[float]
\ No newline at end of file
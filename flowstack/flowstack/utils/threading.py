@@ -7,6 +7,8 @@ from typing import Any, AsyncIterator, Callable, Coroutine, Generator, Iterable,
 
 from unsync import unsync
 
+_EXHAUSTED = object()
+
 class ContextThreadPoolExecutor(ThreadPoolExecutor):
     """
     ThreadPoolExecutor that copies the context to the child thread.
@@ -122,8 +124,5 @@ async def run_async_iter[T](
 ) -> AsyncIterator[T]:
     loop = asyncio.get_running_loop()
     iterator = await loop.run_in_executor(None, partial(func, **kwargs), *args)
-    while True:
-        if item := await loop.run_in_executor(None, next, iterator, None):
-            yield item
-        else:
-            break
\ No newline at end of file
+    while (item := await loop.run_in_executor(None, next, iterator, _EXHAUSTED)) is not _EXHAUSTED:
+        yield item
\ No newline at end of file
@@ -0,0 +1,220 @@
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+import statistics
+import threading
+from typing import Generator, Iterable, NamedTuple, Optional
+import uuid
+
+from flowstack.typing import UsageRecord, UsageSummary
+
+DEFAULT_LATENCY_WINDOW = 1024
+DEFAULT_MAX_RUNS = 1024
+
+class TokenPrice(NamedTuple):
+    prompt: float
+    completion: float
+    units: int = 1_000_000
+
+class UsageRun(NamedTuple):
+    workflow: str
+    run_id: str
+
+_current_run: ContextVar[Optional[UsageRun]] = ContextVar('usage_run', default=None)
+
+class _UsageStats:
+    """
+    Running totals plus a bounded window of latencies, so recording is O(1) and percentiles are computed on read.
+    """
+
+    def __init__(self, window: int):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.cost = 0.0
+        self.latency = 0.0
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.first_tokens: deque[float] = deque(maxlen=window)
+
+    def add(self, record: UsageRecord) -> None:
+        self.calls += 1
+        self.prompt_tokens += record['prompt_tokens']
+        self.completion_tokens += record['completion_tokens']
+        self.total_tokens += record['total_tokens']
+        self.cost += record['cost']
+        self.latency += record['latency']
+        self.latencies.append(record['latency'])
+        if record['time_to_first_token'] is not None:
+            self.first_tokens.append(record['time_to_first_token'])
+
+    def summary(self) -> UsageSummary:
+        latencies = _percentiles(self.latencies, (50, 90, 99))
+        return UsageSummary(
+            calls=self.calls,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            total_tokens=self.total_tokens,
+            cost=self.cost,
+            latency=self.latency,
+            tokens_per_second=self.total_tokens / self.latency if self.latency > 0 else 0.0,
+            latency_p50=float(latencies[0]),
+            latency_p90=float(latencies[1]),
+            latency_p99=float(latencies[2]),
+            time_to_first_token_p50=float(statistics.median(self.first_tokens)) if self.first_tokens else None
+        )
+
+class UsageTracker:
+    """
+    Aggregates usage records per component, per workflow and per workflow run.
+    Only the max_runs most recently active runs are kept; drop_run releases a finished run early.
+    """
+
+    def __init__(
+        self,
+        prices: dict[str, TokenPrice] = {},
+        window: int = DEFAULT_LATENCY_WINDOW,
+        max_runs: Optional[int] = DEFAULT_MAX_RUNS
+    ):
+        self.prices = dict(prices)
+        self.window = window
+        self.max_runs = max_runs
+        self._total = _UsageStats(window)
+        self._components: dict[str, _UsageStats] = {}
+        self._workflows: dict[str, _UsageStats] = {}
+        self._runs: OrderedDict[str, _UsageStats] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_price(self, component: str, prompt: float, completion: float, units: int = 1_000_000) -> None:
+        self.prices[component] = TokenPrice(prompt, completion, units)
+
+    def cost(self, component: str, prompt_tokens: int, completion_tokens: int, ndigits: int = 6) -> float:
+        price = self.prices.get(component)
+        if price is None:
+            return 0.0
+        return round((prompt_tokens * price.prompt + completion_tokens * price.completion) / price.units, ndigits)
+
+    def record(self, record: UsageRecord) -> None:
+        with self._lock:
+            self._total.add(record)
+            self._stats(self._components, record['component']).add(record)
+            if record['workflow'] is not None:
+                self._stats(self._workflows, record['workflow']).add(record)
+            if record['run_id'] is not None:
+                self._run_stats(record['run_id']).add(record)
+
+    def total(self) -> UsageSummary:
+        with self._lock:
+            return self._total.summary()
+
+    def by_component(self) -> dict[str, UsageSummary]:
+        with self._lock:
+            return {key: stats.summary() for key, stats in self._components.items()}
+
+    def by_workflow(self) -> dict[str, UsageSummary]:
+        with self._lock:
+            return {key: stats.summary() for key, stats in self._workflows.items()}
+
+    def by_run(self) -> dict[str, UsageSummary]:
+        with self._lock:
+            return {key: stats.summary() for key, stats in self._runs.items()}
+
+    def drop_run(self, run_id: str) -> Optional[UsageSummary]:
+        """
+        Removes a run and returns its summary, if it was tracked.
+        """
+        with self._lock:
+            stats = self._runs.pop(run_id, None)
+            return stats.summary() if stats is not None else None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._total = _UsageStats(self.window)
+            self._components.clear()
+            self._workflows.clear()
+            self._runs.clear()
+
+    def _stats(self, stats: dict[str, _UsageStats], key: str) -> _UsageStats:
+        if key not in stats:
+            stats[key] = _UsageStats(self.window)
+        return stats[key]
+
+    def _run_stats(self, run_id: str) -> _UsageStats:
+        stats = self._stats(self._runs, run_id)
+        self._runs.move_to_end(run_id)
+        while self.max_runs is not None and len(self._runs) > self.max_runs:
+            self._runs.popitem(last=False)
+        return stats
+
+_tracker = UsageTracker()
+
+def get_usage_tracker() -> UsageTracker:
+    return _tracker
+
+def set_usage_tracker(tracker: UsageTracker) -> None:
+    global _tracker
+    _tracker = tracker
+
+def current_run() -> Optional[UsageRun]:
+    return _current_run.get()
+
+def usage_context(workflow: str, run_id: Optional[str] = None) -> Context:
+    """
+    Returns a copy of the current context attributed to a workflow run, unless it already belongs to one.
+    Generators step through it with Context.run, so the run never leaks into their consumer.
+    """
+    context = copy_context()
+    if context.get(_current_run) is None:
+        context.run(_current_run.set, UsageRun(workflow, run_id or uuid.uuid4().hex))
+    return context
+
+@contextmanager
+def usage_run(workflow: str, run_id: Optional[str] = None) -> Generator[UsageRun, None, None]:
+    """
+    Attributes usage recorded in this context to a workflow run. Nested runs keep the outermost run.
+    """
+    run = _current_run.get()
+    if run is not None:
+        yield run
+        return
+    run = UsageRun(workflow, run_id or uuid.uuid4().hex)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+def record_usage(
+    component: str,
+    kind: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    latency: float,
+    time_to_first_token: Optional[float] = None,
+    total_tokens: Optional[int] = None,
+    estimated: bool = False
+) -> UsageRecord:
+    tracker = _tracker
+    run = _current_run.get()
+    record = UsageRecord(
+        component=component,
+        kind=kind,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=total_tokens if total_tokens is not None else prompt_tokens + completion_tokens,
+        estimated=estimated,
+        latency=latency,
+        time_to_first_token=time_to_first_token,
+        cost=tracker.cost(component, prompt_tokens, completion_tokens),
+        workflow=run.workflow if run else None,
+        run_id=run.run_id if run else None
+    )
+    tracker.record(record)
+    return record
+
+def _percentiles(values: Iterable[float], percents: tuple[int, ...]) -> list[float]:
+    values = list(values)
+    if len(values) <= 1:
+        return [float(values[0]) if values else 0.0] * len(percents)
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return [cuts[percent - 1] for percent in percents]
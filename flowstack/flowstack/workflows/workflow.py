@@ -1,4 +1,6 @@
 from abc import ABC
+import asyncio
+from contextvars import Context
 from typing import (
     Any,
     AsyncIterator,
@@ -21,6 +23,7 @@ from langgraph.pregel import All
 from pydantic import BaseModel
 
 from flowstack.utils.reflection import get_type_arg
+from flowstack.utils.usage import usage_context, usage_run
 from flowstack.workflows import WorkflowOptions
 
 _State = TypeVar('_State', TypedDict, BaseModel)
@@ -119,7 +122,8 @@ class Workflow(BaseModel, Generic[_State, _Input, _Output], ABC):
         input: Union[_State, _Input],
         **kwargs: Unpack[WorkflowOptions]
     ) -> Union[_State, _Output]:
-        return self.graph.invoke(_to_dict(input), **kwargs)
+        with usage_run(self.name):
+            return self.graph.invoke(_to_dict(input), **kwargs)
 
     @final
     async def ainvoke(
@@ -127,7 +131,8 @@ class Workflow(BaseModel, Generic[_State, _Input, _Output], ABC):
         input: Union[_State, _Input],
         **kwargs: Unpack[WorkflowOptions]
     ) -> Union[_State, _Output]:
-        return await self.graph.ainvoke(_to_dict(input), **kwargs)
+        with usage_run(self.name):
+            return await self.graph.ainvoke(_to_dict(input), **kwargs)
 
     @final
     def batch(
@@ -135,7 +140,8 @@ class Workflow(BaseModel, Generic[_State, _Input, _Output], ABC):
         inputs: list[Union[_State, _Input]],
         **kwargs: Unpack[WorkflowOptions]
     ) -> list[Union[_State, _Output]]:
-        return self.graph.batch(_to_dicts(inputs), **kwargs)
+        with usage_run(self.name):
+            return self.graph.batch(_to_dicts(inputs), **kwargs)
 
     @final
     async def abatch(
@@ -143,7 +149,8 @@ class Workflow(BaseModel, Generic[_State, _Input, _Output], ABC):
         inputs: list[Union[_State, _Input]],
         **kwargs: Unpack[WorkflowOptions]
     ) -> list[Union[_State, _Output]]:
-        return await self.graph.abatch(_to_dicts(inputs), **kwargs)
+        with usage_run(self.name):
+            return await self.graph.abatch(_to_dicts(inputs), **kwargs)
 
     @final
     def stream(
@@ -151,7 +158,7 @@ class Workflow(BaseModel, Generic[_State, _Input, _Output], ABC):
         input: Union[_State, _Input],
         **kwargs: Unpack[WorkflowOptions]
     ) -> Iterator[Union[_State, _Output]]:
-        yield from self.graph.stream(_to_dict(input), **kwargs)
+        yield from _iter_in_context(usage_context(self.name), self.graph.stream(_to_dict(input), **kwargs))
 
     @final
     async def astream(
@@ -159,7 +166,7 @@ class Workflow(BaseModel, Generic[_State, _Input, _Output], ABC):
         input: Union[_State, _Input],
         **kwargs: Unpack[WorkflowOptions]
     ) -> AsyncIterator[Union[_State, _Output]]:
-        async for chunk in self.graph.astream(_to_dict(input), **kwargs):
+        async for chunk in _aiter_in_context(usage_context(self.name), self.graph.astream(_to_dict(input), **kwargs)):
             yield chunk
 
     @final
@@ -168,7 +175,7 @@ class Workflow(BaseModel, Generic[_State, _Input, _Output], ABC):
         inputs: Iterator[Union[_State, _Input]],
         **kwargs: Unpack[WorkflowOptions]
     ) -> Iterator[Union[_State, _Output]]:
-        yield from self.graph.transform(_dict_iter(inputs), **kwargs)
+        yield from _iter_in_context(usage_context(self.name), self.graph.transform(_dict_iter(inputs), **kwargs))
 
     @final
     async def atransform(
@@ -176,7 +183,10 @@ class Workflow(BaseModel, Generic[_State, _Input, _Output], ABC):
         inputs: AsyncIterator[Union[_State, _Input]],
         **kwargs: Unpack[WorkflowOptions]
     ) -> AsyncIterator[Union[_State, _Output]]:
-        async for chunk in self.graph.atransform(_adict_iter(inputs), **kwargs):
+        async for chunk in _aiter_in_context(
+            usage_context(self.name),
+            self.graph.atransform(_adict_iter(inputs), **kwargs)
+        ):
             yield chunk
 
 def _to_dict(input: Union[_State, _Input]) -> dict[str, Any]:
@@ -195,4 +205,29 @@ def _dict_iter(inputs: Iterator[Union[_State, _Input]]) -> Iterator[dict[str, An
 
 async def _adict_iter(inputs: AsyncIterator[Union[_State, _Input]]) -> AsyncIterator[dict[str, Any]]:
     async for chunk in inputs:
-        yield _to_dict(chunk)
\ No newline at end of file
+        yield _to_dict(chunk)
+
+def _iter_in_context[T](context: Context, iterator: Iterator[T]) -> Iterator[T]:
+    """
+    Steps the iterator inside the context, so context variables it sets never reach the consumer between chunks.
+    """
+    try:
+        while True:
+            try:
+                chunk = context.run(next, iterator)
+            except StopIteration:
+                return
+            yield chunk
+    finally:
+        context.run(iterator.close)
+
+async def _aiter_in_context[T](context: Context, iterator: AsyncIterator[T]) -> AsyncIterator[T]:
+    try:
+        while True:
+            try:
+                chunk = await asyncio.create_task(anext(iterator), context=context)
+            except StopAsyncIteration:
+                return
+            yield chunk
+    finally:
+        await asyncio.create_task(iterator.aclose(), context=context)
@@ -0,0 +1,82 @@
+import asyncio
+from typing import AsyncIterator, Iterator
+
+import pytest
+
+from flowstack.components.ai.chat_generator import BaseChatGenerator, ChatPrompt
+from flowstack.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, merge_message_chunks
+from flowstack.utils import usage
+from flowstack.utils.usage import UsageTracker
+
+def _chunks() -> list[AIMessageChunk]:
+    return [
+        AIMessageChunk('Hel'),
+        AIMessageChunk('lo', tool_call_chunks=[{'index': 0, 'name': 'search', 'args': '{"q":'}]),
+        AIMessageChunk(
+            ' world',
+            tool_call_chunks=[{'index': 0, 'args': ' "x"}'}],
+            usage_metadata={'prompt_tokens': 4, 'completion_tokens': 3, 'total_tokens': 7}
+        )
+    ]
+
+class _Generator(BaseChatGenerator):
+    def _invoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        return merge_message_chunks(_chunks())
+
+    def _stream(self, prompt: ChatPrompt, **kwargs) -> Iterator[BaseMessage]:
+        yield from _chunks()
+
+    async def _astream(self, prompt: ChatPrompt, **kwargs) -> AsyncIterator[BaseMessage]:
+        for chunk in _chunks():
+            yield chunk
+
+@pytest.fixture
+def tracker(monkeypatch: pytest.MonkeyPatch) -> UsageTracker:
+    tracker = UsageTracker()
+    monkeypatch.setattr(usage, '_tracker', tracker)
+    return tracker
+
+@pytest.fixture
+def generator() -> _Generator:
+    return _Generator(name='generator')
+
+def _fields(message: BaseMessage) -> tuple:
+    return str(message), message.tool_call_chunks, message.usage_metadata
+
+def test_invoke_and_stream_produce_the_same_message(generator, tracker):
+    invoked = generator.invoke('hi')
+    streamed = merge_message_chunks(list(generator.stream('hi')))
+    async def astream() -> list[BaseMessage]:
+        return [chunk async for chunk in generator.astream('hi')]
+    assert _fields(streamed) == _fields(invoked)
+    assert _fields(merge_message_chunks(asyncio.run(astream()))) == _fields(invoked)
+    assert _fields(merge_message_chunks(list(generator.transform(iter(['hi']))))) == _fields(invoked)
+    assert tracker.total()['calls'] == 4
+    assert tracker.total()['total_tokens'] == 28
+
+def test_stream_records_usage_once(generator, tracker):
+    list(generator.stream('hi'))
+    summary = tracker.by_component()['generator']
+    assert summary['calls'] == 1
+    assert summary['total_tokens'] == 7
+
+def test_abandoned_stream_records_usage_once(generator, tracker):
+    stream = generator.stream('hi')
+    assert str(next(stream)) == 'Hel'
+    stream.close()
+    summary = tracker.by_component()['generator']
+    assert summary['calls'] == 1
+    assert summary['total_tokens'] > 0
+
+def test_extended_prompt_only_renders_new_messages():
+    rendered: list[str] = []
+    def render(message: BaseMessage) -> str:
+        rendered.append(str(message))
+        return str(message).upper()
+    prompt = ChatPrompt([HumanMessage('a'), AIMessage('b')])
+    assert prompt.render('test', render) == ['A', 'B']
+    extended = prompt.extend('c')
+    assert extended.render('test', render) == ['A', 'B', 'C']
+    assert extended.render('test', render) == ['A', 'B', 'C']
+    assert rendered == ['a', 'b', 'c']
+    assert len(prompt) == 2
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from flowstack.components.ai import history
+from flowstack.components.ai.chat_generator import BaseChatGenerator, ChatPrompt
+from flowstack.components.ai.history import SUMMARY_PREFIX, HistoryCompactor
+from flowstack.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from flowstack.utils import usage
+from flowstack.utils.usage import UsageTracker
+
+class _Summarizer(BaseChatGenerator):
+    def __init__(self):
+        super().__init__(name='summarizer')
+        self._transcripts: list[str] = []
+
+    def _invoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        self._transcripts.append(str(prompt.current))
+        return AIMessage(f'summary {len(self._transcripts)}')
+
+@pytest.fixture(autouse=True)
+def tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(history, 'count_message_tokens', lambda message: 10)
+    monkeypatch.setattr(usage, '_tracker', UsageTracker())
+
+def _conversation(turns: int) -> list[BaseMessage]:
+    messages: list[BaseMessage] = [SystemMessage('system')]
+    for turn in range(turns):
+        messages += [HumanMessage(f'h{turn}'), AIMessage(f'a{turn}')]
+    return messages
+
+def _texts(messages: list[BaseMessage]) -> list[str]:
+    return [str(message) for message in messages]
+
+def test_fitting_conversation_is_unchanged():
+    messages = _conversation(1)
+    assert HistoryCompactor(max_tokens=30, name='history').invoke(messages) is messages
+
+def test_trims_to_budget_and_keeps_system_messages():
+    messages = [SystemMessage('rules')] + _conversation(3)
+    compacted = HistoryCompactor(max_tokens=60, name='history').invoke(messages)
+    assert _texts(compacted) == ['rules', 'system', 'h1', 'a1', 'h2', 'a2']
+
+def test_newest_message_is_always_kept():
+    messages = [SystemMessage('system'), HumanMessage('h0'), HumanMessage('h1')]
+    assert _texts(HistoryCompactor(max_tokens=5, name='history').invoke(messages)) == ['system', 'h1']
+
+def test_cut_moves_past_tool_messages():
+    messages = [
+        HumanMessage('question'),
+        AIMessage('', tool_calls=[{'name': 'search', 'args': {}, 'id': 'call'}]),
+        ToolMessage('result', tool_call_id='call'),
+        HumanMessage('next')
+    ]
+    assert _texts(HistoryCompactor(max_tokens=20, name='history').invoke(messages)) == ['next']
+
+def test_summaries_only_cover_newly_evicted_messages():
+    summarizer = _Summarizer()
+    compactor = HistoryCompactor(max_tokens=40, summarizer=summarizer, summary_tokens=10, name='history')
+    messages = _conversation(3)
+    first = compactor.invoke(messages)
+    assert _texts(first) == ['system', f'{SUMMARY_PREFIX}summary 1', 'h2', 'a2']
+    assert summarizer._transcripts == ['human: h0\nassistant: a0\nhuman: h1\nassistant: a1']
+    messages += [HumanMessage('h3'), AIMessage('a3')]
+    second = compactor.invoke(messages)
+    assert _texts(second) == ['system', f'{SUMMARY_PREFIX}summary 2', 'h3', 'a3']
+    assert summarizer._transcripts[1] == 'summary 1\n\nhuman: h2\nassistant: a2'
+    assert compactor.invoke(messages)[1] is second[1]
+    assert asyncio.run(compactor.ainvoke(messages))[1] is second[1]
+    assert len(summarizer._transcripts) == 2
@@ -0,0 +1,172 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+import pytest
+
+from flowstack.components.ai import scheduling
+from flowstack.components.ai.chat_generator import BaseChatGenerator, ChatPrompt
+from flowstack.components.ai.scheduling import RateScheduler, ScheduledChatGenerator
+from flowstack.messages import AIMessage, BaseMessage
+from flowstack.utils import usage
+from flowstack.utils.usage import UsageTracker
+
+class _Timer:
+    """
+    Never fires on its own; tests advance the clock and call the scheduler's timer callback.
+    """
+
+    def __init__(self, delay: float, callback: Callable[[], None]):
+        self.delay = delay
+        self.cancelled = False
+
+    def start(self) -> None:
+        pass
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+class _RateLimitError(Exception):
+    def __init__(self, retry_after: str):
+        super().__init__('Too many requests')
+        self.status_code = 429
+        self.response = SimpleNamespace(headers={'retry-after': retry_after})
+
+class _Generator(BaseChatGenerator):
+    def __init__(self, errors: list[Exception]):
+        super().__init__(name='generator')
+        self._errors = errors
+        self._calls = 0
+
+    def _invoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        self._calls += 1
+        if self._errors:
+            raise self._errors.pop(0)
+        return AIMessage('done')
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(scheduling, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(scheduling.threading, 'Timer', _Timer)
+    monkeypatch.setattr(usage, '_tracker', UsageTracker())
+    return clock
+
+def _tick(scheduler: RateScheduler, clock: SimpleNamespace, seconds: float) -> None:
+    clock.now += seconds
+    scheduler._on_timer()
+
+def _enqueue(scheduler: RateScheduler, granted: list[str], name: str, tokens: int = 0, priority: int = 0) -> None:
+    scheduler._enqueue(tokens, priority, lambda: granted.append(name))
+
+def test_waiters_are_served_by_priority_then_arrival(clock):
+    scheduler = RateScheduler(requests_per_minute=1)
+    granted: list[str] = []
+    _enqueue(scheduler, granted, 'first')
+    _enqueue(scheduler, granted, 'low', priority=2)
+    _enqueue(scheduler, granted, 'high', priority=1)
+    _enqueue(scheduler, granted, 'low again', priority=2)
+    assert granted == ['first']
+    for _ in range(3):
+        _tick(scheduler, clock, 60)
+    assert granted == ['first', 'high', 'low', 'low again']
+
+def test_max_concurrency_caps_active_requests(clock):
+    scheduler = RateScheduler(max_concurrency=2)
+    granted: list[str] = []
+    for name in ('a', 'b', 'c'):
+        _enqueue(scheduler, granted, name)
+    assert granted == ['a', 'b']
+    scheduler.release(0)
+    assert granted == ['a', 'b', 'c']
+    assert scheduler._active == 2
+
+def test_cancelled_grant_is_refunded(clock):
+    scheduler = RateScheduler(requests_per_minute=60, tokens_per_minute=100, max_concurrency=1)
+
+    async def cancel_after_grant() -> None:
+        task = asyncio.create_task(scheduler.aacquire(40))
+        await asyncio.sleep(0)
+        assert scheduler._active == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_after_grant())
+    assert scheduler._active == 0
+    assert scheduler._requests.tokens == 60
+    assert scheduler._tokens.tokens == 100
+
+def test_cancelled_waiter_is_skipped(clock):
+    scheduler = RateScheduler(max_concurrency=1)
+    granted: list[str] = []
+    _enqueue(scheduler, granted, 'a')
+
+    async def cancel_while_waiting() -> None:
+        task = asyncio.create_task(scheduler.aacquire(0))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_waiting())
+    _enqueue(scheduler, granted, 'b')
+    scheduler.release(0)
+    assert granted == ['a', 'b']
+    assert scheduler._active == 1
+
+def test_rate_limit_pauses_and_halves_the_rate(clock):
+    scheduler = RateScheduler(requests_per_minute=60, backoff=2)
+    granted: list[str] = []
+    scheduler.on_rate_limited(retry_after=5)
+    assert scheduler._factor == 0.5
+    _enqueue(scheduler, granted, 'a')
+    _tick(scheduler, clock, 4.9)
+    assert granted == []
+    _tick(scheduler, clock, 0.1)
+    assert granted == ['a']
+    scheduler.on_rate_limited()
+    scheduler.on_rate_limited()
+    assert scheduler._factor == 0.125
+    assert scheduler._paused_until == clock.now + 8
+
+def test_success_recovers_the_rate_and_reschedules(clock):
+    scheduler = RateScheduler(requests_per_minute=1)
+    granted: list[str] = []
+    _enqueue(scheduler, granted, 'a')
+    scheduler.on_rate_limited(retry_after=0)
+    _enqueue(scheduler, granted, 'b')
+    assert scheduler._timer_deadline == pytest.approx(clock.now + 120)
+    scheduler.on_success()
+    assert scheduler._factor == pytest.approx(0.55)
+    assert scheduler._timer_deadline == pytest.approx(clock.now + 60 / 0.55)
+
+def test_release_corrects_the_token_bucket(clock):
+    scheduler = RateScheduler(tokens_per_minute=100)
+    scheduler.acquire(40)
+    assert scheduler._tokens.tokens == 60
+    scheduler.release(40, used=10)
+    assert scheduler._tokens.tokens == 90
+    scheduler.acquire(40)
+    scheduler.release(40)
+    assert scheduler._tokens.tokens == 50
+
+def test_generator_retries_rate_limited_calls(clock):
+    scheduler = RateScheduler()
+    generator = _Generator([_RateLimitError('0')])
+    scheduled = ScheduledChatGenerator(generator, scheduler, name='scheduled')
+    assert str(scheduled.invoke('hello')) == 'done'
+    assert generator._calls == 2
+    assert scheduler._factor == pytest.approx(0.55)
+    assert scheduler._active == 0
+
+def test_generator_raises_other_errors_and_exhausted_retries(clock):
+    scheduler = RateScheduler()
+    with pytest.raises(ValueError):
+        ScheduledChatGenerator(_Generator([ValueError('bad')]), scheduler, name='scheduled').invoke('hello')
+    errors: list[Exception] = [_RateLimitError('0') for _ in range(3)]
+    generator = _Generator(errors)
+    with pytest.raises(_RateLimitError):
+        ScheduledChatGenerator(generator, scheduler, max_retries=2, name='scheduled').invoke('hello')
+    assert generator._calls == 3
+    assert scheduler._active == 0
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable
+
+import pytest
+
+from flowstack.components.ai.tools import ToolExecutor
+from flowstack.core import Component
+from flowstack.messages import AIMessage, AIMessageChunk
+from flowstack.utils.threading import run_async
+
+class _Tool(Component[dict, Any]):
+    def __init__(self, func: Callable[[dict], Any], name: str):
+        super().__init__(name=name)
+        self._func = func
+
+    def invoke(self, input: dict, **kwargs) -> Any:
+        return self._func(input)
+
+    async def ainvoke(self, input: dict, **kwargs) -> Any:
+        return await run_async(self._func, input)
+
+def _sleep(args: dict) -> dict:
+    time.sleep(args['delay'])
+    return args
+
+def _fail(args: dict) -> str:
+    raise RuntimeError('tool failed')
+
+@pytest.fixture
+def executor() -> ToolExecutor:
+    return ToolExecutor({'sleep': _Tool(_sleep, 'sleep'), 'fail': _Tool(_fail, 'fail')})
+
+def _message(*delays: float) -> AIMessage:
+    return AIMessage('', tool_calls=[
+        {'name': 'sleep', 'args': {'delay': delay}, 'id': f'call-{index}'}
+        for index, delay in enumerate(delays)
+    ])
+
+def test_invoke_keeps_call_order(executor: ToolExecutor):
+    messages = executor.invoke(_message(0.2, 0.0, 0.1))
+    assert [message.tool_call_id for message in messages] == ['call-0', 'call-1', 'call-2']
+
+def test_ainvoke_keeps_call_order(executor: ToolExecutor):
+    messages = asyncio.run(executor.ainvoke(_message(0.2, 0.0, 0.1)))
+    assert [message.tool_call_id for message in messages] == ['call-0', 'call-1', 'call-2']
+    assert [message.metadata.get('status') for message in messages] == [None, None, None]
+
+def test_errors_become_tool_messages(executor: ToolExecutor):
+    message = AIMessage(
+        '',
+        tool_calls=[
+            {'name': 'fail', 'args': {}, 'id': 'failed'},
+            {'name': 'missing', 'args': {}, 'id': 'unknown'}
+        ],
+        invalid_tool_calls=[{'name': 'sleep', 'args': '{bad', 'id': 'invalid', 'error': 'bad json'}]
+    )
+    messages = executor.invoke(message)
+    assert [message.tool_call_id for message in messages] == ['failed', 'unknown', 'invalid']
+    assert all(message.metadata['status'] == 'error' for message in messages)
+    assert 'tool failed' in str(messages[0])
+    assert 'Unknown tool missing' in str(messages[1])
+    assert 'bad json' in str(messages[2])
+
+def test_errors_raise_without_handling():
+    executor = ToolExecutor({'fail': _Tool(_fail, 'fail')}, handle_errors=False)
+    with pytest.raises(RuntimeError):
+        executor.invoke(AIMessage('', tool_calls=[{'name': 'fail', 'args': {}, 'id': 'failed'}]))
+
+def test_transform_starts_calls_while_streaming():
+    started = threading.Event()
+    def record(args: dict) -> str:
+        started.set()
+        return 'done'
+    executor = ToolExecutor({'record': _Tool(record, 'record')})
+    started_early = []
+    def chunks():
+        yield AIMessageChunk(tool_call_chunks=[{'index': 0, 'name': 'record', 'id': 'first', 'args': '{"a": '}])
+        yield AIMessageChunk(tool_call_chunks=[{'index': 0, 'args': '1}'}])
+        started_early.append(started.wait(timeout=5))
+        yield AIMessageChunk(tool_call_chunks=[{'index': 1, 'name': 'record', 'id': 'second', 'args': '{}'}])
+        yield AIMessageChunk(tool_call_chunks=[{'index': 2, 'name': 'record', 'id': 'broken', 'args': '{"b"'}])
+    messages = [message for messages in executor.transform(chunks()) for message in messages]
+    assert started_early == [True]
+    assert [message.tool_call_id for message in messages] == ['first', 'second', 'broken']
+    assert [str(message) for message in messages[:2]] == ['done', 'done']
+    assert messages[2].metadata['status'] == 'error'
+
+def test_atransform_starts_calls_while_streaming():
+    started = threading.Event()
+    def record(args: dict) -> str:
+        started.set()
+        return 'done'
+    executor = ToolExecutor({'record': _Tool(record, 'record')})
+    started_early = []
+    async def chunks():
+        yield AIMessageChunk(tool_call_chunks=[{'index': 0, 'name': 'record', 'id': 'first', 'args': '{}'}])
+        for _ in range(100):
+            if started.is_set():
+                break
+            await asyncio.sleep(0.01)
+        started_early.append(started.is_set())
+        yield AIMessageChunk(tool_call_chunks=[{'index': 1, 'name': 'record', 'id': 'second', 'args': '{}'}])
+    async def collect():
+        return [message async for messages in executor.atransform(chunks()) for message in messages]
+    messages = asyncio.run(collect())
+    assert started_early == [True]
+    assert [message.tool_call_id for message in messages] == ['first', 'second']
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+from typing import Iterator
+
+import numpy as np
+import pytest
+
+from flowstack.artifacts import Artifact
+from flowstack.components.ai.chat_generator import BaseChatGenerator, ChatPrompt
+from flowstack.components.caching import CachedChatGenerator, ChatCache
+from flowstack.components.caching import chat_cache
+from flowstack.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+class _Generator(BaseChatGenerator):
+    model: str = 'small'
+
+    def __init__(self, model: str = 'small'):
+        super().__init__(model=model, name='generator')
+        self._calls: list[str] = []
+
+    def _invoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        self._calls.append(str(prompt.current))
+        return AIMessage(f'{self.model}: {prompt.current}')
+
+    def _stream(self, prompt: ChatPrompt, **kwargs) -> Iterator[BaseMessage]:
+        self._calls.append(str(prompt.current))
+        for token in ('one', ' two', ' three'):
+            yield AIMessageChunk(token)
+
+class _Embedder:
+    def __init__(self, vectors: dict[str, list[float]]):
+        self.vectors = vectors
+
+    def invoke(self, artifacts: list[Artifact]) -> list[Artifact]:
+        for artifact in artifacts:
+            artifact.embedding = np.array(self.vectors[str(artifact)])
+        return artifacts
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(chat_cache, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+def test_hit_skips_the_generator():
+    generator = _Generator()
+    cached = CachedChatGenerator(generator)
+    first = cached.invoke('hello')
+    second = cached.invoke('hello  ')
+    assert str(second) == str(first) == 'small: hello'
+    assert generator._calls == ['hello']
+
+def test_hit_returns_a_copy():
+    cached = CachedChatGenerator(_Generator())
+    cached.invoke('hello').content.clear()
+    assert str(cached.invoke('hello')) == 'small: hello'
+
+def test_ttl_expires_entries(clock):
+    generator = _Generator()
+    cached = CachedChatGenerator(generator, cache=ChatCache(ttl=10))
+    cached.invoke('hello')
+    clock.now += 9
+    cached.invoke('hello')
+    clock.now += 2
+    cached.invoke('hello')
+    assert generator._calls == ['hello', 'hello']
+
+def test_lru_evicts_least_recently_used():
+    generator = _Generator()
+    cache = ChatCache(max_size=2)
+    cached = CachedChatGenerator(generator, cache=cache)
+    cached.invoke('a')
+    cached.invoke('b')
+    cached.invoke('a')
+    cached.invoke('c')
+    assert len(cache) == 2
+    cached.invoke('a')
+    cached.invoke('b')
+    assert generator._calls == ['a', 'b', 'c', 'b']
+
+def test_kwargs_and_tool_calls_scope_keys():
+    generator = _Generator()
+    cached = CachedChatGenerator(generator)
+    def prompt(args: dict, tool_call_id: str) -> list[BaseMessage]:
+        return [
+            HumanMessage('q'),
+            AIMessage('', tool_calls=[{'name': 'search', 'args': args, 'id': 'call'}]),
+            ToolMessage('result', tool_call_id=tool_call_id),
+            HumanMessage('go')
+        ]
+    cached.invoke('hello')
+    cached.invoke('hello', temperature=0.5)
+    cached.invoke(prompt({'q': 1}, 'call'))
+    cached.invoke(prompt({'q': 2}, 'call'))
+    cached.invoke(prompt({'q': 1}, 'other'))
+    cached.invoke(prompt({'q': 1}, 'call'))
+    cached.invoke('hello', temperature=0.5)
+    assert generator._calls == ['hello', 'hello', 'go', 'go', 'go']
+
+def test_generator_config_scopes_keys():
+    cache = ChatCache()
+    small, large = _Generator('small'), _Generator('large')
+    assert str(CachedChatGenerator(small, cache=cache).invoke('hi')) == 'small: hi'
+    assert str(CachedChatGenerator(large, cache=cache).invoke('hi')) == 'large: hi'
+    assert str(CachedChatGenerator(_Generator('small'), cache=cache).invoke('hi')) == 'small: hi'
+    assert CachedChatGenerator(large, cache=cache, namespace='shared').namespace == 'shared'
+    assert small._calls == large._calls == ['hi']
+
+def test_stream_replays_cached_chunks_in_order():
+    generator = _Generator()
+    cached = CachedChatGenerator(generator)
+    first = [str(chunk) for chunk in cached.stream('hello')]
+    second = [str(chunk) for chunk in cached.stream('hello')]
+    assert first == second == ['one', ' two', ' three']
+    assert str(cached.invoke('hello')) == 'one two three'
+    assert generator._calls == ['hello']
+
+def test_semantic_match_is_scoped_by_prefix():
+    embedder = _Embedder({'hello': [1.0, 0.0], 'hello!': [0.99, 0.01], 'bye': [0.0, 1.0]})
+    generator = _Generator()
+    cached = CachedChatGenerator(generator, cache=ChatCache(embedder=embedder, similarity_threshold=0.95))
+    system = SystemMessage('be brief')
+    cached.invoke([system, HumanMessage('hello')])
+    assert str(cached.invoke([system, HumanMessage('hello!')])) == 'small: hello'
+    cached.invoke([system, HumanMessage('bye')])
+    cached.invoke([HumanMessage('hello!')])
+    assert generator._calls == ['hello', 'bye', 'hello!']
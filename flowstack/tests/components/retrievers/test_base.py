@@ -0,0 +1,29 @@
+import asyncio
+from typing import Iterator
+
+from flowstack.artifacts import Artifact, Text
+from flowstack.components.retrievers.base import BaseRetriever
+
+class _PagedRetriever(BaseRetriever):
+    def _invoke(self, query: Artifact, **kwargs) -> list[Artifact]:
+        return [artifact for page in self._stream(query, **kwargs) for artifact in page]
+
+    def _stream(self, query: Artifact, **kwargs) -> Iterator[list[Artifact]]:
+        yield [Text(f'{query} 1')]
+        yield []
+        yield [Text(f'{query} 2')]
+
+class _SingleRetriever(BaseRetriever):
+    def _invoke(self, query: Artifact, **kwargs) -> list[Artifact]:
+        return [Text(str(query))]
+
+async def _collect(retriever: BaseRetriever, query: str) -> list[list[str]]:
+    return [[str(artifact) for artifact in page] async for page in retriever.astream(query)]
+
+def test_astream_iterates_overridden_stream():
+    pages = asyncio.run(_collect(_PagedRetriever(name='paged'), 'query'))
+    assert pages == [['query 1'], [], ['query 2']]
+
+def test_astream_defaults_to_a_single_invoke():
+    pages = asyncio.run(_collect(_SingleRetriever(name='single'), 'query'))
+    assert pages == [['query']]
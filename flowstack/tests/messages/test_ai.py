@@ -0,0 +1,59 @@
+import pytest
+
+from flowstack.messages import AIMessageChunk, HumanMessage, merge_message_chunks
+
+def test_merge_concatenates_adjacent_text():
+    merged = merge_message_chunks([AIMessageChunk('Hel'), AIMessageChunk('lo'), AIMessageChunk(' world')])
+    assert [artifact.content for artifact in merged.content] == ['Hello world']
+
+def test_merge_keeps_non_adjacent_artifacts_apart():
+    merged = merge_message_chunks([
+        AIMessageChunk('a'),
+        AIMessageChunk(['b', 'c']),
+        AIMessageChunk([]),
+        AIMessageChunk('d')
+    ])
+    assert [artifact.content for artifact in merged.content] == ['ab', 'cd']
+
+def test_merge_does_not_mutate_chunks():
+    first, second = AIMessageChunk('a'), AIMessageChunk('b')
+    merge_message_chunks([first, second])
+    assert str(first) == 'a' and str(second) == 'b'
+
+def test_merge_tool_call_chunks_by_index():
+    merged = merge_message_chunks([
+        AIMessageChunk(tool_call_chunks=[{'index': 0, 'name': 'search', 'id': 'call-0', 'args': '{"q": '}]),
+        AIMessageChunk(tool_call_chunks=[
+            {'index': 1, 'name': 'lookup', 'id': 'call-1', 'args': '{}'},
+            {'index': 0, 'args': '"flow"}'}
+        ]),
+        AIMessageChunk(tool_call_chunks=[{'name': 'unindexed', 'args': '{}'}])
+    ])
+    assert merged.tool_call_chunks == [
+        {'index': 0, 'name': 'search', 'id': 'call-0', 'args': '{"q": "flow"}'},
+        {'index': 1, 'name': 'lookup', 'id': 'call-1', 'args': '{}'},
+        {'name': 'unindexed', 'args': '{}'}
+    ]
+
+def test_merge_sums_usage_metadata():
+    merged = merge_message_chunks([
+        AIMessageChunk('a', usage_metadata={'prompt_tokens': 5, 'completion_tokens': 1, 'total_tokens': 6}),
+        AIMessageChunk('b'),
+        AIMessageChunk('c', usage_metadata={'prompt_tokens': 0, 'completion_tokens': 2, 'total_tokens': 2})
+    ])
+    assert merged.usage_metadata == {'prompt_tokens': 5, 'completion_tokens': 3, 'total_tokens': 8}
+    assert merge_message_chunks([AIMessageChunk('a'), AIMessageChunk('b')]).usage_metadata is None
+
+def test_add_matches_merge():
+    chunks = [AIMessageChunk('a', metadata={'x': 1}), AIMessageChunk('b', metadata={'y': 2})]
+    added = chunks[0] + chunks[1]
+    assert str(added) == 'ab'
+    assert added.metadata == {'x': 1, 'y': 2}
+
+def test_merge_rejects_empty_sequence():
+    with pytest.raises(ValueError):
+        merge_message_chunks([])
+
+def test_merge_single_chunk_is_returned_as_is():
+    message = HumanMessage('hi')
+    assert merge_message_chunks([message]) is message
@@ -0,0 +1,19 @@
+from flowstack.messages import HumanMessage
+
+def test_cached_memoizes_per_key():
+    message = HumanMessage('hi')
+    calls: list[str] = []
+    def compute(message: HumanMessage) -> str:
+        calls.append('compute')
+        return str(message).upper()
+    assert message.cached('test', compute) == message.cached('test', compute) == 'HI'
+    assert calls == ['compute']
+    assert message.get_cached('other') is None
+
+def test_model_copy_resets_cache():
+    message = HumanMessage('hi')
+    message.cached('test', str)
+    for copy in (message.model_copy(update={'metadata': {'edited': True}}), message.model_copy(deep=True)):
+        assert copy.get_cached('test') is None
+        copy.cached('test', lambda message: 'copy')
+    assert message.get_cached('test') == 'hi'
@@ -0,0 +1,169 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from flowstack.artifacts import ArtifactRelationship
+from flowstack.stores import ChunkNode, CompactGraph, Graph, GraphRelation, GraphStore, SimpleGraphStore
+from flowstack.utils.constants import GRAPH_TRIPLET_SOURCE_KEY
+
+def _node(node_id: str, embedding: list[float]) -> ChunkNode:
+    return ChunkNode(text=node_id, id_=node_id, embedding=np.array(embedding))
+
+@pytest.fixture(params=[Graph, CompactGraph])
+def store(request) -> SimpleGraphStore:
+    """
+    a -knows-> b -knows-> c -likes-> d, and a -likes-> e.
+    """
+    store = SimpleGraphStore(request.param())
+    store.upsert_nodes([
+        _node('a', [1.0, 1.0]),
+        _node('b', [1.0, 0.0]),
+        _node('c', [1.0, 0.1]),
+        _node('d', [0.1, 1.0]),
+        _node('e', [0.0, 1.0])
+    ])
+    store.upsert_relations([
+        GraphRelation(source='a', target='b', label='knows'),
+        GraphRelation(source='b', target='c', label='knows'),
+        GraphRelation(source='c', target='d', label='likes'),
+        GraphRelation(source='a', target='e', label='likes')
+    ])
+    return store
+
+def _pairs(triplets) -> list[tuple[str, str]]:
+    return [(subject.id, obj.id) for subject, _, obj in triplets]
+
+def _start(store: SimpleGraphStore) -> list:
+    return store.get(ids=['a'])
+
+@pytest.mark.parametrize('depth, expected', [
+    (1, {('a', 'b'), ('a', 'e')}),
+    (2, {('a', 'b'), ('a', 'e'), ('b', 'c')}),
+    (3, {('a', 'b'), ('a', 'e'), ('b', 'c'), ('c', 'd')})
+])
+def test_get_rel_map_depth(store, depth, expected):
+    assert set(_pairs(store.get_rel_map(_start(store), depth=depth))) == expected
+
+def test_get_rel_map_ignore_rels(store):
+    triplets = store.get_rel_map(_start(store), ignore_rels=['likes'], depth=3)
+    assert set(_pairs(triplets)) == {('a', 'b'), ('b', 'c')}
+
+@pytest.mark.parametrize('limit', [0, 1, 2, 3])
+def test_get_rel_map_limit(store, limit):
+    assert len(store.get_rel_map(_start(store), depth=3, limit=limit)) == limit
+
+@pytest.mark.parametrize('query_embedding, first', [
+    ([0.0, 1.0], ('a', 'e')),
+    ([1.0, 0.0], ('a', 'b'))
+])
+def test_get_rel_map_ranks_by_query_embedding(store, query_embedding, first):
+    triplets = store.get_rel_map(_start(store), depth=1, query_embedding=np.array(query_embedding))
+    assert _pairs(triplets)[0] == first
+    assert _pairs(store.get_rel_map(_start(store), depth=1, limit=1, query_embedding=np.array(query_embedding))) == [first]
+
+def test_get_rel_map_starts_from_similar_nodes(store):
+    triplets = store.get_rel_map([], depth=1, query_embedding=np.array([0.0, 1.0]), similarity_top_k=1)
+    assert set(_pairs(triplets)) == {('a', 'e')}
+
+@pytest.mark.parametrize('top_k, expected', [(None, 1), (2, 2)])
+def test_vector_query_top_k(store, top_k, expected):
+    query = {'query_embedding': np.array([0.0, 1.0]), 'similarity_top_k': top_k}
+    nodes, similarities = store.vector_query(**query)
+    assert nodes[0].id == 'e'
+    assert len(nodes) == len(similarities) == expected
+    assert query['similarity_top_k'] == top_k
+
+def test_upsert_relations_replaces_label_and_properties(store):
+    store.upsert_relations([GraphRelation(source='a', target='b', label='likes', properties={'w': 1})])
+    store.upsert_relations([GraphRelation(source='a', target='b', label='likes', properties={'w': 2})])
+    relations = {(subject.id, obj.id): relation for subject, relation, obj in store.get_triplets()}
+    assert relations[('a', 'b')].label == 'likes'
+    assert relations[('a', 'b')].properties == {'w': 2}
+    assert len(relations) == 4
+    likes = {(subject.id, obj.id) for subject, _, obj in store.get_triplets(relation_names=['likes'])}
+    knows = {(subject.id, obj.id) for subject, _, obj in store.get_triplets(relation_names=['knows'])}
+    assert likes == {('a', 'b'), ('a', 'e'), ('c', 'd')}
+    assert knows == {('b', 'c')}
+    assert {node.id for node in store.get(relation_names=['likes'])} >= {'a', 'b'}
+
+def _add_artifact_nodes(store: SimpleGraphStore) -> None:
+    """
+    r1 and r2 reference doc1, x was extracted from doc2; r1 -mentions-> a, r2 -next-> r1 and x -mentions-> b.
+    """
+    store.upsert_nodes([
+        ChunkNode(text='r1', id_='r1', metadata={'hierarchy': {ArtifactRelationship.REF: {'id': 'doc1'}}}),
+        ChunkNode(text='r2', id_='r2', metadata={'hierarchy': {ArtifactRelationship.REF: {'id': 'doc1'}}}),
+        ChunkNode(text='x', id_='x', properties={GRAPH_TRIPLET_SOURCE_KEY: 'doc2'})
+    ])
+    store.upsert_relations([
+        GraphRelation(source='r1', target='a', label='mentions'),
+        GraphRelation(source='r2', target='r1', label='next'),
+        GraphRelation(source='x', target='b', label='mentions')
+    ])
+
+def _snapshot(store: SimpleGraphStore) -> tuple[set[str], set[tuple[str, str, str]]]:
+    return (
+        set(store._graph.nodes),
+        {(subject.id, relation.label, obj.id) for subject, relation, obj in store.get_triplets()}
+    )
+
+def test_delete_artifacts_by_ref(store):
+    _add_artifact_nodes(store)
+    store.delete_artifacts(ref_artifact_ids=['doc1'])
+    nodes, triplets = _snapshot(store)
+    assert nodes == {'a', 'b', 'c', 'd', 'e', 'x'}
+    assert not any('r1' in (subject, obj) or 'r2' in (subject, obj) for subject, _, obj in triplets)
+    assert ('x', 'mentions', 'b') in triplets
+    assert store.get(ref_ids=['doc1']) == []
+
+def test_delete_artifacts_by_artifact_id(store):
+    _add_artifact_nodes(store)
+    store.delete_artifacts(artifact_ids=['doc2'])
+    nodes, triplets = _snapshot(store)
+    assert 'x' not in nodes
+    assert ('x', 'mentions', 'b') not in triplets
+    assert {'r1', 'r2'} <= nodes
+
+@pytest.mark.parametrize('graph_type', [Graph, CompactGraph])
+def test_adelete_artifacts_batches_match_sync(graph_type):
+    def build() -> SimpleGraphStore:
+        store = SimpleGraphStore(graph_type())
+        store.upsert_nodes([_node(node_id, [1.0, 0.0]) for node_id in 'ab'])
+        _add_artifact_nodes(store)
+        return store
+    sync_store, async_store = build(), build()
+    sync_store.delete_artifacts(artifact_ids=['doc2', 'missing'], ref_artifact_ids=['doc1', 'doc3'])
+    asyncio.run(async_store.adelete_artifacts(
+        artifact_ids=['doc2', 'missing'],
+        ref_artifact_ids=['doc1', 'doc3'],
+        batch_size=1,
+        max_concurrency=2
+    ))
+    assert _snapshot(async_store) == _snapshot(sync_store)
+    assert _snapshot(async_store)[0] == {'a', 'b'}
+
+def _keys(triplets) -> list[tuple[str, str, str]]:
+    return sorted((subject.id, relation.id, obj.id) for subject, relation, obj in triplets)
+
+@pytest.mark.parametrize('query', [
+    {},
+    {'ids': ['b']},
+    {'sources': ['a']},
+    {'targets': ['c', 'd']},
+    {'relation_names': ['likes']},
+    {'ids': ['a'], 'relation_names': ['knows']},
+    {'properties': {'w': 1}}
+])
+def test_iter_triplets_matches_get_triplets(store, query):
+    store.upsert_relations([GraphRelation(source='c', target='d', label='likes', properties={'w': 1})])
+    expected = _keys(store.get_triplets(**query))
+    assert expected
+    assert _keys(store.iter_triplets(**query)) == expected
+    assert _keys(GraphStore.iter_triplets(store, **query)) == expected
+
+    async def collect(iterator) -> list:
+        return [triplet async for triplet in iterator]
+
+    assert _keys(asyncio.run(collect(store.aiter_triplets(**query)))) == expected
+    assert _keys(asyncio.run(collect(GraphStore.aiter_triplets(store, **query)))) == expected
@@ -0,0 +1,77 @@
+import datetime as dt
+from decimal import Decimal
+import json
+import os.path
+
+import numpy as np
+import pytest
+
+from flowstack.stores import ChunkNode, CompactGraph, GraphRelation, SimpleGraphStore, load_snapshot, save_snapshot
+from flowstack.utils.constants import GRAPH_TRIPLET_SOURCE_KEY
+
+@pytest.fixture
+def graph() -> CompactGraph:
+    graph = CompactGraph()
+    store = SimpleGraphStore(graph)
+    store.upsert_nodes([
+        ChunkNode(text=node_id, id_=node_id, embedding=np.array([1.0, 0.0]), properties={GRAPH_TRIPLET_SOURCE_KEY: 'doc'})
+        for node_id in 'abc'
+    ])
+    store.upsert_relations([
+        GraphRelation(source='a', target='b', label='knows'),
+        GraphRelation(source='b', target='c')
+    ])
+    return graph
+
+def _manifest(path: str) -> dict:
+    with open(os.path.join(path, 'manifest.json')) as f:
+        return json.load(f)
+
+def test_round_trip(graph, tmp_path):
+    path = str(tmp_path / 'graph')
+    save_snapshot(graph, path)
+    loaded = load_snapshot(path)
+    assert sorted(loaded.nodes) == ['a', 'b', 'c']
+    assert loaded.nodes_with(GRAPH_TRIPLET_SOURCE_KEY, ['doc']) == {'a', 'b', 'c'}
+    assert {(subject, obj) for subject, _, obj in loaded.triplets} == {('a', 'b'), ('b', 'c')}
+
+def test_incremental_save_appends_segment(graph, tmp_path):
+    path = str(tmp_path / 'graph')
+    save_snapshot(graph, path)
+    loaded = load_snapshot(path)
+    SimpleGraphStore(loaded).upsert_nodes([ChunkNode(text='d', id_='d')])
+    save_snapshot(loaded, path)
+    assert _manifest(path)['segments'] == ['segment-00001']
+    assert sorted(load_snapshot(path).nodes) == ['a', 'b', 'c', 'd']
+
+def test_rewrite_replaces_base(graph, tmp_path):
+    path = str(tmp_path / 'graph')
+    save_snapshot(graph, path)
+    base = _manifest(path)['base']
+    save_snapshot(graph, path, incremental=False)
+    assert _manifest(path)['base'] != base
+    assert sorted(os.listdir(path)) == sorted([_manifest(path)['base'], 'manifest.json'])
+
+def test_rejects_unknown_node_types(graph, tmp_path):
+    path = str(tmp_path / 'graph')
+    save_snapshot(graph, path)
+    manifest = _manifest(path)
+    manifest['types'] = ['os:system']
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+def test_round_trip_non_json_indexed_values(tmp_path):
+    created = dt.datetime(2024, 5, 1, 12, 30)
+    graph = CompactGraph(indexed_properties=['created', 'price'])
+    SimpleGraphStore(graph).upsert_nodes([
+        ChunkNode(text='a', id_='a', properties={'created': created, 'price': Decimal('9.99')}),
+        ChunkNode(text='b', id_='b', properties={'created': created, 'price': Decimal('1.50')})
+    ])
+    path = str(tmp_path / 'graph')
+    save_snapshot(graph, path)
+    loaded = load_snapshot(path)
+    assert loaded.nodes_with('created', [str(created)]) == {'a', 'b'}
+    assert loaded.nodes_with('price', ['9.99']) == {'a'}
+    assert loaded.nodes['a'].properties == {'created': str(created), 'price': '9.99'}
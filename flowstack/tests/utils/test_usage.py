@@ -0,0 +1,58 @@
+import pytest
+
+from flowstack.utils import usage
+from flowstack.utils.usage import TokenPrice, UsageTracker, _percentiles, current_run, record_usage, usage_run
+
+@pytest.fixture
+def tracker(monkeypatch: pytest.MonkeyPatch) -> UsageTracker:
+    tracker = UsageTracker(prices={'chat': TokenPrice(prompt=2.0, completion=8.0)}, max_runs=2)
+    monkeypatch.setattr(usage, '_tracker', tracker)
+    return tracker
+
+def test_record_aggregates_by_component_workflow_and_run(tracker):
+    with usage_run('workflow', run_id='run'):
+        record_usage('chat', 'chat', prompt_tokens=10, completion_tokens=5, latency=0.5, time_to_first_token=0.1)
+        record_usage('embedder', 'embedding', prompt_tokens=20, completion_tokens=0, latency=0.5)
+    record_usage('chat', 'chat', prompt_tokens=1, completion_tokens=1, latency=1.0)
+    components = tracker.by_component()
+    assert components['chat']['calls'] == 2 and components['chat']['total_tokens'] == 17
+    assert components['embedder']['prompt_tokens'] == 20
+    assert tracker.by_workflow()['workflow']['calls'] == 2
+    assert tracker.by_run()['run']['total_tokens'] == 35
+    total = tracker.total()
+    assert total['calls'] == 3 and total['total_tokens'] == 37
+    assert total['tokens_per_second'] == pytest.approx(18.5)
+    assert total['time_to_first_token_p50'] == 0.1
+
+def test_runs_are_bounded_and_droppable(tracker):
+    for run_id in ('a', 'b', 'a', 'c'):
+        with usage_run('workflow', run_id=run_id):
+            record_usage('chat', 'chat', prompt_tokens=1, completion_tokens=1, latency=0.1)
+    assert list(tracker.by_run()) == ['a', 'c']
+    assert tracker.drop_run('a')['calls'] == 2
+    assert tracker.drop_run('a') is None
+    assert list(tracker.by_run()) == ['c']
+    assert tracker.by_workflow()['workflow']['calls'] == 4
+
+def test_percentiles():
+    assert _percentiles([], (50, 90)) == [0.0, 0.0]
+    assert _percentiles([3], (50, 90)) == [3.0, 3.0]
+    assert _percentiles(range(1, 11), (50, 90, 99)) == pytest.approx([5.5, 9.1, 9.91])
+
+def test_cost_uses_token_prices(tracker):
+    assert tracker.cost('chat', prompt_tokens=1_000, completion_tokens=500) == 0.006
+    assert tracker.cost('other', prompt_tokens=1_000, completion_tokens=500) == 0.0
+    tracker.set_price('other', prompt=1.0, completion=1.0, units=1_000)
+    assert tracker.cost('other', prompt_tokens=1_000, completion_tokens=500) == 1.5
+    record = record_usage('chat', 'chat', prompt_tokens=1_000, completion_tokens=500, latency=0.1)
+    assert record['cost'] == tracker.total()['cost'] == 0.006
+
+def test_nested_runs_keep_the_outer_run(tracker):
+    with usage_run('outer', run_id='outer') as outer:
+        with usage_run('inner', run_id='inner') as inner:
+            assert inner is outer
+            record_usage('chat', 'chat', prompt_tokens=1, completion_tokens=1, latency=0.1)
+        assert current_run() is outer
+    assert current_run() is None
+    assert list(tracker.by_run()) == ['outer']
+    assert list(tracker.by_workflow()) == ['outer']
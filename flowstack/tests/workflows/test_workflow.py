@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Optional, TypedDict
+
+import pytest
+
+from flowstack.utils import usage
+from flowstack.utils.usage import UsageRun, UsageTracker, current_run, record_usage
+from flowstack.workflows.workflow import Workflow
+
+class _State(TypedDict):
+    count: int
+
+class _Workflow(Workflow[_State, _State, _State]):
+    def _build(self) -> None:
+        def step(state: dict[str, Any]) -> dict[str, Any]:
+            record_usage('chat', 'chat', prompt_tokens=1, completion_tokens=1, latency=0.1)
+            return {'count': state['count'] + 1}
+        self.builder.add_node('first', step)
+        self.builder.add_node('second', step)
+        self.builder.set_entry_point('first')
+        self.builder.add_edge('first', 'second')
+        self.builder.set_finish_point('second')
+
+@pytest.fixture
+def tracker(monkeypatch: pytest.MonkeyPatch) -> UsageTracker:
+    tracker = UsageTracker()
+    monkeypatch.setattr(usage, '_tracker', tracker)
+    return tracker
+
+@pytest.fixture
+def workflow() -> _Workflow:
+    workflow = _Workflow(name='counter')
+    workflow.__post_init__()
+    return workflow
+
+def test_stream_does_not_leak_the_run_between_chunks(workflow, tracker):
+    between: list[Optional[UsageRun]] = []
+    for _ in workflow.stream({'count': 0}):
+        between.append(current_run())
+    assert between == [None, None]
+    runs = tracker.by_run()
+    assert len(runs) == 1 and next(iter(runs.values()))['calls'] == 2
+    assert tracker.by_workflow()['counter']['calls'] == 2
+
+def test_astream_does_not_leak_the_run_between_chunks(workflow, tracker):
+    async def interleave() -> list[Optional[UsageRun]]:
+        first, second = workflow.astream({'count': 0}), workflow.astream({'count': 5})
+        between = []
+        for stream in (first, second, first, second):
+            await anext(stream)
+            between.append(current_run())
+        await first.aclose()
+        await second.aclose()
+        return between
+    assert asyncio.run(interleave()) == [None] * 4
+    assert [summary['calls'] for summary in tracker.by_run().values()] == [2, 2]
@@ -1 +1 @@
-from .vector_store import ChromaVectorStore
\ No newline at end of file
+from .vector_store import ChromaVectorStore, ChromaFilters, LazyArtifacts
\ No newline at end of file
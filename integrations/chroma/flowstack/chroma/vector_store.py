@@ -1,10 +1,18 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+import copy
+from functools import lru_cache
 import json
 import logging
 import math
 import os.path
-from typing import Any, Generator, Optional, Unpack
+import time
+from typing import Any, Coroutine, Generator, Iterator, NamedTuple, Optional, Sequence, Union, Unpack, overload
+from weakref import WeakKeyDictionary
 
 import chromadb
+from chromadb.api.models.AsyncCollection import AsyncCollection
 from chromadb.api.models.Collection import Collection
 import fsspec
 
@@ -13,19 +21,24 @@ from flowstack.stores import VectorStore, VectorStoreQuery, VectorStoreQueryResu
 from flowstack.typing import Embedding, FilterCondition, FilterOperator, MetadataFilter, MetadataFilters
 from flowstack.utils.func import tzip
 from flowstack.utils.string import truncate_text
-from flowstack.utils.threading import run_async
+from flowstack.utils.threading import gated_coroutine, get_executor, run_async
 
 MAX_CHUNK_SIZE = 41665
+DEFAULT_PAGE_SIZE = 5000
+DEFAULT_INSERT_CONCURRENCY = 4
+DOCUMENT_FILTER_KEY = 'content'
 logger = logging.getLogger(__name__)
 
 class ChromaVectorStore(VectorStore):
     _collection: Collection
+    _async_collection: Optional[AsyncCollection]
     collection_name: Optional[str]
     collection_kwargs: dict[str, Any]
     host: Optional[str]
     port: Optional[int]
     headers: Optional[dict[str, str]]
     ssl: bool
+    max_concurrency: Optional[int]
     stores_text: bool = True
     is_flat_metadata: bool = True
 
@@ -38,7 +51,9 @@ class ChromaVectorStore(VectorStore):
         port: Optional[int] = None,
         headers: Optional[dict[str, str]] = None,
         ssl: bool = False,
-        fs: Optional[fsspec.AbstractFileSystem] = None
+        fs: Optional[fsspec.AbstractFileSystem] = None,
+        async_collection: Optional[AsyncCollection] = None,
+        max_concurrency: Optional[int] = None
     ):
         self.collection_name = collection_name
         self.collection_kwargs = collection_kwargs or {}
@@ -46,6 +61,12 @@ class ChromaVectorStore(VectorStore):
         self.port = port
         self.headers = headers
         self.ssl = ssl
+        self.max_concurrency = max_concurrency
+        # The async HTTP client, its lock and the semaphore are bound to the event loop they are created in,
+        # so they are created lazily per running loop.
+        self._async_collection = async_collection
+        self._use_async_client = collection is None
+        self._loop_states: WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = WeakKeyDictionary()
         if collection is None:
             client = chromadb.HttpClient(
                 host=self.host,
@@ -55,7 +76,7 @@ class ChromaVectorStore(VectorStore):
             )
             self._collection = client.get_or_create_collection(
                 name=collection_name,
-                **collection_kwargs
+                **self.collection_kwargs
             )
         else:
             self._collection = collection
@@ -67,123 +88,199 @@ class ChromaVectorStore(VectorStore):
         fs: Optional[fsspec.AbstractFileSystem] = None,
         offset: Optional[int] = None,
         limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        include_embeddings: bool = False,
         **kwargs
     ) -> None:
-        data = self._collection.get(offset=offset, limit=limit)
+        """
+        Writes the collection to path as JSON Lines, one record per artifact,
+        fetching it page by page so memory stays bounded by page_size.
+        """
         fs = fs or self._fs
         dirname = os.path.dirname(path)
-        if not fs.exists(dirname):
+        if dirname and not fs.exists(dirname):
             fs.makedirs(dirname)
+
+        include = ['documents', 'metadatas']
+        if include_embeddings:
+            include.append('embeddings')
+
+        count = 0
         with fs.open(path, 'w') as f:
-            json.dump(data, f)
+            for page in self._iter_pages(
+                include,
+                offset=offset or 0,
+                limit=limit,
+                page_size=page_size or DEFAULT_PAGE_SIZE
+            ):
+                for record in _to_records(page, include_embeddings):
+                    f.write(json.dumps(record))
+                    f.write('\n')
+                count += len(page['ids'])
+                logger.info(f'> Persisted {count} artifacts to {path}.')
+
+    def _iter_pages(
+        self,
+        include: list[str],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Iterator[dict[str, Any]]:
+        remaining = limit
+        while remaining is None or remaining > 0:
+            n = page_size if remaining is None else min(page_size, remaining)
+            page = self._collection.get(offset=offset, limit=n, include=include)
+            if not page['ids']:
+                break
+            yield page
+            offset += len(page['ids'])
+            if remaining is not None:
+                remaining -= len(page['ids'])
+            if len(page['ids']) < n:
+                break
 
     def retrieve(self, **query: Unpack[VectorStoreQuery]) -> VectorStoreQueryResult:
         query.setdefault('similarity_top_k', 1)
-        where = _to_chroma_filters(query['filters']) if query['filters'] else {}
-        if not query['query_embedding']:
-            return self._get(where, query['similarity_top_k'], **query)
-        return self._retrieve(query['query_embedding'], where, query['similarity_top_k'], **query)
+        filters = _to_chroma_filters(query.get('filters'))
+        if query.get('query_embedding') is None:
+            return self._get(filters, query['similarity_top_k'])
+        return self._retrieve(query['query_embedding'], filters, query['similarity_top_k'])
 
     def _retrieve(
         self,
         query_embedding: Embedding,
-        where: dict,
+        filters: 'ChromaFilters',
         n_results: int,
         **kwargs
     ) -> VectorStoreQueryResult:
         result = self._collection.query(
             query_embeddings=query_embedding,
-            where=where,
+            where=filters.where,
+            where_document=filters.where_document,
             n_results=n_results,
             **kwargs
         )
-
-        logger.debug(f'> Top {len(result['documents'][0])} artifacts:')
-        artifacts: list[Artifact] = []
-        ids: list[str] = []
-        similarities: list[float] = []
-
-        for artifact_id, text, metadata, distance in tzip(
-            result['ids'][0],
-            result['documents'][0],
-            result['metadatas'][0],
-            result['distances'][0]
-        ):
-            artifact = artifact_registry.deserialize(dict(metadata))
-            artifact.set_content(text)
-            similarity = math.exp(-distance)
-
-            artifacts.append(artifact)
-            ids.append(artifact_id)
-            similarities.append(similarity)
-            logger.debug(
-                f"> [Artifact {artifact_id}] [Similarity score: {similarity} - using query()] "
-                f"{truncate_text(str(text), 100)}"
-            )
-
-        return VectorStoreQueryResult(artifacts=artifacts, ids=ids, similarities=similarities)
+        return _to_query_result(result)
 
     def _get(
         self,
-        where: dict,
+        filters: 'ChromaFilters',
         limit: Optional[int],
         **kwargs
     ) -> VectorStoreQueryResult:
-        result = self._collection.get(where=where, limit=limit, **kwargs)
+        result = self._collection.get(
+            where=filters.where,
+            where_document=filters.where_document,
+            limit=limit,
+            **kwargs
+        )
+        return _to_get_result(result)
 
-        logger.debug(f'> Top {len(result['documents'])} artifacts:')
-        artifacts: list[Artifact] = []
-        ids: list[str] = []
+    async def aretrieve(self, **query: Unpack[VectorStoreQuery]) -> VectorStoreQueryResult:
+        collection = await self._aget_collection()
+        if collection is None:
+            return await run_async(self.retrieve, **query)
 
-        if not result['ids']:
-            result['ids'] = []
+        query.setdefault('similarity_top_k', 1)
+        filters = _to_chroma_filters(query.get('filters'))
+        if query.get('query_embedding') is None:
+            result = await self._arun(collection.get(
+                where=filters.where,
+                where_document=filters.where_document,
+                limit=query['similarity_top_k']
+            ))
+            return _to_get_result(result)
+        result = await self._arun(collection.query(
+            query_embeddings=query['query_embedding'],
+            where=filters.where,
+            where_document=filters.where_document,
+            n_results=query['similarity_top_k']
+        ))
+        return _to_query_result(result)
 
-        for artifact_id, text, metadata in tzip(
-            result['ids'],
-            result['documents'],
-            result['metadatas']
-        ):
-            artifact = artifact_registry.deserialize(metadata)
-            artifact.set_content(text)
+    def insert(
+        self,
+        artifacts: list[Artifact],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> list[str]:
+        if not artifacts:
+            return []
 
-            artifacts.append(artifact)
-            ids.append(artifact_id)
-            logger.debug(
-                f"> [Artifact {artifact_id}] [Similarity score: N/A - using get()] "
-                f"{truncate_text(str(text), 100)}"
-            )
+        batch_size = batch_size or MAX_CHUNK_SIZE
+        max_concurrency = max_concurrency or self.max_concurrency or DEFAULT_INSERT_CONCURRENCY
+        start = time.perf_counter()
+        all_ids: list[str] = []
 
-        return VectorStoreQueryResult(artifacts=artifacts, ids=ids)
+        if len(artifacts) <= batch_size:
+            batch = _to_batch(artifacts)
+            self._collection.add(**batch)
+            all_ids.extend(batch['ids'])
+            _log_throughput(len(all_ids), start)
+            return all_ids
 
-    async def aretrieve(self, **query: Unpack[VectorStoreQuery]) -> VectorStoreQueryResult:
-        return await run_async(self.retrieve, **query)
-
-    def insert(self, artifacts: list[Artifact], **kwargs) -> list[str]:
-        all_ids = []
-        chunks_list = _chunks_list(artifacts, MAX_CHUNK_SIZE)
-        for chunks in chunks_list:
-            texts = []
-            ids = []
-            embeddings = []
-            metadatas = []
-            for chunk in chunks:
-                if not chunk.embedding:
-                    raise ValueError(f'No embedding set for {chunk.name or chunk.id}.')
-                texts.append(str(chunk))
-                ids.append(chunk.id)
-                embeddings.append(chunk.embedding)
-                metadatas.append(chunk.model_dump(exclude={*chunk._content_keys, 'embedding'}))
-            self._collection.add(
-                documents=texts,
-                ids=ids,
-                embeddings=embeddings,
-                metadatas=metadatas
-            )
-            all_ids.extend(ids)
+        # Serialize the next batch on this thread while up to max_concurrency adds are in flight
+        # on a pool owned by this call.
+        pending: deque[Future] = deque()
+        with get_executor(max_workers=max_concurrency) as executor:
+            for chunks in _chunks_list(artifacts, batch_size):
+                batch = _to_batch(chunks)
+                if len(pending) >= max_concurrency:
+                    pending.popleft().result()
+                pending.append(executor.submit(self._collection.add, **batch))
+                all_ids.extend(batch['ids'])
+                logger.debug(f'> Submitted batch of {len(batch['ids'])} artifacts.')
+            while pending:
+                pending.popleft().result()
+
+        _log_throughput(len(all_ids), start)
         return all_ids
 
-    async def ainsert(self, artifacts: list[Artifact], **kwargs) -> list[str]:
-        return await run_async(self.insert, artifacts, **kwargs)
+    async def ainsert(
+        self,
+        artifacts: list[Artifact],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> list[str]:
+        collection = await self._aget_collection()
+        if collection is None:
+            return await run_async(
+                self.insert,
+                artifacts,
+                batch_size=batch_size,
+                max_concurrency=max_concurrency,
+                **kwargs
+            )
+        if not artifacts:
+            return []
+
+        batch_size = batch_size or MAX_CHUNK_SIZE
+        max_concurrency = max_concurrency or self.max_concurrency or DEFAULT_INSERT_CONCURRENCY
+        start = time.perf_counter()
+        all_ids: list[str] = []
+        pending: set[asyncio.Task] = set()
+
+        try:
+            for chunks in _chunks_list(artifacts, batch_size):
+                batch = _to_batch(chunks)
+                if len(pending) >= max_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                pending.add(asyncio.create_task(self._arun(collection.add(**batch))))
+                all_ids.extend(batch['ids'])
+                logger.debug(f'> Submitted batch of {len(batch['ids'])} artifacts.')
+            if pending:
+                await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+
+        _log_throughput(len(all_ids), start)
+        return all_ids
 
     def delete(
         self,
@@ -191,9 +288,11 @@ class ChromaVectorStore(VectorStore):
         filters: Optional[MetadataFilters] = None,
         **kwargs
     ) -> None:
+        chroma_filters = _to_chroma_filters(filters)
         self._collection.delete(
-            ids=artifact_ids or [],
-            where=_to_chroma_filters(filters) if filters else {}
+            ids=artifact_ids,
+            where=chroma_filters.where,
+            where_document=chroma_filters.where_document
         )
 
     async def adelete(
@@ -202,19 +301,197 @@ class ChromaVectorStore(VectorStore):
         filters: Optional[MetadataFilters] = None,
         **kwargs
     ) -> None:
-        await run_async(self.delete, artifact_ids, filters, **kwargs)
+        collection = await self._aget_collection()
+        if collection is None:
+            await run_async(self.delete, artifact_ids, filters, **kwargs)
+            return
+        chroma_filters = _to_chroma_filters(filters)
+        await self._arun(collection.delete(
+            ids=artifact_ids,
+            where=chroma_filters.where,
+            where_document=chroma_filters.where_document
+        ))
 
     def delete_ref(self, ref_artifact_id: str, **kwargs) -> None:
         self._collection.delete(where={'ref_id': ref_artifact_id})
 
     async def adelete_ref(self, ref_artifact_id: str, **kwargs) -> None:
-        await run_async(self.delete_ref, ref_artifact_id, **kwargs)
+        collection = await self._aget_collection()
+        if collection is None:
+            await run_async(self.delete_ref, ref_artifact_id, **kwargs)
+            return
+        await self._arun(collection.delete(where={'ref_id': ref_artifact_id}))
+
+    def clear(self, page_size: Optional[int] = None, **kwargs) -> None:
+        page_size = page_size or DEFAULT_PAGE_SIZE
+        count = 0
+        # Deleting shifts every later page forward, so always read from the start.
+        while ids := self._collection.get(limit=page_size, include=[])['ids']:
+            self._collection.delete(ids=ids)
+            count += len(ids)
+            logger.info(f'> Cleared {count} artifacts.')
+
+    async def aclear(self, page_size: Optional[int] = None, **kwargs) -> None:
+        collection = await self._aget_collection()
+        if collection is None:
+            await run_async(self.clear, page_size=page_size, **kwargs)
+            return
+        page_size = page_size or DEFAULT_PAGE_SIZE
+        count = 0
+        while ids := (await self._arun(collection.get(limit=page_size, include=[])))['ids']:
+            await self._arun(collection.delete(ids=ids))
+            count += len(ids)
+            logger.info(f'> Cleared {count} artifacts.')
+
+    async def _aget_collection(self) -> Optional[AsyncCollection]:
+        if self._async_collection is not None or not self._use_async_client:
+            return self._async_collection
+        state = self._loop_state()
+        if state.collection is not None:
+            return state.collection
+        async with state.lock:
+            if state.collection is None:
+                client = await chromadb.AsyncHttpClient(
+                    host=self.host,
+                    port=self.port,
+                    headers=self.headers,
+                    ssl=self.ssl
+                )
+                state.collection = await client.get_or_create_collection(
+                    name=self.collection_name,
+                    **self.collection_kwargs
+                )
+        return state.collection
+
+    async def _arun[T](self, coro: Coroutine[Any, Any, T]) -> T:
+        semaphore = self._loop_state().semaphore
+        if semaphore is None:
+            return await coro
+        return await gated_coroutine(semaphore, coro)
 
-    def clear(self, **kwargs) -> None:
-        self._collection.delete(ids=self._collection.get()['ids'])
+    def _loop_state(self) -> '_LoopState':
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = self._loop_states[loop] = _LoopState(self.max_concurrency)
+        return state
 
-    async def aclear(self, **kwargs) -> None:
-        await run_async(self.clear, **kwargs)
+class _LoopState:
+    """
+    Async client state for one event loop.
+    """
+
+    def __init__(self, max_concurrency: Optional[int]):
+        self.lock = asyncio.Lock()
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        self.collection: Optional[AsyncCollection] = None
+
+class LazyArtifacts(Sequence[Artifact]):
+    """
+    Chroma results kept in columnar form, deserialized into artifacts on first access.
+    """
+
+    def __init__(
+        self,
+        ids: list[str],
+        documents: list[Optional[str]],
+        metadatas: list[Optional[dict[str, Any]]]
+    ):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self._artifacts: list[Optional[Artifact]] = [None] * len(ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Artifact: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Artifact]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Artifact, list[Artifact]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        artifact = self._artifacts[index]
+        if artifact is None:
+            artifact = artifact_registry.deserialize(dict(self.metadatas[index]))
+            artifact.set_content(self.documents[index])
+            self._artifacts[index] = artifact
+        return artifact
+
+def _to_query_result(result: dict[str, Any]) -> VectorStoreQueryResult:
+    ids = result['ids'][0]
+    similarities = [math.exp(-distance) for distance in result['distances'][0]]
+    artifacts = LazyArtifacts(ids, result['documents'][0], result['metadatas'][0])
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f'> Top {len(ids)} artifacts:')
+        for artifact_id, text, similarity in tzip(ids, artifacts.documents, similarities):
+            logger.debug(
+                f"> [Artifact {artifact_id}] [Similarity score: {similarity} - using query()] "
+                f"{truncate_text(str(text), 100)}"
+            )
+
+    return VectorStoreQueryResult(artifacts=artifacts, ids=ids, similarities=similarities)
+
+def _to_get_result(result: dict[str, Any]) -> VectorStoreQueryResult:
+    ids = result['ids'] or []
+    artifacts = LazyArtifacts(ids, result['documents'], result['metadatas'])
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f'> Top {len(ids)} artifacts:')
+        for artifact_id, text in tzip(ids, artifacts.documents):
+            logger.debug(
+                f"> [Artifact {artifact_id}] [Similarity score: N/A - using get()] "
+                f"{truncate_text(str(text), 100)}"
+            )
+
+    return VectorStoreQueryResult(artifacts=artifacts, ids=ids)
+
+def _to_batch(chunks: list[Artifact]) -> dict[str, list]:
+    texts = []
+    ids = []
+    embeddings = []
+    metadatas = []
+    for chunk in chunks:
+        if chunk.embedding is None:
+            raise ValueError(f'No embedding set for {chunk.name or chunk.id}.')
+        texts.append(str(chunk))
+        ids.append(chunk.id)
+        embeddings.append(chunk.embedding)
+        metadatas.append(chunk.model_dump(exclude={*chunk._content_keys, 'embedding'}))
+    return {
+        'documents': texts,
+        'ids': ids,
+        'embeddings': embeddings,
+        'metadatas': metadatas
+    }
+
+def _to_records(page: dict[str, Any], include_embeddings: bool) -> Iterator[dict[str, Any]]:
+    for i, artifact_id in enumerate(page['ids']):
+        record = {
+            'id': artifact_id,
+            'document': page['documents'][i],
+            'metadata': page['metadatas'][i]
+        }
+        if include_embeddings:
+            record['embedding'] = [float(x) for x in page['embeddings'][i]]
+        yield record
+
+def _log_throughput(count: int, start: float) -> None:
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f'> Inserted {count} artifacts in {elapsed:.2f}s '
+        f'({count / elapsed if elapsed > 0 else float(count):.1f} artifacts/s).'
+    )
+
+class ChromaFilters(NamedTuple):
+    where: Optional[dict] = None
+    where_document: Optional[dict] = None
+
+_DOCUMENT_OPERATORS = {FilterOperator.CONTAINS, FilterOperator.TEXT_MATCH}
 
 def _filter_condition(condition: FilterCondition) -> str:
     return {
@@ -237,26 +514,75 @@ def _filter_operator(operator: FilterOperator) -> str:
         raise ValueError(f'Filter operator {operator} not supported.')
     return supported_operators[operator]
 
-def _to_chroma_filters(standard_filters: MetadataFilters) -> dict:
-    filters = {}
-    filters_list = []
-    condition = standard_filters.condition or FilterCondition.AND
-    condition = _filter_condition(condition)
-    if standard_filters.filters:
-        for filter_ in standard_filters.filters:
-            if isinstance(filter_, MetadataFilter):
-                filters_list.append({
-                    filter_.key: {
-                        _filter_operator(filter_.operator): filter_.value
-                    }
-                })
+def _to_chroma_filters(standard_filters: Optional[MetadataFilters]) -> ChromaFilters:
+    if not standard_filters:
+        return ChromaFilters()
+    # The compiled filters are cached and shared, so each caller gets its own copy.
+    return copy.deepcopy(_compile_filters(_filters_key(standard_filters)))
+
+def _filters_key(standard_filters: MetadataFilters) -> tuple:
+    children = []
+    for filter_ in standard_filters.filters or []:
+        if isinstance(filter_, MetadataFilter):
+            value = tuple(filter_.value) if isinstance(filter_.value, list) else filter_.value
+            children.append(('filter', filter_.key, filter_.operator, type(value), value))
+        else:
+            children.append(_filters_key(filter_))
+    return ('filters', standard_filters.condition or FilterCondition.AND, tuple(children))
+
+@lru_cache(maxsize=1024)
+def _compile_filters(key: tuple) -> ChromaFilters:
+    _, condition, children = key
+    where_list = []
+    document_list = []
+    for child in children:
+        if child[0] == 'filter':
+            _, field, operator, _, value = child
+            value = list(value) if isinstance(value, tuple) else value
+            if operator in _DOCUMENT_OPERATORS:
+                document_list.append(_document_filter(field, operator, value))
             else:
-                filters_list.append(_to_chroma_filters(filter_))
-    if len(filters_list) == 1:
+                where_list.append(_metadata_filter(field, operator, value))
+        else:
+            compiled = _compile_filters(child)
+            if compiled.where:
+                where_list.append(compiled.where)
+            if compiled.where_document:
+                document_list.append(compiled.where_document)
+    if condition == FilterCondition.OR and where_list and document_list:
+        raise ValueError('Chroma cannot combine metadata and document filters with an OR condition.')
+    condition = _filter_condition(condition)
+    return ChromaFilters(
+        where=_combine_filters(condition, where_list),
+        where_document=_combine_filters(condition, document_list)
+    )
+
+def _metadata_filter(field: str, operator: FilterOperator, value: Any) -> dict:
+    values = value if isinstance(value, list) else [value]
+    if operator == FilterOperator.ANY:
+        return {field: {'$in': values}}
+    elif operator == FilterOperator.ALL:
+        # Chroma metadata values are scalars, so a field can only equal all of the values if there is one.
+        if len(values) != 1:
+            raise ValueError(f'Chroma only supports the ALL operator with a single value, got {len(values)} for {field}.')
+        return {field: {'$eq': values[0]}}
+    return {field: {_filter_operator(operator): value}}
+
+def _document_filter(field: str, operator: FilterOperator, value: Any) -> dict:
+    # Chroma can only match substrings of the stored document, not of metadata values.
+    if field != DOCUMENT_FILTER_KEY:
+        raise ValueError(
+            f"Chroma only supports the {operator.name} operator on the '{DOCUMENT_FILTER_KEY}' key, got {field}."
+        )
+    values = value if isinstance(value, list) else [value]
+    return _combine_filters('$and', [{'$contains': str(v)} for v in values])
+
+def _combine_filters(condition: str, filters_list: list[dict]) -> Optional[dict]:
+    if len(filters_list) == 0:
+        return None
+    elif len(filters_list) == 1:
         return filters_list[0]
-    elif len(filters_list) > 1:
-        filters[condition] = filters_list
-    return filters
+    return {condition: filters_list}
 
 def _chunks_list(
     artifacts: list[Artifact],
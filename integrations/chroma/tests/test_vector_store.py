@@ -0,0 +1,243 @@
+import asyncio
+import json
+from typing import Any, Optional, Union
+import uuid
+
+import chromadb
+from chromadb.api.models.Collection import Collection
+import numpy as np
+import pytest
+
+from flowstack.artifacts import Modality, Utf8Artifact, artifact_registry
+from flowstack.chroma.vector_store import (
+    ChromaFilters,
+    ChromaVectorStore,
+    LazyArtifacts,
+    _compile_filters,
+    _to_chroma_filters
+)
+from flowstack.typing import FilterCondition, FilterOperator, MetadataFilter, MetadataFilters
+
+class _Note(Utf8Artifact):
+    content: str = ''
+
+    @property
+    def modality(self) -> Modality:
+        return Modality.TEXT
+
+    @property
+    def _content_keys(self) -> set[str]:
+        return {'content', 'metadata'}
+
+    def to_utf8(self) -> str:
+        return self.content
+
+    def set_content(self, content: Union[str, bytes]) -> None:
+        self.content = content if isinstance(content, str) else content.decode('utf-8')
+
+class _AsyncCollection:
+    """
+    Async facade over a sync collection that records the loop of every call.
+    """
+
+    def __init__(self, collection: Collection):
+        self.collection = collection
+        self.loops: list[asyncio.AbstractEventLoop] = []
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.collection, name)
+        async def call(*args, **kwargs) -> Any:
+            self.loops.append(asyncio.get_running_loop())
+            await asyncio.sleep(0)
+            return method(*args, **kwargs)
+        return call
+
+@pytest.fixture
+def collection() -> Collection:
+    return chromadb.EphemeralClient().create_collection(uuid.uuid4().hex)
+
+@pytest.fixture
+def store(collection: Collection) -> ChromaVectorStore:
+    return ChromaVectorStore(collection=collection)
+
+def _notes(n: int) -> list[_Note]:
+    return [
+        _Note(content=f'note {i}', name=f'note-{i}', embedding=np.array([1.0, float(i)]))
+        for i in range(n)
+    ]
+
+def test_loop_state_is_reused_within_a_loop_and_renewed_across_loops(collection: Collection):
+    async_collection = _AsyncCollection(collection)
+    store = ChromaVectorStore(collection=collection, async_collection=async_collection, max_concurrency=1)
+    notes = _notes(6)
+    async def insert(batch: list[_Note]) -> tuple[Any, Any]:
+        state = store._loop_state()
+        await store.ainsert(batch, batch_size=1, max_concurrency=3)
+        return state, store._loop_state()
+    first, first_again = asyncio.run(insert(notes[:3]))
+    second, second_again = asyncio.run(insert(notes[3:]))
+    assert first is first_again
+    assert second is second_again
+    assert first is not second
+    assert len(set(async_collection.loops)) == 2
+    assert collection.count() == 6
+
+def _count_adds(monkeypatch: pytest.MonkeyPatch, collection: Collection) -> list[int]:
+    sizes: list[int] = []
+    add = collection.add
+    def counted_add(**kwargs) -> None:
+        sizes.append(len(kwargs['ids']))
+        add(**kwargs)
+    monkeypatch.setattr(collection, 'add', counted_add)
+    return sizes
+
+def test_insert_batches(monkeypatch: pytest.MonkeyPatch, store: ChromaVectorStore, collection: Collection):
+    sizes = _count_adds(monkeypatch, collection)
+    notes = _notes(7)
+    assert store.insert(notes, batch_size=3, max_concurrency=2) == [note.id for note in notes]
+    assert sorted(sizes) == [1, 3, 3]
+    assert collection.count() == 7
+    assert collection.get(ids=[notes[4].id])['documents'] == ['note 4']
+
+def test_ainsert_batches(collection: Collection):
+    async_collection = _AsyncCollection(collection)
+    store = ChromaVectorStore(collection=collection, async_collection=async_collection)
+    notes = _notes(5)
+    assert asyncio.run(store.ainsert(notes, batch_size=2, max_concurrency=2)) == [note.id for note in notes]
+    assert len(async_collection.loops) == 3
+    assert collection.count() == 5
+
+def test_ainsert_falls_back_to_insert(store: ChromaVectorStore, collection: Collection):
+    notes = _notes(3)
+    assert asyncio.run(store.ainsert(notes, batch_size=2)) == [note.id for note in notes]
+    assert collection.count() == 3
+
+def test_insert_empty(monkeypatch: pytest.MonkeyPatch, store: ChromaVectorStore, collection: Collection):
+    sizes = _count_adds(monkeypatch, collection)
+    async_store = ChromaVectorStore(collection=collection, async_collection=_AsyncCollection(collection))
+    assert store.insert([]) == []
+    assert asyncio.run(store.ainsert([])) == []
+    assert asyncio.run(async_store.ainsert([])) == []
+    assert sizes == []
+    assert async_store._async_collection.loops == []
+
+def test_clear_pages(monkeypatch: pytest.MonkeyPatch, store: ChromaVectorStore, collection: Collection):
+    store.insert(_notes(7))
+    deleted: list[int] = []
+    delete = collection.delete
+    def counted_delete(**kwargs) -> None:
+        deleted.append(len(kwargs['ids']))
+        delete(**kwargs)
+    monkeypatch.setattr(collection, 'delete', counted_delete)
+    store.clear(page_size=3)
+    assert deleted == [3, 3, 1]
+    assert collection.count() == 0
+
+def test_aclear(collection: Collection):
+    store = ChromaVectorStore(collection=collection, async_collection=_AsyncCollection(collection))
+    store.insert(_notes(5))
+    asyncio.run(store.aclear(page_size=2))
+    assert collection.count() == 0
+
+@pytest.mark.parametrize('offset, limit, page_size', [(None, None, 2), (1, 3, 2), (4, None, 10), (0, 0, 2)])
+def test_persist_json_lines(
+    tmp_path,
+    store: ChromaVectorStore,
+    collection: Collection,
+    offset: Optional[int],
+    limit: Optional[int],
+    page_size: int
+):
+    store.insert(_notes(5))
+    expected = collection.get(include=['documents'])
+    start = offset or 0
+    stop = None if limit is None else start + limit
+    path = tmp_path / 'nested' / 'collection.jsonl'
+    store.persist(str(path), offset=offset, limit=limit, page_size=page_size, include_embeddings=True)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['id'] for record in records] == expected['ids'][start:stop]
+    assert [record['document'] for record in records] == expected['documents'][start:stop]
+    assert all(len(record['embedding']) == 2 for record in records)
+    assert all(record['metadata']['name'].startswith('note-') for record in records)
+
+def test_lazy_artifacts(monkeypatch: pytest.MonkeyPatch, store: ChromaVectorStore, collection: Collection):
+    notes = _notes(4)
+    store.insert(notes)
+    page = collection.get(ids=[note.id for note in notes])
+    artifacts = LazyArtifacts(page['ids'], page['documents'], page['metadatas'])
+    calls: list[str] = []
+    deserialize = artifact_registry.deserialize
+    def counted_deserialize(data: dict[str, Any], name: Optional[str] = None) -> Any:
+        calls.append(data['id'])
+        return deserialize(data, name)
+    monkeypatch.setattr(artifact_registry, 'deserialize', counted_deserialize)
+    assert len(artifacts) == 4
+    assert calls == []
+    assert str(artifacts[1]) == page['documents'][1]
+    assert artifacts[1] is artifacts[1]
+    assert artifacts[-1].id == page['ids'][3]
+    assert [artifact.id for artifact in artifacts[1:3]] == page['ids'][1:3]
+    assert [artifact.id for artifact in artifacts[::-2]] == page['ids'][::-2]
+    assert artifacts[5:] == []
+    assert sorted(calls) == sorted(page['ids'][1:])
+    assert [artifact.id for artifact in artifacts] == page['ids']
+    assert len(calls) == 4
+    with pytest.raises(IndexError):
+        artifacts[4]
+
+def test_retrieve_returns_lazy_artifacts(store: ChromaVectorStore):
+    store.insert(_notes(3))
+    result = store.retrieve(query_embedding=[1.0, 2.0], similarity_top_k=2)
+    assert isinstance(result.artifacts, LazyArtifacts)
+    assert [str(artifact) for artifact in result.artifacts] == ['note 2', 'note 1']
+
+def _filter(key: str, value: Any, operator: FilterOperator = FilterOperator.EQ) -> MetadataFilter:
+    return MetadataFilter(key=key, value=value, operator=operator)
+
+def test_compiled_filters_are_cached_and_copied():
+    filters = MetadataFilters(filters=[_filter('name', 'a'), _filter('rank', 2, FilterOperator.GT)])
+    hits = _compile_filters.cache_info().hits
+    first = _to_chroma_filters(filters)
+    first.where['$and'].append({'mutated': True})
+    second = _to_chroma_filters(filters)
+    assert _compile_filters.cache_info().hits > hits
+    assert second.where == {'$and': [{'name': {'$eq': 'a'}}, {'rank': {'$gt': 2}}]}
+    assert second.where is not first.where
+
+def test_filters_mix_metadata_and_document_conditions():
+    filters = MetadataFilters(filters=[
+        _filter('content', 'note', FilterOperator.CONTAINS),
+        MetadataFilters(
+            filters=[_filter('name', ['a', 'b'], FilterOperator.ANY), _filter('tag', ['x'], FilterOperator.ALL)],
+            condition=FilterCondition.OR
+        )
+    ])
+    assert _to_chroma_filters(filters) == ChromaFilters(
+        where={'$or': [{'name': {'$in': ['a', 'b']}}, {'tag': {'$eq': 'x'}}]},
+        where_document={'$contains': 'note'}
+    )
+
+def test_filters_reject_or_across_metadata_and_document():
+    filters = MetadataFilters(
+        filters=[_filter('content', 'note', FilterOperator.TEXT_MATCH), _filter('name', 'a')],
+        condition=FilterCondition.OR
+    )
+    with pytest.raises(ValueError):
+        _to_chroma_filters(filters)
+
+def test_filters_reject_all_with_several_values():
+    with pytest.raises(ValueError):
+        _to_chroma_filters(MetadataFilters(filters=[_filter('tag', ['x', 'y'], FilterOperator.ALL)]))
+
+def test_filters_reject_document_operators_on_metadata_keys():
+    with pytest.raises(ValueError):
+        _to_chroma_filters(MetadataFilters(filters=[_filter('author', 'x', FilterOperator.CONTAINS)]))
+
+def test_retrieve_with_filters(store: ChromaVectorStore):
+    store.insert(_notes(4))
+    filters = MetadataFilters(filters=[
+        _filter('name', ['note-1', 'note-2', 'note-3'], FilterOperator.IN),
+        _filter('content', 'note 3', FilterOperator.CONTAINS)
+    ])
+    result = store.retrieve(filters=filters, similarity_top_k=10)
+    assert [str(artifact) for artifact in result.artifacts] == ['note 3']
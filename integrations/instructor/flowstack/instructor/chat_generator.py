@@ -1,6 +1,179 @@
-from flowstack.components.ai.chat_generator import BaseChatGenerator, ChatPrompt
-from flowstack.messages import BaseMessage
+from functools import lru_cache
+import logging
+from typing import Any, AsyncIterator, Iterator, Optional, Type, override
+
+from instructor import AsyncInstructor, Instructor, Partial, openai_schema
+from pydantic import BaseModel, ValidationError
+
+from flowstack.components.ai.chat_generator import BaseChatGenerator, ChatPrompt, LLMInput
+from flowstack.instructor.partial import PartialJSONParser
+from flowstack.messages import AIMessage, AIMessageChunk, BaseMessage, MessageType
+from flowstack.utils.threading import gather_with_concurrency, get_executor
+
+logger = logging.getLogger(__name__)
+
+PARSED_KEY = 'parsed'
+PARTIAL_KEY = 'partial'
+
+_ROLES = {
+    MessageType.HUMAN: 'user',
+    MessageType.SYSTEM: 'system',
+    MessageType.AI: 'assistant',
+    MessageType.TOOL: 'tool'
+}
 
 class InstructorChatGenerator(BaseChatGenerator):
+    """
+    Structured output generator. The parsed response_model instance is stored under metadata['parsed'].
+    While streaming, the JSON arguments are parsed incrementally and a partial model is attached
+    under metadata['partial'] whenever a value completes.
+    """
+
+    client: Instructor
+    model: str
+    response_model: Type[BaseModel]
+    aclient: Optional[AsyncInstructor] = None
+    max_concurrency: Optional[int] = None
+
+    def __init__(
+        self,
+        client: Instructor,
+        model: str,
+        response_model: Type[BaseModel],
+        aclient: Optional[AsyncInstructor] = None,
+        max_concurrency: Optional[int] = None,
+        name: Optional[str] = None
+    ):
+        super().__init__(
+            client=client,
+            model=model,
+            response_model=response_model,
+            aclient=aclient,
+            max_concurrency=max_concurrency,
+            name=name
+        )
+
+    def extract(self, input: LLMInput, **kwargs) -> BaseModel:
+        return self.invoke(input, **kwargs).metadata[PARSED_KEY]
+
+    async def aextract(self, input: LLMInput, **kwargs) -> BaseModel:
+        return (await self.ainvoke(input, **kwargs)).metadata[PARSED_KEY]
+
+    def extract_many(self, inputs: list[LLMInput], **kwargs) -> list[BaseModel]:
+        with get_executor(max_workers=self.max_concurrency) as executor:
+            return list(executor.map(lambda input: self.extract(input, **kwargs), inputs))
+
+    async def aextract_many(self, inputs: list[LLMInput], **kwargs) -> list[BaseModel]:
+        return await gather_with_concurrency(
+            self.max_concurrency,
+            *(self.aextract(input, **kwargs) for input in inputs)
+        )
+
+    @override
     def _invoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
-        pass
\ No newline at end of file
+        return _to_message(self.client.chat.completions.create(
+            model=self.model,
+            response_model=self.response_model,
+            messages=_to_messages(prompt),
+            **kwargs
+        ))
+
+    @override
+    async def _ainvoke(self, prompt: ChatPrompt, **kwargs) -> BaseMessage:
+        if self.aclient is None:
+            return await super()._ainvoke(prompt, **kwargs)
+        return _to_message(await self.aclient.chat.completions.create(
+            model=self.model,
+            response_model=self.response_model,
+            messages=_to_messages(prompt),
+            **kwargs
+        ))
+
+    @override
+    def _stream(self, prompt: ChatPrompt, **kwargs) -> Iterator[BaseMessage]:
+        parser = PartialJSONParser()
+        completed = 0
+        for chunk in self.client.client.chat.completions.create(**self._stream_request(prompt, **kwargs)):
+            delta = _arguments_delta(chunk)
+            if not delta:
+                continue
+            parser.feed(delta)
+            yield self._to_chunk(delta, parser, completed)
+            completed = parser.completed
+        yield self._final_chunk(parser)
+
+    @override
+    async def _astream(self, prompt: ChatPrompt, **kwargs) -> AsyncIterator[BaseMessage]:
+        if self.aclient is None:
+            async for chunk in super()._astream(prompt, **kwargs):
+                yield chunk
+            return
+        parser = PartialJSONParser()
+        completed = 0
+        async for chunk in await self.aclient.client.chat.completions.create(**self._stream_request(prompt, **kwargs)):
+            delta = _arguments_delta(chunk)
+            if not delta:
+                continue
+            parser.feed(delta)
+            yield self._to_chunk(delta, parser, completed)
+            completed = parser.completed
+        yield self._final_chunk(parser)
+
+    def _stream_request(self, prompt: ChatPrompt, **kwargs) -> dict[str, Any]:
+        schema = _tool_schema(self.response_model)
+        return {
+            'model': self.model,
+            'messages': _to_messages(prompt),
+            'tools': [{'type': 'function', 'function': schema}],
+            'tool_choice': {'type': 'function', 'function': {'name': schema['name']}},
+            'stream': True,
+            **kwargs
+        }
+
+    def _to_chunk(self, delta: str, parser: PartialJSONParser, completed: int) -> AIMessageChunk:
+        """
+        Validates the partial value only when a new value completed since the last chunk.
+        """
+        if parser.completed == completed or not isinstance(parser.value, dict):
+            return AIMessageChunk(delta)
+        try:
+            partial = _partial_model(self.response_model).model_validate(parser.value)
+        except ValidationError:
+            return AIMessageChunk(delta)
+        return AIMessageChunk(delta, metadata={PARTIAL_KEY: partial})
+
+    def _final_chunk(self, parser: PartialJSONParser) -> AIMessageChunk:
+        value = parser.close()
+        if value is None:
+            raise ValueError(
+                f'The stream ended without any tool call arguments for {self.response_model.__name__}.'
+            )
+        return AIMessageChunk(metadata={PARSED_KEY: self.response_model.model_validate(value)})
+
+@lru_cache(maxsize=128)
+def _partial_model(response_model: Type[BaseModel]) -> Type[BaseModel]:
+    return Partial[response_model]
+
+@lru_cache(maxsize=128)
+def _tool_schema(response_model: Type[BaseModel]) -> dict[str, Any]:
+    return openai_schema(response_model).openai_schema
+
+def _to_messages(prompt: ChatPrompt) -> list[dict[str, Any]]:
+    return prompt.render('openai', _to_openai_message)
+
+def _to_openai_message(message: BaseMessage) -> dict[str, Any]:
+    payload = {'role': _ROLES.get(message.message_type, message.message_type), 'content': str(message)}
+    if message.message_type == MessageType.TOOL and getattr(message, 'tool_call_id', None):
+        payload['tool_call_id'] = message.tool_call_id
+    return payload
+
+def _to_message(result: BaseModel) -> AIMessage:
+    return AIMessage(result.model_dump_json(), metadata={PARSED_KEY: result})
+
+def _arguments_delta(chunk: Any) -> Optional[str]:
+    if not chunk.choices:
+        return None
+    tool_calls = chunk.choices[0].delta.tool_calls
+    if not tool_calls or not tool_calls[0].function:
+        return None
+    return tool_calls[0].function.arguments
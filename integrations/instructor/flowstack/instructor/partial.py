@@ -0,0 +1,99 @@
+import json
+from typing import Any, Optional, Union
+
+_LITERAL_CHARS = frozenset('0123456789+-.eEtruefalsn')
+_MISSING = object()
+
+class PartialJSONParser:
+    """
+    Incremental JSON parser. Text deltas are fed as they arrive and only the new characters are scanned,
+    so the partial value is kept up to date without re-parsing the whole buffer.
+    Containers are built in place; strings and literals are added once they are complete.
+    """
+
+    def __init__(self):
+        self.completed = 0
+        self._root: Any = _MISSING
+        self._stack: list[Union[dict[str, Any], list[Any]]] = []
+        self._keys: list[Optional[str]] = []
+        self._token: list[str] = []
+        self._in_string = False
+        self._in_literal = False
+        self._escaped = False
+        self._is_key = False
+
+    @property
+    def value(self) -> Any:
+        return None if self._root is _MISSING else self._root
+
+    def feed(self, text: str) -> None:
+        for char in text:
+            if self._in_string:
+                self._feed_string(char)
+            elif self._in_literal and char in _LITERAL_CHARS:
+                self._token.append(char)
+            else:
+                if self._in_literal:
+                    self._end_literal()
+                self._feed_structure(char)
+
+    def close(self) -> Any:
+        """
+        Flushes a trailing literal and returns the value.
+        """
+        if self._in_literal:
+            self._end_literal()
+        return self.value
+
+    def _feed_string(self, char: str) -> None:
+        if self._escaped:
+            self._escaped = False
+        elif char == '\\':
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+            value = json.loads(f'"{''.join(self._token)}"')
+            self._token.clear()
+            if self._is_key:
+                self._keys[-1] = value
+            else:
+                self._add(value)
+            return
+        self._token.append(char)
+
+    def _feed_structure(self, char: str) -> None:
+        if char == '"':
+            self._in_string = True
+            self._is_key = bool(self._stack) and isinstance(self._stack[-1], dict) and self._keys[-1] is None
+        elif char == '{' or char == '[':
+            container: Union[dict[str, Any], list[Any]] = {} if char == '{' else []
+            self._attach(container)
+            self._stack.append(container)
+            self._keys.append(None)
+        elif char == '}' or char == ']':
+            if self._stack:
+                self._stack.pop()
+                self._keys.pop()
+                self.completed += 1
+        elif not char.isspace() and char not in ',:':
+            self._in_literal = True
+            self._token.append(char)
+
+    def _end_literal(self) -> None:
+        self._in_literal = False
+        value = json.loads(''.join(self._token))
+        self._token.clear()
+        self._add(value)
+
+    def _add(self, value: Any) -> None:
+        self._attach(value)
+        self.completed += 1
+
+    def _attach(self, value: Any) -> None:
+        if not self._stack:
+            self._root = value
+        elif isinstance(self._stack[-1], dict):
+            self._stack[-1][self._keys[-1]] = value
+            self._keys[-1] = None
+        else:
+            self._stack[-1].append(value)
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterator, Optional
+
+import pytest
+
+instructor = pytest.importorskip('instructor')
+
+from pydantic import BaseModel
+
+from flowstack.instructor import InstructorChatGenerator
+from flowstack.instructor.chat_generator import PARSED_KEY, PARTIAL_KEY
+from flowstack.messages import BaseMessage
+from flowstack.utils import usage
+from flowstack.utils.usage import UsageTracker
+
+DELTAS = ['{"title": "Al', 'ien", ', '"year": 19', '79', ', "tags": ["scifi"', ']}']
+
+class _Movie(BaseModel):
+    title: str
+    year: int
+    tags: list[str] = []
+
+def _chunk(arguments: Optional[str]) -> Any:
+    if arguments is None:
+        return SimpleNamespace(choices=[])
+    function = SimpleNamespace(arguments=arguments)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(tool_calls=[SimpleNamespace(function=function)]))])
+
+def _stream_chunks(deltas: list[str]) -> list[Any]:
+    return [_chunk(None), *(_chunk(delta) for delta in deltas), _chunk('')]
+
+def _movie(messages: list[dict[str, Any]]) -> _Movie:
+    return _Movie(title=messages[-1]['content'], year=1979)
+
+class _Client(instructor.Instructor):
+    """
+    Stands in for an Instructor client; parsed calls are answered from the prompt and raw calls stream deltas.
+    """
+
+    def __init__(self, deltas: list[str] = DELTAS):
+        self.deltas = deltas
+        self.requests: list[dict[str, Any]] = []
+        self.threads: set[int] = set()
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self._stream)))
+
+    @property
+    def chat(self) -> '_Client':
+        return self
+
+    @property
+    def completions(self) -> '_Client':
+        return self
+
+    def create(self, response_model: type[BaseModel], messages: list[dict[str, Any]], **kwargs) -> BaseModel:
+        self.threads.add(threading.get_ident())
+        return _movie(messages)
+
+    def _stream(self, **kwargs) -> Iterator[Any]:
+        self.requests.append(kwargs)
+        return iter(_stream_chunks(self.deltas))
+
+class _AsyncClient(instructor.AsyncInstructor):
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self._stream)))
+
+    @property
+    def chat(self) -> '_AsyncClient':
+        return self
+
+    @property
+    def completions(self) -> '_AsyncClient':
+        return self
+
+    async def create(self, response_model: type[BaseModel], messages: list[dict[str, Any]], **kwargs) -> BaseModel:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return _movie(messages)
+
+    async def _stream(self, **kwargs) -> AsyncIterator[Any]:
+        async def chunks() -> AsyncIterator[Any]:
+            for chunk in _stream_chunks(DELTAS):
+                yield chunk
+        return chunks()
+
+@pytest.fixture(autouse=True)
+def tracker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(usage, '_tracker', UsageTracker())
+
+@pytest.fixture
+def generator() -> InstructorChatGenerator:
+    return InstructorChatGenerator(
+        _Client(),
+        model='model',
+        response_model=_Movie,
+        aclient=_AsyncClient(),
+        max_concurrency=2,
+        name='instructor'
+    )
+
+def _partials(chunks: list[BaseMessage]) -> list[Optional[dict[str, Any]]]:
+    return [
+        chunk.metadata[PARTIAL_KEY].model_dump(exclude_none=True) if PARTIAL_KEY in chunk.metadata else None
+        for chunk in chunks[:-1]
+    ]
+
+def _check_stream(chunks: list[BaseMessage]) -> None:
+    assert [str(chunk) for chunk in chunks[:-1]] == DELTAS
+    assert _partials(chunks) == [
+        None,
+        {'title': 'Alien'},
+        None,
+        None,
+        {'title': 'Alien', 'year': 1979, 'tags': ['scifi']},
+        {'title': 'Alien', 'year': 1979, 'tags': ['scifi']}
+    ]
+    assert PARTIAL_KEY not in chunks[-1].metadata
+    assert chunks[-1].metadata[PARSED_KEY] == _Movie(title='Alien', year=1979, tags=['scifi'])
+
+def test_stream_attaches_partials_when_values_complete(generator):
+    _check_stream(list(generator.stream('movie')))
+    request = generator.client.requests[0]
+    assert request['stream'] is True
+    assert request['tool_choice']['function']['name'] == request['tools'][0]['function']['name']
+
+def test_astream_attaches_partials_when_values_complete(generator):
+    async def astream() -> list[BaseMessage]:
+        return [chunk async for chunk in generator.astream('movie')]
+    _check_stream(asyncio.run(astream()))
+
+def test_stream_without_arguments_raises():
+    generator = InstructorChatGenerator(_Client([]), model='model', response_model=_Movie, name='instructor')
+    with pytest.raises(ValueError):
+        list(generator.stream('movie'))
+
+def test_extract_many_keeps_input_order(generator):
+    titles = [f'movie {i}' for i in range(6)]
+    assert [movie.title for movie in generator.extract_many(titles)] == titles
+    assert len(generator.client.threads) <= 2
+
+def test_aextract_many_limits_concurrency(generator):
+    titles = [f'movie {i}' for i in range(6)]
+    movies = asyncio.run(generator.aextract_many(titles))
+    assert [movie.title for movie in movies] == titles
+    assert generator.aclient.max_active == 2
@@ -0,0 +1,77 @@
+import importlib.util
+import json
+import os.path
+
+import pytest
+
+def _load_parser() -> type:
+    """
+    Loads the parser from its module file, since the package __init__ imports instructor.
+    """
+    path = os.path.join(os.path.dirname(__file__), os.pardir, 'flowstack', 'instructor', 'partial.py')
+    spec = importlib.util.spec_from_file_location('flowstack_instructor_partial', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.PartialJSONParser
+
+PartialJSONParser = _load_parser()
+
+DOCUMENT = {
+    'title': 'Line "one"\nand a tab\t\\ done é',
+    'count': -12.5e2,
+    'flags': [True, False, None],
+    'nested': {'items': [{'id': 1}, {'id': 2, 'tags': []}], 'empty': {}}
+}
+
+def _parse(*deltas: str) -> PartialJSONParser:
+    parser = PartialJSONParser()
+    for delta in deltas:
+        parser.feed(delta)
+    return parser
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 1000])
+def test_matches_json_loads_for_any_split(size: int):
+    text = json.dumps(DOCUMENT)
+    parser = _parse(*(text[start:start + size] for start in range(0, len(text), size)))
+    assert parser.close() == DOCUMENT
+
+def test_escapes_split_across_deltas():
+    parser = _parse('{"a": "x\\', '"y\\', 'u00e9\\', 'n"}')
+    assert parser.close() == {'a': 'x"yé\n'}
+
+def test_literals_split_across_deltas():
+    parser = _parse('{"a": tr', 'ue, "b": 1', '23, "c": nu', 'll, "d": -0.', '5}')
+    assert parser.close() == {'a': True, 'b': 123, 'c': None, 'd': -0.5}
+
+def test_trailing_literal_is_flushed_on_close():
+    parser = _parse('4', '2')
+    assert parser.value is None
+    assert parser.close() == 42
+
+def test_partial_value_tracks_nested_containers():
+    parser = _parse('{"outer": {"items": [1, [2, ', '3], {"k": "v"')
+    assert parser.value == {'outer': {'items': [1, [2, 3], {'k': 'v'}]}}
+    parser.feed('}]}, "done": fal')
+    assert parser.value == {'outer': {'items': [1, [2, 3], {'k': 'v'}]}}
+    parser.feed('se}')
+    assert parser.value == {'outer': {'items': [1, [2, 3], {'k': 'v'}]}, 'done': False}
+
+def test_strings_are_added_once_complete():
+    parser = _parse('{"name": "Ada Lov')
+    assert parser.value == {}
+    parser.feed('elace"')
+    assert parser.value == {'name': 'Ada Lovelace'}
+
+def test_completed_counts_values_and_containers():
+    parser = PartialJSONParser()
+    counts = []
+    for delta in ['{"a": ', '1', ', "b": [', '"x"', ', 2]', '}']:
+        parser.feed(delta)
+        counts.append(parser.completed)
+    assert counts == [0, 0, 1, 2, 4, 5]
+
+def test_empty_input_has_no_value():
+    parser = PartialJSONParser()
+    parser.feed('')
+    assert parser.close() is None
+    assert parser.completed == 0
@@ -1,10 +1,130 @@
-from typing import Any, Optional, Unpack, override
+import asyncio
+from concurrent.futures import Executor, Future
+import json
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, Optional, Unpack, override
 
 import fsspec
 import neo4j
+import numpy as np
 
-from flowstack.stores import GraphNode, GraphNodeQuery, GraphRelation, GraphStore, GraphTriplet, GraphTripletQuery, VectorStoreQuery
+from flowstack.artifacts import ArtifactInfo, ArtifactRelationship
+from flowstack.stores import (
+    ChunkNode,
+    EntityNode,
+    GraphNode,
+    GraphNodeQuery,
+    GraphRelation,
+    GraphStore,
+    GraphTriplet,
+    GraphTripletQuery,
+    VectorStoreQuery
+)
 from flowstack.typing import Embedding
+from flowstack.utils.constants import GRAPH_TRIPLET_SOURCE_KEY
+from flowstack.utils.threading import ContextThreadPoolExecutor, gather_with_concurrency
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_SCHEMA_TTL = 300.0
+DEFAULT_SCHEMA_SAMPLE = 1000
+DEFAULT_WRITE_CONCURRENCY = 4
+BASE_NODE_LABEL = '__Node__'
+BASE_ENTITY_LABEL = '__Entity__'
+CHUNK_NODE_LABEL = 'Chunk'
+DEFAULT_RELATION_TYPE = 'RELATES_TO'
+# Unlabelled relations share DEFAULT_RELATION_TYPE, so their GraphRelation name is kept as a property.
+# A pair of nodes holds at most one relation, so upserting a relation replaces any other between them.
+RELATION_NAME_KEY = '__name__'
+REF_ID_KEY = 'ref_id'
+logger = logging.getLogger(__name__)
+
+_NODE_COMMON_FIELDS = {'label', 'properties', 'metadata', 'embedding'}
+
+_UPSERT_NODES_QUERY = '''
+UNWIND $rows AS row
+MERGE (n:{base_label} {{id: row.id}})
+SET n += row.properties, n.embedding = coalesce(row.embedding, n.embedding)
+SET n{labels}
+'''
+
+_UPSERT_RELATIONS_QUERY = '''
+UNWIND $rows AS row
+MERGE (source:{base_label} {{id: row.source}})
+ON CREATE SET source:{entity_label}, source.name = row.source
+MERGE (target:{base_label} {{id: row.target}})
+ON CREATE SET target:{entity_label}, target.name = row.target
+MERGE (source)-[r:{type}]->(target)
+SET r = row.properties, r.`{name_key}` = row.name
+WITH source, target, r
+OPTIONAL MATCH (source)-[other]->(target)
+WHERE other <> r
+DELETE other
+'''
+
+_TRIPLETS_QUERY = '''
+MATCH (subject:{base_label})-[relation]->(obj:{base_label})
+{where}
+RETURN
+    labels(subject) AS subject_labels,
+    properties(subject) AS subject,
+    type(relation) AS type,
+    properties(relation) AS relation,
+    labels(obj) AS obj_labels,
+    properties(obj) AS obj
+'''
+
+_NODE_PROPERTIES_QUERY = '''
+CALL db.schema.nodeTypeProperties()
+YIELD nodeLabels, propertyName, propertyTypes
+RETURN nodeLabels, propertyName, propertyTypes
+'''
+
+_RELATION_PROPERTIES_QUERY = '''
+CALL db.schema.relTypeProperties()
+YIELD relType, propertyName, propertyTypes
+RETURN relType, propertyName, propertyTypes
+'''
+
+_RELATIONSHIPS_QUERY = '''
+MATCH (source)-[r]->(target)
+WITH labels(source) AS source_labels, type(r) AS type, labels(target) AS target_labels
+LIMIT $sample
+RETURN DISTINCT source_labels, type, target_labels
+'''
+
+_SCHEMA_EXCLUDED_LABELS = {BASE_NODE_LABEL, BASE_ENTITY_LABEL}
+_SCHEMA_EXCLUDED_PROPERTIES = {'embedding'}
+
+_DELETE_ARTIFACTS_QUERY = f'''
+CALL {{
+    UNWIND $ids AS id
+    MATCH (n:`{BASE_NODE_LABEL}` {{id: id}})
+    RETURN n
+    UNION
+    MATCH (n:`{BASE_NODE_LABEL}`)
+    WHERE n.`{GRAPH_TRIPLET_SOURCE_KEY}` IN $artifact_ids OR n.`{REF_ID_KEY}` IN $ref_artifact_ids
+    RETURN n
+}}
+DETACH DELETE n
+'''
+
+# MERGE on id and the artifact lookups above scan every node unless indexed.
+_SCHEMA_SETUP_QUERIES = [
+    f'''
+    CREATE CONSTRAINT IF NOT EXISTS
+    FOR (n:`{BASE_NODE_LABEL}`) REQUIRE n.id IS UNIQUE
+    ''',
+    f'''
+    CREATE INDEX IF NOT EXISTS
+    FOR (n:`{BASE_NODE_LABEL}`) ON (n.`{GRAPH_TRIPLET_SOURCE_KEY}`)
+    ''',
+    f'''
+    CREATE INDEX IF NOT EXISTS
+    FOR (n:`{BASE_NODE_LABEL}`) ON (n.`{REF_ID_KEY}`)
+    '''
+]
 
 class Neo4jGraphStore(GraphStore):
     @property
@@ -26,12 +146,29 @@ class Neo4jGraphStore(GraphStore):
         refresh_schema: bool = True,
         enhanced_schema: bool = False,
         sanitize_query_output: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: Optional[int] = DEFAULT_WRITE_CONCURRENCY,
+        schema_ttl: Optional[float] = DEFAULT_SCHEMA_TTL,
+        schema_sample: int = DEFAULT_SCHEMA_SAMPLE,
         **kwargs
     ):
         self.enhanced_schema = enhanced_schema
         self.sanitize_query_output = sanitize_query_output
         self.database = database
         self.structured_schema = {}
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.schema_ttl = schema_ttl
+        self.schema_sample = schema_sample
+        self._has_constraints = False
+
+        # The schema cache and the in-flight refresh are shared by the sync and async paths.
+        self._schema_str: Optional[str] = None
+        self._schema_refreshed_at: Optional[float] = None
+        self._schema_lock = threading.Lock()
+        self._schema_executor: Optional[Executor] = None
+        self._refresh_future: Optional[Future[dict[str, Any]]] = None
+        self._closed = False
 
         self._driver = neo4j.GraphDatabase.driver(
             url,
@@ -45,7 +182,22 @@ class Neo4jGraphStore(GraphStore):
         )
 
         if refresh_schema:
-            self.get_schema(refresh=True)
+            self._refresh_in_background()
+
+    def close(self) -> None:
+        """
+        Stops background schema refreshes and closes the sync driver.
+        """
+        self._shutdown_executor()
+        self._driver.close()
+
+    async def aclose(self) -> None:
+        """
+        Stops background schema refreshes and closes both drivers.
+        """
+        self._shutdown_executor()
+        self._driver.close()
+        await self._async_driver.close()
 
     def persist(
         self,
@@ -56,11 +208,32 @@ class Neo4jGraphStore(GraphStore):
         pass
 
     def get_schema(self, refresh: bool = False, **kwargs) -> Any:
-        pass
+        """
+        Returns the cached schema, fetching it if there is none yet or refresh
+        is set. Once older than schema_ttl, the cached schema is still returned
+        while a fresh one is fetched in the background.
+        """
+        if refresh or self._schema_refreshed_at is None:
+            return self._refresh_schema()
+        if self._is_schema_stale():
+            self._refresh_in_background()
+        return self.structured_schema
 
     @override
     async def aget_schema(self, refresh: bool = False, **kwargs) -> Any:
-        pass
+        if refresh or self._schema_refreshed_at is None:
+            return await self._arefresh_schema()
+        if self._is_schema_stale():
+            self._refresh_in_background()
+        return self.structured_schema
+
+    @override
+    def get_schema_str(self, refresh: bool = False, **kwargs) -> str:
+        return self._format_schema(self.get_schema(refresh=refresh, **kwargs))
+
+    @override
+    async def aget_schema_str(self, refresh: bool = False, **kwargs) -> str:
+        return self._format_schema(await self.aget_schema(refresh=refresh, **kwargs))
 
     def structured_query(
         self,
@@ -91,10 +264,37 @@ class Neo4jGraphStore(GraphStore):
         pass
 
     def get_triplets(self, **query: Unpack[GraphTripletQuery]) -> list[GraphTriplet]:
-        pass
+        return list(self.iter_triplets(**query))
 
     async def aget_triplets(self, **query: Unpack[GraphTripletQuery]) -> list[GraphTriplet]:
-        pass
+        return [triplet async for triplet in self.aiter_triplets(**query)]
+
+    @override
+    def iter_triplets(self, **query: Unpack[GraphTripletQuery]) -> Iterator[GraphTriplet]:
+        """
+        Streams matching triplets through a server-side cursor, pulling
+        batch_size records at a time.
+        """
+        cypher, params = _triplets_query(query)
+        with self._driver.session(
+            database=self.database,
+            fetch_size=self.batch_size,
+            default_access_mode=neo4j.READ_ACCESS
+        ) as session:
+            for record in session.run(cypher, params):
+                yield _to_triplet(record)
+
+    @override
+    async def aiter_triplets(self, **query: Unpack[GraphTripletQuery]) -> AsyncIterator[GraphTriplet]:
+        cypher, params = _triplets_query(query)
+        async with self._async_driver.session(
+            database=self.database,
+            fetch_size=self.batch_size,
+            default_access_mode=neo4j.READ_ACCESS
+        ) as session:
+            result = await session.run(cypher, params)
+            async for record in result:
+                yield _to_triplet(record)
 
     def get_rel_map(
         self,
@@ -116,20 +316,478 @@ class Neo4jGraphStore(GraphStore):
     ) -> list[GraphTriplet]:
         pass
 
-    def upsert_nodes(self, nodes: list[GraphNode], **kwargs) -> None:
-        pass
+    def upsert_nodes(
+        self,
+        nodes: list[GraphNode],
+        batch_size: Optional[int] = None,
+        **kwargs
+    ) -> None:
+        """
+        Merges nodes by id, sending them as UNWIND parameter lists of up to
+        batch_size rows, one managed write transaction per batch.
+        """
+        self._ensure_constraints()
+        self._write_batches(_node_batches(nodes, batch_size or self.batch_size))
 
-    async def aupsert_nodes(self, nodes: list[GraphNode], **kwargs) -> None:
-        pass
+    async def aupsert_nodes(
+        self,
+        nodes: list[GraphNode],
+        batch_size: Optional[int] = None,
+        **kwargs
+    ) -> None:
+        await self._aensure_constraints()
+        await self._awrite_batches(_node_batches(nodes, batch_size or self.batch_size))
 
-    def upsert_relations(self, relations: list[GraphRelation], **kwargs) -> None:
-        pass
+    def upsert_relations(
+        self,
+        relations: list[GraphRelation],
+        batch_size: Optional[int] = None,
+        **kwargs
+    ) -> None:
+        self._ensure_constraints()
+        self._write_batches(_relation_batches(relations, batch_size or self.batch_size))
 
-    async def aupsert_relations(self, relations: list[GraphRelation], **kwargs) -> None:
-        pass
+    async def aupsert_relations(
+        self,
+        relations: list[GraphRelation],
+        batch_size: Optional[int] = None,
+        **kwargs
+    ) -> None:
+        await self._aensure_constraints()
+        await self._awrite_batches(_relation_batches(relations, batch_size or self.batch_size))
 
     def delete(self, **query: Unpack[GraphNodeQuery]) -> None:
         pass
 
     async def adelete(self, **query: Unpack[GraphNodeQuery]) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    @override
+    async def adelete_artifacts(
+        self,
+        artifact_ids: Optional[list[str]] = None,
+        ref_artifact_ids: Optional[list[str]] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> None:
+        await super().adelete_artifacts(
+            artifact_ids,
+            ref_artifact_ids,
+            batch_size=batch_size or self.batch_size,
+            max_concurrency=max_concurrency or self.max_concurrency,
+            **kwargs
+        )
+
+    @override
+    def _delete_artifacts(
+        self,
+        artifact_ids: list[str],
+        ref_artifact_ids: list[str],
+        **kwargs
+    ) -> None:
+        self._ensure_constraints()
+        self._write_batches(iter([_delete_artifacts_params(artifact_ids, ref_artifact_ids)]))
+
+    @override
+    async def _adelete_artifacts(
+        self,
+        artifact_ids: list[str],
+        ref_artifact_ids: list[str],
+        **kwargs
+    ) -> None:
+        await self._aensure_constraints()
+        await self._awrite_batches(iter([_delete_artifacts_params(artifact_ids, ref_artifact_ids)]))
+
+    def _is_schema_stale(self) -> bool:
+        return (
+            self.schema_ttl is not None and
+            time.monotonic() - self._schema_refreshed_at > self.schema_ttl
+        )
+
+    def _refresh_schema(self) -> dict[str, Any]:
+        future, owner = self._begin_refresh()
+        if owner:
+            self._run_refresh(future)
+        return future.result()
+
+    async def _arefresh_schema(self) -> dict[str, Any]:
+        future, owner = self._begin_refresh()
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            async with self._async_driver.session(database=self.database) as session:
+                schema = _to_schema(
+                    await session.execute_read(_aread_records, _NODE_PROPERTIES_QUERY),
+                    await session.execute_read(_aread_records, _RELATION_PROPERTIES_QUERY),
+                    await session.execute_read(_aread_records, _RELATIONSHIPS_QUERY, sample=self.schema_sample)
+                )
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        self._set_schema(schema)
+        future.set_result(schema)
+        return schema
+
+    def _refresh_in_background(self) -> None:
+        future, owner = self._begin_refresh()
+        if not owner:
+            return
+        with self._schema_lock:
+            if self._schema_executor is None and not self._closed:
+                self._schema_executor = ContextThreadPoolExecutor(max_workers=1)
+            executor = self._schema_executor
+        if executor is None:
+            future.cancel()
+            return
+        future.add_done_callback(_log_refresh_error)
+        # Shutting the executor down cancels a refresh that has not started.
+        executor.submit(self._run_refresh, future).add_done_callback(
+            lambda task: future.cancel() if task.cancelled() else None
+        )
+
+    def _begin_refresh(self) -> tuple[Future[dict[str, Any]], bool]:
+        """
+        Returns the refresh in flight, or starts tracking a new one that the caller must run.
+        """
+        with self._schema_lock:
+            if self._refresh_future is not None and not self._refresh_future.done():
+                return self._refresh_future, False
+            future: Future[dict[str, Any]] = Future()
+            self._refresh_future = future
+            return future, True
+
+    def _run_refresh(self, future: Future[dict[str, Any]]) -> None:
+        try:
+            with self._driver.session(database=self.database) as session:
+                schema = _to_schema(
+                    session.execute_read(_read_records, _NODE_PROPERTIES_QUERY),
+                    session.execute_read(_read_records, _RELATION_PROPERTIES_QUERY),
+                    session.execute_read(_read_records, _RELATIONSHIPS_QUERY, sample=self.schema_sample)
+                )
+        except BaseException as error:
+            future.set_exception(error)
+            return
+        self._set_schema(schema)
+        future.set_result(schema)
+
+    def _shutdown_executor(self) -> None:
+        with self._schema_lock:
+            self._closed = True
+            executor, self._schema_executor = self._schema_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _set_schema(self, schema: dict[str, Any]) -> None:
+        with self._schema_lock:
+            self.structured_schema = schema
+            self._schema_str = None
+            self._schema_refreshed_at = time.monotonic()
+
+    def _format_schema(self, schema: dict[str, Any]) -> str:
+        schema_str = self._schema_str
+        if schema_str is None or schema is not self.structured_schema:
+            schema_str = _format_schema(schema)
+            with self._schema_lock:
+                if schema is self.structured_schema:
+                    self._schema_str = schema_str
+        return schema_str
+
+    def _ensure_constraints(self) -> None:
+        if not self._has_constraints:
+            with self._driver.session(database=self.database) as session:
+                for query in _SCHEMA_SETUP_QUERIES:
+                    session.run(query).consume()
+            self._has_constraints = True
+
+    async def _aensure_constraints(self) -> None:
+        if not self._has_constraints:
+            async with self._async_driver.session(database=self.database) as session:
+                for query in _SCHEMA_SETUP_QUERIES:
+                    result = await session.run(query)
+                    await result.consume()
+            self._has_constraints = True
+
+    def _write_batches(self, batches: Iterator[tuple[str, dict[str, Any]]]) -> None:
+        with self._driver.session(database=self.database) as session:
+            for query, params in batches:
+                summary = session.execute_write(_write, query, params)
+                logger.debug(f'> Wrote batch: {summary.counters}')
+
+    async def _awrite_batches(self, batches: Iterator[tuple[str, dict[str, Any]]]) -> None:
+        # Sessions are not concurrency safe, so every in-flight batch gets its own.
+        async def write(query: str, params: dict[str, Any]) -> None:
+            async with self._async_driver.session(database=self.database) as session:
+                summary = await session.execute_write(_awrite, query, params)
+            logger.debug(f'> Wrote batch: {summary.counters}')
+
+        await gather_with_concurrency(
+            self.max_concurrency,
+            *(write(query, params) for query, params in batches)
+        )
+
+def _write(tx: neo4j.ManagedTransaction, query: str, params: dict[str, Any]) -> neo4j.ResultSummary:
+    return tx.run(query, params).consume()
+
+async def _awrite(tx: neo4j.AsyncManagedTransaction, query: str, params: dict[str, Any]) -> neo4j.ResultSummary:
+    result = await tx.run(query, params)
+    return await result.consume()
+
+def _node_batches(
+    nodes: list[GraphNode],
+    batch_size: int
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    # Labels cannot be parameterized, so rows are grouped into one query per label set.
+    groups: dict[str, dict[str, dict[str, Any]]] = {}
+    for node in nodes:
+        labels = ''.join(f':{_escape(label)}' for label in _node_labels(node))
+        groups.setdefault(labels, {})[node.id] = _node_row(node)
+    for labels, rows in groups.items():
+        query = _UPSERT_NODES_QUERY.format(base_label=_escape(BASE_NODE_LABEL), labels=labels)
+        yield from _batches(query, list(rows.values()), batch_size)
+
+def _relation_batches(
+    relations: list[GraphRelation],
+    batch_size: int
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    groups: dict[str, dict[str, dict[str, Any]]] = {}
+    for relation in relations:
+        groups.setdefault(relation.label or DEFAULT_RELATION_TYPE, {})[relation.id] = {
+            'source': relation.source,
+            'target': relation.target,
+            'name': relation.name,
+            'properties': _to_properties(relation.properties, relation.metadata)
+        }
+    for relation_type, rows in groups.items():
+        query = _UPSERT_RELATIONS_QUERY.format(
+            base_label=_escape(BASE_NODE_LABEL),
+            entity_label=_escape(BASE_ENTITY_LABEL),
+            type=_escape(relation_type),
+            name_key=RELATION_NAME_KEY
+        )
+        yield from _batches(query, list(rows.values()), batch_size)
+
+def _batches(
+    query: str,
+    rows: list[dict[str, Any]],
+    batch_size: int
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    for i in range(0, len(rows), batch_size):
+        yield query, {'rows': rows[i : i + batch_size]}
+
+def _delete_artifacts_params(artifact_ids: list[str], ref_artifact_ids: list[str]) -> tuple[str, dict[str, Any]]:
+    return _DELETE_ARTIFACTS_QUERY, {
+        'ids': list({*artifact_ids, *ref_artifact_ids}),
+        'artifact_ids': artifact_ids,
+        'ref_artifact_ids': ref_artifact_ids
+    }
+
+def _triplets_query(query: GraphTripletQuery) -> tuple[str, dict[str, Any]]:
+    conditions: list[str] = []
+    params: dict[str, Any] = {}
+
+    node_ids = (query.get('ids') or []) + (query.get('entity_names') or [])
+    if node_ids:
+        conditions.append('(subject.id IN $node_ids OR obj.id IN $node_ids)')
+        params['node_ids'] = node_ids
+    if query.get('sources'):
+        conditions.append('subject.id IN $sources')
+        params['sources'] = query['sources']
+    if query.get('targets'):
+        conditions.append('obj.id IN $targets')
+        params['targets'] = query['targets']
+    if query.get('relation_names'):
+        # Relations written before the name was stored fall back to their type.
+        conditions.append(f'coalesce(relation.`{RELATION_NAME_KEY}`, type(relation)) IN $relation_names')
+        params['relation_names'] = query['relation_names']
+    if query.get('properties'):
+        conditions.append(
+            'any(element IN [subject, relation, obj] '
+            'WHERE all(key IN keys($properties) WHERE element[key] = $properties[key]))'
+        )
+        params['properties'] = {key: _to_property(value) for key, value in query['properties'].items()}
+
+    where = f'WHERE {' AND '.join(conditions)}' if conditions else ''
+    return _TRIPLETS_QUERY.format(base_label=_escape(BASE_NODE_LABEL), where=where), params
+
+def _to_triplet(record: Any) -> GraphTriplet:
+    subject = _to_node(record['subject_labels'], record['subject'])
+    obj = _to_node(record['obj_labels'], record['obj'])
+    properties = dict(record['relation'])
+    metadata = properties.pop('metadata', None)
+    properties.pop(RELATION_NAME_KEY, None)
+    return GraphTriplet(
+        subject,
+        GraphRelation(
+            source=subject.id,
+            target=obj.id,
+            label=record['type'] if record['type'] != DEFAULT_RELATION_TYPE else None,
+            properties=properties,
+            metadata=json.loads(metadata) if metadata else {}
+        ),
+        obj
+    )
+
+def _to_node(labels: list[str], properties: dict[str, Any]) -> GraphNode:
+    properties = dict(properties)
+    labels = [label for label in labels if label not in _SCHEMA_EXCLUDED_LABELS]
+    node_id = properties.pop('id')
+    embedding = properties.pop('embedding', None)
+    metadata = properties.pop('metadata', None)
+    properties.pop(REF_ID_KEY, None)
+    fields = {
+        'properties': properties,
+        'metadata': json.loads(metadata) if metadata else {},
+        'embedding': np.asarray(embedding) if embedding is not None else None
+    }
+    if CHUNK_NODE_LABEL in labels:
+        labels.remove(CHUNK_NODE_LABEL)
+        properties.pop('id_', None)
+        return ChunkNode(
+            text=properties.pop('text', ''),
+            id_=node_id,
+            label=labels[0] if labels else None,
+            **fields
+        )
+    return EntityNode(
+        name=properties.pop('name', node_id),
+        label=labels[0] if labels else None,
+        **fields
+    )
+
+def _node_labels(node: GraphNode) -> list[str]:
+    if isinstance(node, EntityNode):
+        labels = [BASE_ENTITY_LABEL]
+    elif isinstance(node, ChunkNode):
+        labels = [CHUNK_NODE_LABEL]
+    else:
+        labels = [type(node).__name__]
+    if node.label and node.label not in labels:
+        labels.append(node.label)
+    return labels
+
+def _node_row(node: GraphNode) -> dict[str, Any]:
+    properties = _to_properties(
+        {**node.model_dump(exclude=_NODE_COMMON_FIELDS), **node.properties},
+        node.metadata
+    )
+    if ref_id := _ref_id(node.metadata):
+        properties[REF_ID_KEY] = ref_id
+    return {
+        'id': node.id,
+        'properties': properties,
+        'embedding': (
+            np.asarray(node.embedding, dtype=float).tolist()
+            if node.embedding is not None
+            else None
+        )
+    }
+
+def _to_properties(properties: dict[str, Any], metadata: dict[str, Any]) -> dict[str, Any]:
+    """
+    Neo4j properties must be primitives or lists of primitives, so anything
+    else, including the metadata dict, is stored as a JSON string.
+    """
+    values = {key: _to_property(value) for key, value in properties.items()}
+    if metadata:
+        values['metadata'] = json.dumps(metadata, default=str)
+    return values
+
+def _to_property(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)) and all(isinstance(item, (bool, int, float, str)) for item in value):
+        return list(value)
+    return json.dumps(value, default=str)
+
+def _ref_id(metadata: dict[str, Any]) -> Optional[str]:
+    ref = (metadata.get('hierarchy') or {}).get(ArtifactRelationship.REF)
+    if isinstance(ref, ArtifactInfo):
+        return ref.id
+    elif isinstance(ref, dict):
+        return ref.get('id')
+    return None
+
+def _escape(name: str) -> str:
+    return f'`{name.replace('`', '``')}`'
+
+def _read_records(tx: neo4j.ManagedTransaction, query: str, **params) -> list[dict[str, Any]]:
+    return [record.data() for record in tx.run(query, **params)]
+
+async def _aread_records(tx: neo4j.AsyncManagedTransaction, query: str, **params) -> list[dict[str, Any]]:
+    result = await tx.run(query, **params)
+    return [record.data() async for record in result]
+
+def _log_refresh_error(future: Future) -> None:
+    if not future.cancelled() and (error := future.exception()) is not None:
+        logger.warning(f'> Failed to refresh the Neo4j schema, keeping the cached one: {error}')
+
+def _to_schema(
+    node_properties: list[dict[str, Any]],
+    relation_properties: list[dict[str, Any]],
+    relationships: list[dict[str, Any]]
+) -> dict[str, Any]:
+    node_props: dict[str, list[dict[str, str]]] = {}
+    for record in node_properties:
+        for label in record['nodeLabels']:
+            if label in _SCHEMA_EXCLUDED_LABELS:
+                continue
+            properties = node_props.setdefault(label, [])
+            if record['propertyName'] and record['propertyName'] not in _SCHEMA_EXCLUDED_PROPERTIES:
+                properties.append({
+                    'property': record['propertyName'],
+                    'type': _property_type(record['propertyTypes'])
+                })
+
+    rel_props: dict[str, list[dict[str, str]]] = {}
+    for record in relation_properties:
+        relation_type = record['relType'].lstrip(':').strip('`')
+        properties = rel_props.setdefault(relation_type, [])
+        if record['propertyName']:
+            properties.append({
+                'property': record['propertyName'],
+                'type': _property_type(record['propertyTypes'])
+            })
+
+    patterns: set[tuple[str, str, str]] = set()
+    for record in relationships:
+        for source in record['source_labels']:
+            for target in record['target_labels']:
+                if source not in _SCHEMA_EXCLUDED_LABELS and target not in _SCHEMA_EXCLUDED_LABELS:
+                    patterns.add((source, record['type'], target))
+
+    return {
+        'node_props': node_props,
+        'rel_props': rel_props,
+        'relationships': [
+            {'start': source, 'type': relation_type, 'end': target}
+            for source, relation_type, target in sorted(patterns)
+        ]
+    }
+
+def _property_type(types: Optional[list[str]]) -> str:
+    return '|'.join(types or []) or 'Any'
+
+def _format_schema(schema: dict[str, Any]) -> str:
+    def format_properties(properties: list[dict[str, str]]) -> str:
+        return ', '.join(f'{prop["property"]}: {prop["type"]}' for prop in properties)
+
+    return '\n'.join([
+        'Node properties:',
+        *(
+            f'{label} {{{format_properties(properties)}}}'
+            for label, properties in schema['node_props'].items()
+        ),
+        'Relationship properties:',
+        *(
+            f'{relation_type} {{{format_properties(properties)}}}'
+            for relation_type, properties in schema['rel_props'].items()
+        ),
+        'The relationships:',
+        *(
+            f'(:{pattern["start"]})-[:{pattern["type"]}]->(:{pattern["end"]})'
+            for pattern in schema['relationships']
+        )
+    ])
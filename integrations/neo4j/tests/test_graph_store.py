@@ -0,0 +1,213 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import neo4j
+import pytest
+
+from flowstack.neo4j.graph_store import (
+    DEFAULT_RELATION_TYPE,
+    RELATION_NAME_KEY,
+    Neo4jGraphStore,
+    _SCHEMA_SETUP_QUERIES,
+    _to_triplet,
+    _triplets_query
+)
+from flowstack.stores import ChunkNode, GraphRelation
+
+class _Result:
+    def consume(self) -> Any:
+        return SimpleNamespace(counters={})
+
+    def __iter__(self):
+        return iter(())
+
+class _AsyncResult:
+    async def consume(self) -> Any:
+        return SimpleNamespace(counters={})
+
+    async def __aiter__(self):
+        for record in ():
+            yield record
+
+class _Session:
+    """
+    Stands in for both a session and a managed transaction, recording every query it runs.
+    """
+
+    def __init__(self, queries: list[tuple[str, Optional[dict[str, Any]]]], release: threading.Event):
+        self.queries = queries
+        self.release = release
+
+    def __enter__(self) -> '_Session':
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def run(self, query: str, params: Optional[dict[str, Any]] = None, **kwargs) -> _Result:
+        self.queries.append((query, params))
+        return _Result()
+
+    def execute_write(self, work, *args, **kwargs) -> Any:
+        return work(self, *args, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs) -> Any:
+        self.release.wait()
+        return work(self, *args, **kwargs)
+
+class _AsyncSession(_Session):
+    async def __aenter__(self) -> '_AsyncSession':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def run(self, query: str, params: Optional[dict[str, Any]] = None, **kwargs) -> _AsyncResult:
+        self.queries.append((query, params))
+        return _AsyncResult()
+
+    async def execute_write(self, work, *args, **kwargs) -> Any:
+        return await work(self, *args, **kwargs)
+
+    async def execute_read(self, work, *args, **kwargs) -> Any:
+        return await work(self, *args, **kwargs)
+
+class _Driver:
+    def __init__(self, session_type: type[_Session]):
+        self.queries: list[tuple[str, Optional[dict[str, Any]]]] = []
+        self.session_type = session_type
+        self.release = threading.Event()
+        self.release.set()
+        self.closed = False
+
+    def session(self, **kwargs) -> _Session:
+        return self.session_type(self.queries, self.release)
+
+    def close(self) -> None:
+        self.closed = True
+
+class _AsyncDriver(_Driver):
+    async def close(self) -> None:
+        self.closed = True
+
+@pytest.fixture
+def drivers(monkeypatch) -> tuple[_Driver, _AsyncDriver]:
+    driver = _Driver(_Session)
+    async_driver = _AsyncDriver(_AsyncSession)
+    monkeypatch.setattr(neo4j.GraphDatabase, 'driver', lambda *args, **kwargs: driver)
+    monkeypatch.setattr(neo4j.AsyncGraphDatabase, 'driver', lambda *args, **kwargs: async_driver)
+    return driver, async_driver
+
+@pytest.fixture
+def store(drivers) -> Neo4jGraphStore:
+    return Neo4jGraphStore('user', 'password', 'bolt://localhost', refresh_schema=False, batch_size=2)
+
+def _nodes(count: int, label: Optional[str] = None) -> list[ChunkNode]:
+    return [ChunkNode(text=f'text {i}', id_=f'{label or 'n'}{i}', label=label) for i in range(count)]
+
+def _writes(driver: _Driver) -> list[tuple[str, dict[str, Any]]]:
+    return [(query, params) for query, params in driver.queries if query.lstrip().startswith('UNWIND')]
+
+def _setup_queries(driver: _Driver) -> list[str]:
+    return [query for query, _ in driver.queries if query in _SCHEMA_SETUP_QUERIES]
+
+def test_upsert_nodes_sends_unwind_batches(store, drivers):
+    driver, _ = drivers
+    store.upsert_nodes(_nodes(5))
+    assert [len(params['rows']) for _, params in _writes(driver)] == [2, 2, 1]
+    assert [row['id'] for _, params in _writes(driver) for row in params['rows']] == [f'n{i}' for i in range(5)]
+
+def test_upsert_nodes_groups_rows_by_labels(store, drivers):
+    driver, _ = drivers
+    store.upsert_nodes(_nodes(1, 'A') + _nodes(1, 'B') + [ChunkNode(text='text', id_='A1', label='A')])
+    writes = _writes(driver)
+    assert len(writes) == 2
+    assert '`A`' in writes[0][0] and len(writes[0][1]['rows']) == 2
+    assert '`B`' in writes[1][0] and len(writes[1][1]['rows']) == 1
+
+def test_constraints_are_created_once(store, drivers):
+    driver, _ = drivers
+    store.upsert_nodes(_nodes(1))
+    store.upsert_relations([GraphRelation(source='n0', target='n0', label='self')])
+    assert _setup_queries(driver) == _SCHEMA_SETUP_QUERIES
+    assert driver.queries[:len(_SCHEMA_SETUP_QUERIES)] == [(query, None) for query in _SCHEMA_SETUP_QUERIES]
+
+def test_async_upsert_nodes_sends_unwind_batches(store, drivers):
+    _, async_driver = drivers
+
+    async def upsert() -> None:
+        await store.aupsert_nodes(_nodes(3))
+        await store.aupsert_nodes(_nodes(1, 'A'))
+
+    asyncio.run(upsert())
+    assert sorted(len(params['rows']) for _, params in _writes(async_driver)) == [1, 1, 2]
+    assert _setup_queries(async_driver) == _SCHEMA_SETUP_QUERIES
+
+def test_upsert_relations_keeps_relation_names(store, drivers):
+    driver, _ = drivers
+    store.upsert_relations([
+        GraphRelation(source='a', target='b'),
+        GraphRelation(source='b', target='c', label='knows')
+    ])
+    writes = {params['rows'][0]['name']: query for query, params in _writes(driver)}
+    assert f'`{DEFAULT_RELATION_TYPE}`' in writes['a->b']
+    assert '`knows`' in writes['knows']
+    assert all(RELATION_NAME_KEY in query for query in writes.values())
+
+def test_upsert_relations_replaces_the_relation_between_a_pair(store, drivers):
+    driver, _ = drivers
+    store.upsert_relations([GraphRelation(source='a', target='b', label='knows')])
+    store.upsert_relations([GraphRelation(source='a', target='b', label='likes', properties={'w': 1})])
+    query, params = _writes(driver)[-1]
+    assert '`likes`' in query
+    assert 'SET r = row.properties' in query
+    assert 'DELETE other' in query
+    assert params['rows'][0]['properties']['w'] == 1
+
+def test_relation_names_filter_on_stored_name():
+    cypher, params = _triplets_query({'relation_names': ['a->b']})
+    assert f'relation.`{RELATION_NAME_KEY}`' in cypher
+    assert params == {'relation_names': ['a->b']}
+
+def test_to_triplet_drops_stored_name():
+    triplet = _to_triplet({
+        'subject_labels': ['__Node__', 'Chunk'],
+        'subject': {'id': 'a', 'text': 'a'},
+        'type': DEFAULT_RELATION_TYPE,
+        'relation': {RELATION_NAME_KEY: 'a->b', 'weight': 1},
+        'obj_labels': ['__Node__', 'Chunk'],
+        'obj': {'id': 'b', 'text': 'b'}
+    })
+    assert triplet.relation.name == 'a->b'
+    assert triplet.relation.properties == {'weight': 1}
+
+def _schema_queries(driver: _Driver) -> list[str]:
+    return [query for query, _ in driver.queries if 'db.schema' in query or 'DISTINCT' in query]
+
+def test_sync_and_async_refreshes_share_one_request(store, drivers):
+    driver, async_driver = drivers
+    driver.release.clear()
+    store._refresh_in_background()
+    schemas = []
+    waiter = threading.Thread(target=lambda: schemas.append(asyncio.run(store.aget_schema(refresh=True))))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive()
+    driver.release.set()
+    waiter.join()
+    assert len(_schema_queries(driver)) == 3
+    assert _schema_queries(async_driver) == []
+    assert schemas == [store.structured_schema]
+
+def test_close_stops_background_refreshes(store, drivers):
+    driver, async_driver = drivers
+    store.get_schema()
+    store.close()
+    store._refresh_in_background()
+    assert store._schema_executor is None
+    assert store._refresh_future.cancelled()
+    assert driver.closed and not async_driver.closed
+    asyncio.run(store.aclose())
+    assert async_driver.closed
@@ -1,42 +1,156 @@
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Iterator, NamedTuple, Optional
 
 from wikipedia import wikipedia
 
 from flowstack.artifacts import Artifact, ArtifactMetadata, Text
 from flowstack.components.retrievers.base import BaseRetriever
+from flowstack.utils.threading import ContextThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CACHE_TTL = 3600.0
+DEFAULT_CACHE_SIZE = 1024
+
+class _Page(NamedTuple):
+    pageid: str
+    parent_id: int
+    title: str
+    url: str
+    content: str
+
+class _PageCache:
+    """
+    Title to page cache shared across retrievers. Entries expire after their ttl,
+    and concurrent fetches of the same title wait on a single request.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._pages: OrderedDict[str, tuple[float, _Page]] = OrderedDict()
+        self._pending: dict[str, Future[_Page]] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, title: str, ttl: float) -> _Page:
+        with self._lock:
+            entry = self._pages.get(title)
+            if entry is not None and entry[0] > time.monotonic():
+                self._pages.move_to_end(title)
+                return entry[1]
+            future = self._pending.get(title)
+            owner = future is None
+            if owner:
+                future = self._pending[title] = Future()
+        if not owner:
+            return future.result()
+        try:
+            page = _load_page(title)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            self._put(title, page, ttl)
+            future.set_result(page)
+            return page
+        finally:
+            with self._lock:
+                self._pending.pop(title, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def _put(self, title: str, page: _Page, ttl: float) -> None:
+        with self._lock:
+            self._pages[title] = (time.monotonic() + ttl, page)
+            self._pages.move_to_end(title)
+            while len(self._pages) > self.max_size:
+                self._pages.popitem(last=False)
+
+_page_cache = _PageCache()
+
 class WikipediaQueryRetriever(BaseRetriever):
     def __init__(
         self,
         results: Optional[int] = None,
-        replace_failed: Optional[bool] = None
+        replace_failed: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
+        cache_ttl: Optional[float] = None
     ):
         self._results = results if results is not None else 5
         self._replace_failed = replace_failed if replace_failed is not None else True
+        self._max_concurrency = max_concurrency if max_concurrency is not None else self._results
+        self._cache_ttl = cache_ttl if cache_ttl is not None else DEFAULT_CACHE_TTL
 
     def _invoke(self, query: Artifact, **kwargs) -> list[Artifact]:
-        titles = wikipedia.search(
+        pages = dict(self._fetch(query))
+        return [_to_artifact(pages[index]) for index in sorted(pages)]
+
+    def _stream(self, query: Artifact, **kwargs) -> Iterator[list[Artifact]]:
+        for _, page in self._fetch(query):
+            yield [_to_artifact(page)]
+
+    def _fetch(self, query: Artifact) -> Iterator[tuple[int, _Page]]:
+        """
+        Fetches the pages concurrently and yields them with their search rank in rank order,
+        each as soon as every higher-ranked page has resolved, stopping once enough pages succeed.
+        Fetches that have not started are cancelled; running ones finish in the background and fill the cache.
+        """
+        titles = list(dict.fromkeys(wikipedia.search(
             str(query),
             results=self._results if not self._replace_failed else self._results + 5
+        )))
+        if not titles:
+            return
+        fetched = 0
+        released = 0
+        resolved: dict[int, Optional[_Page]] = {}
+        executor = ContextThreadPoolExecutor(max_workers=min(self._max_concurrency, len(titles)))
+        try:
+            ranks = {
+                executor.submit(_page_cache.fetch, title, self._cache_ttl): index
+                for index, title in enumerate(titles)
+            }
+            pending = set(ranks)
+            while pending and fetched < self._results:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = ranks[future]
+                    try:
+                        resolved[index] = future.result()
+                    except Exception:
+                        logger.info(f'Unable to fetch page with title {titles[index]}.')
+                        resolved[index] = None
+                while released in resolved and fetched < self._results:
+                    page = resolved.pop(released)
+                    released += 1
+                    if page is not None:
+                        fetched += 1
+                        yield released - 1, page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def _load_page(title: str) -> _Page:
+    page = wikipedia.page(title=title)
+    return _Page(
+        pageid=page.pageid,
+        parent_id=page.parent_id,
+        title=page.title,
+        url=page.url,
+        content=page.content
+    )
+
+def _to_artifact(page: _Page) -> Text:
+    return Text(
+        page.content,
+        metadata=ArtifactMetadata(
+            pageid=page.pageid,
+            parent_id=page.parent_id,
+            title=page.title,
+            url=page.url
         )
-        artifacts = []
-        for title in titles:
-            try:
-                page = wikipedia.page(title=title)
-                artifacts.append(Text(
-                    page.content,
-                    metadata=ArtifactMetadata(
-                        pageid=page.pageid,
-                        parent_id=page.parent_id,
-                        title=page.title,
-                        url=page.url
-                    )
-                ))
-                if self._replace_failed and len(artifacts) == self._results:
-                    break
-            except:
-                logger.info(f'Unable to fetch page with title {title}.')
-        return artifacts
\ No newline at end of file
+    )
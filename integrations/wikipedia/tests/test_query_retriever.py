@@ -0,0 +1,80 @@
+import importlib
+import sys
+import time
+import types
+from typing import Iterator
+
+import pytest
+
+_PAGES = {
+    'first': 0.2,
+    'second': 0.0,
+    'third': 0.1,
+    'fourth': 0.0
+}
+
+class _StubWikipedia(types.ModuleType):
+    def __init__(self):
+        super().__init__('wikipedia.wikipedia')
+        self.titles = list(_PAGES)
+        self.failing: set[str] = set()
+        self.loaded: list[str] = []
+
+    def search(self, query: str, results: int = 10) -> list[str]:
+        return self.titles[:results]
+
+    def page(self, title: str) -> types.SimpleNamespace:
+        time.sleep(_PAGES[title])
+        self.loaded.append(title)
+        if title in self.failing:
+            raise KeyError(title)
+        return types.SimpleNamespace(
+            pageid=title,
+            parent_id=0,
+            title=title,
+            url=f'https://en.wikipedia.org/wiki/{title}',
+            content=f'Content of {title}'
+        )
+
+@pytest.fixture
+def stub(monkeypatch: pytest.MonkeyPatch) -> Iterator[_StubWikipedia]:
+    stub = _StubWikipedia()
+    package = types.ModuleType('wikipedia')
+    package.wikipedia = stub
+    monkeypatch.setitem(sys.modules, 'wikipedia', package)
+    monkeypatch.setitem(sys.modules, 'wikipedia.wikipedia', stub)
+    module = importlib.import_module('flowstack.wikipedia.query_retriever')
+    monkeypatch.setattr(module, 'wikipedia', stub)
+    module._page_cache.clear()
+    yield stub
+    module._page_cache.clear()
+
+def _retriever(**kwargs):
+    from flowstack.wikipedia.query_retriever import WikipediaQueryRetriever
+    return WikipediaQueryRetriever(**kwargs)
+
+def _titles(artifacts) -> list[str]:
+    return [artifact.metadata['title'] for artifact in artifacts]
+
+def test_invoke_keeps_top_ranked_pages(stub: _StubWikipedia):
+    artifacts = _retriever(results=2, replace_failed=False).invoke('query')
+    assert _titles(artifacts) == ['first', 'second']
+
+def test_stream_yields_in_rank_order(stub: _StubWikipedia):
+    chunks = list(_retriever(results=3, replace_failed=False).stream('query'))
+    assert [_titles(chunk) for chunk in chunks] == [['first'], ['second'], ['third']]
+
+def test_failed_pages_are_replaced_by_the_next_rank(stub: _StubWikipedia):
+    stub.failing.add('first')
+    artifacts = _retriever(results=2).invoke('query')
+    assert _titles(artifacts) == ['second', 'third']
+
+def test_failed_pages_are_skipped_without_replacement(stub: _StubWikipedia):
+    stub.failing.add('second')
+    artifacts = _retriever(results=3, replace_failed=False).invoke('query')
+    assert _titles(artifacts) == ['first', 'third']
+
+def test_stops_once_enough_pages_succeed(stub: _StubWikipedia):
+    artifacts = _retriever(results=1, max_concurrency=1).invoke('query')
+    assert _titles(artifacts) == ['first']
+    assert stub.loaded == ['first']